@@ -0,0 +1,155 @@
+"""
+Benchmarks of the Silvera compiler on synthetic projects.
+
+Usage:
+
+    python -m benchmarks.run [--sizes 10 100 1000 10000] [--threshold 0.25]
+                             [--baseline benchmarks/baseline.json]
+                             [--repeat 3] [--update-baseline]
+
+For each size (number of services), a synthetic project is created (see
+`benchmarks.synthetic`) and the following steps are measured: loading
+(`run.load`) with its `model_processor` and `RESTResolver` phases, code
+generation (`generator.generate`), OpenAPI serialization of all services and
+architecture evaluation (`Evaluator.evaluate`).
+
+Each size is run `--repeat` times and the shortest duration of each step is
+kept, since single runs vary a lot on busy machines. Results are compared
+with the stored baseline, and the run fails if any step is slower than the
+baseline by more than the threshold.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from benchmarks.synthetic import ProjectSpec, create_project
+from silvera.evaluation.builtin import Evaluator
+from silvera.generator.generator import generate
+from silvera.openapi.serialization import OpenAPISerializer
+from silvera.run import load
+from silvera.timings import collect
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SIZES = [10, 100, 1000, 10000]
+
+# Differences smaller than this (in seconds) are considered noise.
+MIN_DIFF = 0.05
+
+
+def _timed(f, *args):
+    start = time.perf_counter()
+    result = f(*args)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(size, work_dir):
+    """Runs all benchmarks on a synthetic project with a given number of
+    services.
+
+    Args:
+        size (int): number of services
+        work_dir (str): directory for the project and generated code
+
+    Returns:
+        OrderedDict: duration of each step in seconds
+    """
+    project_dir = create_project(os.path.join(work_dir, "project"),
+                                 ProjectSpec(services=size))
+    output_dir = os.path.join(work_dir, "output")
+    os.mkdir(output_dir)
+
+    result = OrderedDict()
+
+    with collect(trace_memory=False) as timings:
+        model = load(project_dir)
+    result["load"] = timings["load"].wall
+    result["model_processor"] = timings["load/model_processor"].wall
+    result["rest_resolver"] = timings["load/rest_resolver"].wall
+
+    _, result["generate"] = _timed(generate, model, output_dir)
+
+    services = [s for m in model.modules for s in m.services]
+    serializer = OpenAPISerializer()
+    _, result["openapi"] = _timed(
+        lambda: [serializer.serialize(s) for s in services])
+
+    _, result["evaluate"] = _timed(Evaluator().evaluate, model)
+
+    return result
+
+
+def compare(results, baseline, threshold):
+    """Compares results with the baseline.
+
+    Args:
+        results (dict): durations by size and step
+        baseline (dict): baseline durations by size and step
+        threshold (float): allowed slowdown, e.g. 0.25 for 25%
+
+    Returns:
+        list: descriptions of regressions
+    """
+    regressions = []
+    for size, steps in results.items():
+        for step, duration in steps.items():
+            try:
+                base = baseline[size][step]
+            except KeyError:
+                continue
+            if duration > base * (1 + threshold) and \
+                    duration - base > MIN_DIFF:
+                regressions.append(
+                    "%s services, %s: %.3fs (baseline %.3fs, +%.0f%%)" %
+                    (size, step, duration, base, (duration / base - 1) * 100))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the Silvera compiler.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="numbers of services")
+    parser.add_argument("--baseline", default=BASELINE,
+                        help="path to the baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown compared to the baseline")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs of each size, the fastest one is kept")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = OrderedDict()
+    for size in args.sizes:
+        best = OrderedDict()
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory() as work_dir:
+                for step, duration in run_benchmark(size, work_dir).items():
+                    best[step] = min(duration, best.get(step, duration))
+        results[str(size)] = best
+        print("%6d services: %s" % (size, ", ".join(
+            "%s %.3fs" % (k, v) for k, v in results[str(size)].items())))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print("Baseline stored in %s" % args.baseline)
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for r in regressions:
+        print("REGRESSION: %s" % r)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
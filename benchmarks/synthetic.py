@@ -0,0 +1,311 @@
+"""
+This module creates synthetic Silvera projects of arbitrary size, used for
+benchmarking the compiler.
+
+Project consists of `setup.si` (config server and service registry),
+`messaging.si` (message pool and brokers, if messages are used),
+`gateways.si` (API gateways, if used) and a number of modules with services.
+Services are evenly distributed between modules, and each service depends on
+services declared before it, so modules only import modules before them.
+"""
+import os
+import random
+
+_TYPES = ["str", "i32", "i64", "int", "double", "bool", "date"]
+
+
+class ProjectSpec:
+    """Size of the synthetic project.
+
+    Attributes:
+        modules (int): number of modules with services
+        services (int): total number of services
+        typedefs (int): number of typedefs per service
+        fields (int): number of fields per typedef
+        functions (int): number of API functions per service
+        dependencies (int): number of dependencies per service
+        msg_groups (int): number of top level message groups
+        msg_depth (int): nesting depth of message groups
+        messages (int): number of messages per group
+        brokers (int): number of message brokers
+        channels (int): number of channels per broker
+        gateways (int): number of API gateways
+        seed (int): random seed, the same spec and seed always give the same
+            project
+    """
+    def __init__(self, services=10, modules=None, typedefs=2, fields=5,
+                 functions=4, dependencies=2, msg_groups=2, msg_depth=2,
+                 messages=3, brokers=1, channels=5, gateways=1, seed=0):
+        super().__init__()
+        self.services = services
+        self.modules = modules or max(1, services // 10)
+        self.typedefs = typedefs
+        self.fields = fields
+        self.functions = functions
+        self.dependencies = dependencies
+        self.msg_groups = msg_groups
+        self.msg_depth = msg_depth
+        self.messages = messages
+        self.brokers = brokers
+        self.channels = channels
+        self.gateways = gateways
+        self.seed = seed
+
+
+def create_project(path, spec=None):
+    """Creates a synthetic Silvera project in a given directory.
+
+    Args:
+        path (str): project directory, created if it doesn't exist
+        spec (ProjectSpec): size of the project. Default spec is used if not
+            given.
+
+    Returns:
+        str: project directory
+    """
+    spec = spec or ProjectSpec()
+    rnd = random.Random(spec.seed)
+
+    os.makedirs(path, exist_ok=True)
+    open(os.path.join(path, ".silvera-project"), "a").close()
+
+    _write(path, "setup.si", _setup())
+
+    messages, channels = [], []
+    if spec.msg_groups and spec.messages:
+        pool, messages = _msg_pool(spec)
+        brokers, channels = _brokers(spec, messages)
+        _write(path, "messaging.si", pool + brokers)
+
+    services = ["Service%05d" % i for i in range(spec.services)]
+    per_module = -(-spec.services // spec.modules)
+    module_of = {}
+    for m in range(spec.modules):
+        module_services = services[m * per_module:(m + 1) * per_module]
+        if not module_services:
+            break
+        name = "module%04d" % m
+        for s in module_services:
+            module_of[s] = name
+
+        content = _module_imports(spec, module_services, services, module_of,
+                                  channels)
+        for s in module_services:
+            content += _service(spec, rnd, s, services, channels)
+        for s in module_services:
+            content += _dependencies(spec, s, services)
+        _write(path, "%s.si" % name, content)
+
+    if spec.gateways:
+        _write(path, "gateways.si", _gateways(spec, services, module_of))
+
+    return path
+
+
+def _write(path, name, content):
+    with open(os.path.join(path, name), "w") as f:
+        f.write(content)
+
+
+def _setup():
+    return """config-server ConfigServer {
+    search_path="file://${user.home}/config/"
+    deployment {
+        version="0.0.1"
+        port=9090
+    }
+}
+
+service-registry ServiceRegistry {
+    client_mode=False
+    deployment {
+        version="0.0.1"
+        port=9091
+        url="http://localhost"
+    }
+}
+"""
+
+
+def _msg_pool(spec):
+    """Returns message pool and FQNs of all messages."""
+    messages = []
+
+    def group(name, fqn, depth, indent):
+        pad = "    " * indent
+        lines = ["%sgroup %s [" % (pad, name)]
+        for i in range(spec.messages):
+            msg = "Msg%d" % i
+            messages.append("%s.%s" % (fqn, msg))
+            lines.append("%s    msg %s [" % (pad, msg))
+            lines.append("%s        i64 id" % pad)
+            lines.append("%s        str payload" % pad)
+            lines.append("%s    ]" % pad)
+        if depth > 1:
+            sub = "%sSub" % name
+            lines.extend(group(sub, "%s.%s" % (fqn, sub), depth - 1,
+                               indent + 1))
+        lines.append("%s]" % pad)
+        return lines
+
+    lines = ["msg-pool {"]
+    for g in range(spec.msg_groups):
+        name = "Group%d" % g
+        lines.extend(group(name, name, spec.msg_depth, 1))
+    lines.append("}")
+    return "\n".join(lines) + "\n\n", messages
+
+
+def _brokers(spec, messages):
+    """Returns message brokers and (broker, channel, message) for all
+    channels."""
+    channels = []
+    lines = []
+    for b in range(spec.brokers):
+        broker = "Broker%d" % b
+        lines.append("msg-broker %s {" % broker)
+        for c in range(spec.channels):
+            channel = "CHANNEL_%d" % c
+            msg = messages[(b * spec.channels + c) % len(messages)]
+            channels.append((broker, channel, msg))
+            lines.append("    channel %s(%s)" % (channel, msg))
+        lines.append("}")
+        lines.append("")
+    return "\n".join(lines) + "\n", channels
+
+
+def _deps_of(spec, service, services):
+    idx = services.index(service) if isinstance(service, str) else service
+    return services[max(0, idx - spec.dependencies):idx]
+
+
+def _module_imports(spec, module_services, services, module_of, channels):
+    imports = ["setup.si"]
+    if channels:
+        imports.append("messaging.si")
+    for s in module_services:
+        for dep in _deps_of(spec, s, services):
+            dep_module = "%s.si" % module_of[dep]
+            if module_of[dep] != module_of[s] and dep_module not in imports:
+                imports.append(dep_module)
+    return "".join('import "%s"\n' % i for i in imports) + "\n"
+
+
+def _service(spec, rnd, name, services, channels):
+    idx = services.index(name)
+    lines = ["service %s {" % name,
+             "    config_server=ConfigServer",
+             "    service_registry=ServiceRegistry",
+             "",
+             "    deployment {",
+             '        version="0.0.1"',
+             "        port=%d" % (10000 + idx),
+             '        url="http://localhost"',
+             "    }",
+             "",
+             "    api {"]
+
+    typedefs = ["%sType%d" % (name, t) for t in range(spec.typedefs)]
+    for i, t in enumerate(typedefs):
+        lines.append("        @crud" if i == 0 else "")
+        lines.append("        typedef %s [" % t)
+        lines.append("            @id")
+        lines.append("            str id")
+        for f in range(spec.fields - 1):
+            lines.append("            %s field%d" % (rnd.choice(_TYPES), f))
+        lines.append("        ]")
+        lines.append("")
+
+    produced = []
+    if channels:
+        produced = [channels[(idx + i) % len(channels)] for i in range(2)]
+
+    for f in range(spec.functions):
+        kind = f % 4
+        if typedefs:
+            t = typedefs[f % len(typedefs)]
+        else:
+            t = "str"
+        if kind == 0:
+            lines.append("        @rest(method=GET)")
+            lines.append("        %s get%d(str id)" % (t, f))
+        elif kind == 1:
+            lines.append("        @rest(method=GET)")
+            lines.append("        list<%s> list%d()" % (t, f))
+        elif kind == 2:
+            lines.append("        @rest(method=POST)")
+            if f // 4 < len(produced):
+                broker, channel, msg = produced[f // 4]
+                lines.append("        @producer(%s -> %s.%s)" %
+                             (msg, broker, channel))
+            lines.append("        %s create%d(%s item)" % (t, f, t))
+        else:
+            lines.append("        @rest(method=DELETE)")
+            lines.append("        void delete%d(str id)" % f)
+        lines.append("")
+
+    if channels:
+        broker, channel, msg = channels[(idx + len(channels) - 1) %
+                                        len(channels)]
+        lines.append("        internal {")
+        lines.append("            @consumer(%s <- %s.%s)" %
+                     (msg, broker, channel))
+        lines.append("            void consume()")
+        lines.append("        }")
+
+    lines.append("    }")
+    lines.append("}")
+    lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def _dependencies(spec, name, services):
+    lines = []
+    for dep in _deps_of(spec, name, services):
+        lines.append("dependency %s -> %s {" % (name, dep))
+        if spec.functions:
+            lines.append("    get0[fail_fast]")
+        lines.append("}")
+        lines.append("")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _gateways(spec, services, module_of):
+    modules = []
+    for s in services:
+        if module_of[s] not in modules:
+            modules.append(module_of[s])
+    lines = ['import "setup.si"']
+    lines.extend('import "%s.si"' % m for m in modules)
+    lines.append("")
+    for g in range(spec.gateways):
+        lines.append("api-gateway Gateway%d {" % g)
+        lines.append("    service_registry=ServiceRegistry")
+        lines.append("    deployment {")
+        lines.append('        version="0.0.1"')
+        lines.append("        port=%d" % (9100 + g))
+        lines.append('        url="http://localhost"')
+        lines.append("    }")
+        lines.append("    gateway-for {")
+        for i, s in enumerate(services):
+            if i % spec.gateways == g:
+                lines.append("        %s as /api/s%d" % (s, i))
+        lines.append("    }")
+        lines.append("}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Creates a synthetic Silvera project.")
+    parser.add_argument("path", help="project directory")
+    defaults = ProjectSpec()
+    for attr in vars(defaults):
+        parser.add_argument("--%s" % attr.replace("_", "-"), type=int,
+                            default=getattr(defaults, attr))
+    args = vars(parser.parse_args())
+    path = args.pop("path")
+    create_project(path, ProjectSpec(**args))
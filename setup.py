@@ -30,6 +30,10 @@ setup(
               "silvera.lang"],
     include_package_data=True,
     install_requires=["textx", "jinja2", "click"],
+    extras_require={
+        # Needed for `silvera compile --archive out.tar.zst`
+        'zstd': ['zstandard']
+    },
     tests_require=[
         'pytest',
         'openapi_spec_validator'
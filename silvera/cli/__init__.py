@@ -1,9 +1,18 @@
 import click
+import json
 import os
 import silvera.run as runners
 import silvera.generator.generator as gn
 from silvera.generator.registration import collect_generators
+from silvera.generator.output import ArchiveOutput
+from silvera.generator.cache import GenerationCache
+from silvera.generator.profile import TemplateProfiler
+from silvera.timings import collect as collect_timings, phase
+from silvera.trace import record as record_trace
 from silvera import quickstart
+from silvera.diagnostics import error_message
+from silvera.exceptions import SilveraErrors
+from silvera.const import MSG_PER_SERVICE, MSG_SHARED, MSG_PRUNED
 from silvera.evaluation.registration import get_evaluator, FORMAT_STR, \
     collect_evaluators
 
@@ -11,20 +20,30 @@ from silvera.evaluation.registration import get_evaluator, FORMAT_STR, \
 @click.group()
 @click.option('--debug', default=False, is_flag=True,
               help="Debug/trace output.")
+@click.option('--timings', default=False, is_flag=True,
+              help="Show time and memory used by each compilation phase.")
 @click.pass_context
-def silvera(ctx, debug):
+def silvera(ctx, debug, timings):
     ctx.obj = {'debug': debug}
 
+    if timings:
+        result = ctx.with_resource(collect_timings())
+        ctx.call_on_close(lambda: click.echo(result.to_table()))
+
 
 @silvera.command()
 @click.argument('project_dir', type=click.Path(), required=True)
 @click.pass_context
 def check(ctx, project_dir):
-    """Checks if the created model is valid."""
+    """Checks if the created model is valid. Reports all errors found."""
     project_dir = os.path.abspath(project_dir)
 
     try:
-        runners.load(project_dir)
+        runners.load(project_dir, collect_errors=True)
+    except SilveraErrors as ex:
+        for error in ex.errors:
+            click.echo("Error: %s" % error_message(error), err=True)
+        raise click.ClickException("Found %d error(s)." % len(ex.errors))
     except Exception as ex:
         raise click.ClickException(str(ex))
 
@@ -81,12 +100,42 @@ def init(ctx, project_name, registry, registry_port, cfg, cfg_path, cfg_port,
               help='The architecture evaluator name.')
 @click.option('--evaluator-out-format', '-f', default=FORMAT_STR,
               help='The architecture evaluator\'s output format.')
+@click.option('--messages', '-m', default=MSG_PER_SERVICE,
+              type=click.Choice([MSG_PER_SERVICE, MSG_SHARED, MSG_PRUNED]),
+              help='How message classes are generated: inside each service, \
+              in one shared module, or inside each service but only the \
+              ones it uses. Default = per-service')
+@click.option('--plan', 'plan_only', default=False, is_flag=True,
+              help='Only show files that would be generated, without \
+              generating them.')
+@click.option('--jobs', '-j', default=1, type=int,
+              help='Number of worker threads used for rendering. Default = 1')
+@click.option('--archive', '-a', type=click.Path(), default=None,
+              help='Write generated code into an archive (.zip, .tar, \
+              .tar.gz, .tar.bz2, .tar.xz, .tar.zst) instead of the output \
+              dir.')
+@click.option('--cache-dir', type=click.Path(), default=None,
+              envvar='SILVERA_CACHE_DIR',
+              help='Directory of the cache of rendered files, which can be \
+              shared between projects and builds. Default = no cache')
+@click.option('--profile-templates', default=False, is_flag=True,
+              help='Show render count, time and size for each template.')
+@click.option('--profile-json', type=click.Path(), default=None,
+              help='Dump template profile into a JSON file.')
+@click.option('--trace', type=click.Path(), default=None,
+              help='Record compiler activity into a file in Trace Event \
+              Format.')
 @click.pass_context
 def compile(ctx, project_dir, output_dir, rest_strategy, evaluator_name,
-            evaluator_out_format):
+            evaluator_out_format, messages, plan_only, jobs, archive,
+            cache_dir, profile_templates, profile_json, trace):
     """Compiles application code into to provided output directory."""
     project_dir = os.path.abspath(project_dir)
 
+    if trace:
+        tracer = ctx.with_resource(record_trace())
+        ctx.call_on_close(lambda: tracer.dump(trace))
+
     click.echo("Compiling...")
     try:
         click.echo("Loading model...")
@@ -94,26 +143,135 @@ def compile(ctx, project_dir, output_dir, rest_strategy, evaluator_name,
     except Exception as ex:
         raise click.ClickException(str(ex))
 
-    if not output_dir:
+    model.msg_mode = messages
+
+    output = None
+    if archive:
+        # Archive contains the content of the output dir, and the evaluation
+        # report is written next to it.
+        archive = os.path.abspath(archive)
+        output_dir = os.path.dirname(archive)
+        try:
+            output = ArchiveOutput(archive, output_dir)
+        except Exception as ex:
+            raise click.ClickException(str(ex))
+    elif not output_dir:
         output_dir = os.path.join(project_dir, "output")
-        if not os.path.exists(output_dir):
+        if not os.path.exists(output_dir) and not plan_only:
             os.mkdir(output_dir)
     else:
         output_dir = os.path.abspath(output_dir)
 
+    if plan_only:
+        _echo_plan(gn.create_plan(model, output_dir, ctx.obj["debug"]))
+        return
+
+    cache = GenerationCache(cache_dir) if cache_dir else None
+    profiler = TemplateProfiler() \
+        if profile_templates or profile_json else None
+
     try:
         click.echo("Generating code...")
-        gn.generate(model, output_dir)
+        gn.generate(model, output_dir, ctx.obj["debug"], jobs, output, cache,
+                    profiler)
     except Exception as ex:
         import traceback
         traceback.print_exc()
         raise click.ClickException(str(ex))
 
+    if cache:
+        click.echo("Cache: %d hit(s), %d miss(es)" % (cache.hits,
+                                                      cache.misses))
+
+    if profile_templates:
+        click.echo(profiler.to_table())
+    if profile_json:
+        profiler.dump(profile_json)
+
     evaluator = get_evaluator(evaluator_name)
-    evaluator(model, output_dir, evaluator_out_format)
+    with phase("evaluation"):
+        evaluator(model, output_dir, evaluator_out_format)
 
     click.echo("Compilation finished successfully!")
-    click.echo("Project generated in: %s" % output_dir)
+    click.echo("Project generated in: %s" % (archive or output_dir))
+
+
+@silvera.command()
+@click.argument('projects', type=click.Path(exists=True), nargs=-1,
+                required=True)
+@click.option('--output-dir', '-o', type=click.Path(), default=None,
+              help='The dir in which code of each project is generated into \
+              a dir named after the project. Default = "output" dir of each \
+              project.')
+@click.option('--rest-strategy', '-r', default=0,
+              help='Strategy to be applied during REST resolving. \
+              Default = no strategy')
+@click.option('--messages', '-m', default=MSG_PER_SERVICE,
+              type=click.Choice([MSG_PER_SERVICE, MSG_SHARED, MSG_PRUNED]),
+              help='How message classes are generated. Default = per-service')
+@click.option('--workers', '-w', default=1, type=int,
+              help='Number of worker processes. Default = 1')
+@click.option('--jobs', '-j', default=1, type=int,
+              help='Number of worker threads used for rendering of each \
+              project. Default = 1')
+@click.option('--cache-dir', type=click.Path(), default=None,
+              envvar='SILVERA_CACHE_DIR',
+              help='Directory of the cache of rendered files. Default = no \
+              cache')
+@click.option('--report', type=click.Path(), default=None,
+              help='Write status and exit code of each project into a JSON \
+              file.')
+@click.pass_context
+def compile_many(ctx, projects, output_dir, rest_strategy, messages, workers,
+                 jobs, cache_dir, report):
+    """Compiles several projects in one process. PROJECTS are project dirs,
+    or files with a project dir on each line."""
+    project_dirs = []
+    for path in projects:
+        if os.path.isfile(path):
+            project_dirs.extend(runners.read_project_list(path))
+        else:
+            project_dirs.append(path)
+
+    click.echo("Compiling %d project(s)..." % len(project_dirs))
+    try:
+        results = runners.compile_many(project_dirs, output_dir,
+                                       rest_strategy, messages, workers,
+                                       jobs, cache_dir, ctx.obj["debug"])
+    except Exception as ex:
+        raise click.ClickException(str(ex))
+
+    for result in results:
+        status = "OK" if result.ok else "FAILED"
+        click.echo("{:<7} {} ({:.2f}s)".format(status, result.project_dir,
+                                               result.duration))
+        if not result.ok:
+            click.echo("        %s" % result.error)
+
+    if report:
+        with open(report, "w") as f:
+            json.dump([r.to_dict() for r in results], f, indent=2)
+
+    failed = [r for r in results if not r.ok]
+    if failed:
+        raise click.ClickException("%d of %d project(s) failed." %
+                                   (len(failed), len(results)))
+    click.echo("All projects compiled successfully!")
+
+
+def _echo_plan(plan):
+    """Prints files from the generation plan, together with the template
+    used to create them and what will happen with them if generated."""
+    click.echo("Generation plan for: %s" % plan.output_dir)
+    for task in plan:
+        click.echo("{:<10} {} [{}]".format(task.status(),
+                                           plan.relpath(task.path),
+                                           task.label))
+    for generator, decls, _ in plan.opaque:
+        for decl in decls:
+            click.echo("{:<10} {} [generated by {} generator]".format(
+                "?", decl.name, generator.lang_name))
+    click.echo("%d file(s) planned." % len(plan))
 
 
 @silvera.command()
@@ -134,7 +292,8 @@ def evaluate(ctx, project_dir, evaluator_name, evaluator_out_format):
         raise click.ClickException(str(ex))
 
     evaluator = get_evaluator(evaluator_name)
-    evaluator(model, project_dir, evaluator_out_format)
+    with phase("evaluation"):
+        evaluator(model, project_dir, evaluator_out_format)
 
 
 @silvera.command()
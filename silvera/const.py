@@ -12,4 +12,33 @@ HTTP_GET = "GET"
 HTTP_DELETE = "DELETE"
 
 BASIC_TYPES = {"date", "i16", "i32", "i64", "bool", "int", "void", "str",
-               "double", "pwd"}
\ No newline at end of file
+               "double", "pwd"}
+
+# Generation modes for message classes
+MSG_PER_SERVICE = "per-service"
+MSG_SHARED = "shared"
+MSG_PRUNED = "pruned"
+
+# Name of the shared module with message classes (see MSG_SHARED). It is
+# also the name of its Java package and output folder.
+MSG_LIB_NAME = "messages"
+
+# Client-side load balancing strategies
+LB_ROUND_ROBIN = "round_robin"
+LB_RANDOM = "random"
+LB_LEAST_OUTSTANDING = "least_outstanding"
+
+# Policies for tasks rejected by a full executor of @async functions
+REJECT_CALLER_RUNS = "caller_runs"
+REJECT_ABORT = "abort"
+
+# Wire formats of REST calls between services
+WIRE_JSON = "json"
+WIRE_PROTOBUF = "protobuf"
+
+# RPC styles of services
+COMM_REST = "rest"
+COMM_GRPC = "grpc"
+
+# gRPC server of a service instance listens on its port + offset
+GRPC_PORT_OFFSET = 10000
@@ -5,6 +5,9 @@ import os
 # from silvera.const import REST
 import urllib.parse as url_parser
 from collections import defaultdict
+from silvera.const import MSG_PER_SERVICE, LB_ROUND_ROBIN, REJECT_ABORT, \
+    WIRE_JSON, WIRE_PROTOBUF, COMM_GRPC
+from silvera.diagnostics import report
 
 
 def fqn_to_path(fqn):
@@ -22,6 +25,8 @@ class Model:
         self.modules = modules if modules else []
         self.msg_pool = None
         self.msg_brokers = {}
+        # How message classes are generated, see MSG_* in silvera.const
+        self.msg_mode = MSG_PER_SERVICE
 
     def modules_dict(self):
         return {m.path: m for m in self.modules}
@@ -202,6 +207,160 @@ class Deployment:
         self.restart_policy = restart_policy
 
 
+class Executor:
+    """Thread pool that runs @async functions of a service.
+
+    Attributes:
+        name (str): executor name, used in `@async(executor=...)`
+        core_pool (int): number of threads kept in the pool
+        max_pool (int): maximal number of threads in the pool
+        queue_capacity (int): number of calls that wait for a thread before
+            new threads are started
+        rejection (str): what happens with a call when the pool and the queue
+            are full, one of REJECT_* in silvera.const
+    """
+
+    def __init__(self, parent, name=None, core_pool=None, max_pool=None,
+                 queue_capacity=None, rejection=None):
+        super().__init__()
+        self.parent = parent
+        self.name = name
+        self.core_pool = core_pool if core_pool else 3
+        self.max_pool = max_pool if max_pool else max(self.core_pool, 3)
+        self.queue_capacity = queue_capacity if queue_capacity is not None \
+            else 100
+        self.rejection = rejection if rejection else REJECT_ABORT
+
+
+class Concurrency(Executor):
+    """Executors of @async functions of a service. Settings of the default
+    executor, used by functions annotated with just `@async`, are the
+    attributes of this object.
+
+    Attributes:
+        executors (list): named executors
+    """
+
+    def __init__(self, parent, core_pool=None, max_pool=None,
+                 queue_capacity=None, rejection=None, executors=None):
+        super().__init__(parent, None, core_pool, max_pool, queue_capacity,
+                         rejection)
+        self.executors = executors if executors else []
+
+    def get_executor(self, name):
+        """Returns the executor with the given name, or the default executor
+        if name is None.
+
+        Raises:
+            KeyError: if executor is not found
+        """
+        if name is None:
+            return self
+        for e in self.executors:
+            if e.name == name:
+                return e
+        raise KeyError("Executor '%s' not found!" % name)
+
+
+class Dependency:
+    """Dependency between two services: start service calls functions from
+    the API of the end service."""
+
+    def __init__(self, parent, start=None, end=None, http_client=None,
+                 load_balancer=None, fallback_cache=None,
+                 circuit_break_defs=None):
+        super().__init__()
+        self.parent = parent
+        self.start = start
+        self.end = end
+        self.http_client = http_client if http_client else HTTPClient(self)
+        self.load_balancer = load_balancer if load_balancer \
+            else LoadBalancer(self)
+        self.fallback_cache = fallback_cache if fallback_cache \
+            else FallbackCache(self)
+        self.circuit_break_defs = circuit_break_defs if circuit_break_defs \
+            else []
+
+
+class HTTPClient:
+    """Settings of the pooled HTTP client that the start service of a
+    dependency uses to call the end service. Timeouts are in milliseconds.
+    """
+
+    def __init__(self, parent, max_connections=None, max_per_route=None,
+                 connect_timeout=None, read_timeout=None, idle_timeout=None):
+        super().__init__()
+        self.max_connections = max_connections if max_connections else 50
+        self.max_per_route = max_per_route if max_per_route else 20
+        self.connect_timeout = connect_timeout if connect_timeout else 2000
+        self.read_timeout = read_timeout if read_timeout else 10000
+        self.idle_timeout = idle_timeout if idle_timeout else 30000
+
+
+class LoadBalancer:
+    """Settings of the client-side load balancing between instances of the
+    end service of a dependency.
+
+    Attributes:
+        strategy (str): how an instance is chosen for each call, one of
+            LB_* in silvera.const
+        refresh_interval (int): how long the list of instances fetched from
+            the service registry is used before it is fetched again, in
+            milliseconds
+    """
+
+    def __init__(self, parent, strategy=None, refresh_interval=None):
+        super().__init__()
+        self.strategy = strategy if strategy else LB_ROUND_ROBIN
+        self.refresh_interval = refresh_interval if refresh_interval \
+            else 30000
+
+
+class FallbackCache:
+    """Settings of the cache of last successful responses of the end service
+    of a dependency, used by functions with the 'fallback_cache' circuit
+    breaker pattern.
+
+    Attributes:
+        ttl (int): how long a response can be used as a fallback, in seconds
+        max_entries (int): maximal number of responses cached for each
+            function; least recently used responses are evicted first
+    """
+
+    def __init__(self, parent, ttl=None, max_entries=None):
+        super().__init__()
+        self.ttl = ttl if ttl else 300
+        self.max_entries = max_entries if max_entries else 1000
+
+
+class CallPolicy:
+    """Limits of calls to a single function of the end service of a
+    dependency. Times are in milliseconds.
+
+    Attributes:
+        timeout_ms (int): time limit of a call, including its retries and
+            hedged requests
+        max_concurrent (int): maximal number of calls in progress (bulkhead);
+            calls over the limit are rejected
+        retries (int): how many times a failed call is repeated
+        backoff_ms (int): base delay before a retry. Delay is doubled for
+            each retry and randomized (jittered).
+        hedge_after_ms (int): if the call does not complete in this time, a
+            second, hedged request is made and the first response is used.
+            None if requests are not hedged.
+    """
+
+    def __init__(self, parent, timeout_ms=None, max_concurrent=None,
+                 retries=None, backoff_ms=None, hedge_after_ms=None):
+        super().__init__()
+        self.parent = parent
+        self.timeout_ms = timeout_ms if timeout_ms else 1000
+        self.max_concurrent = max_concurrent if max_concurrent else 10
+        self.retries = retries if retries else 0
+        self.backoff_ms = backoff_ms if backoff_ms else 100
+        self.hedge_after_ms = hedge_after_ms if hedge_after_ms else None
+
+
 class MessageBroker:
     """Message broker object.
 
@@ -429,6 +588,8 @@ class ServiceObject(Deployable, DocstringContainer):
 
         # Services upon whom this service depends on.
         self.dependencies = []
+        # Dependency declarations by name of the end service.
+        self.dependency_decls = {}
 
 
 class APIGateway(ServiceObject):
@@ -449,10 +610,15 @@ class ServiceDecl(ServiceObject):
 
     def __init__(self, parent=None, name=None, config_server=None,
                  service_registry=None, deployment=None, comm_style=None,
-                 api=None, extends=None, handlers=None, docstring=None):
+                 api=None, extends=None, handlers=None, docstring=None,
+                 concurrency=None, wire_format=None):
         super().__init__(parent, name, config_server, service_registry,
                          deployment, comm_style, extends, docstring=docstring)
         self.api = api
+        self.concurrency = concurrency
+        # Default wire format of the functions of the service, one of WIRE_*
+        # in silvera.const. None if not set in the service.
+        self.wire_format = wire_format
         self.handlers = handlers
         self.dep_functions = []
         self.dep_typedefs = []
@@ -484,6 +650,47 @@ class ServiceDecl(ServiceObject):
     def domain_objs(self):
         return {obj.name: obj for obj in self.api.typedefs}
 
+    @property
+    def uses_grpc(self):
+        """Returns True if functions of the service are called over gRPC
+        instead of REST."""
+        return self.comm_style == COMM_GRPC
+
+    @property
+    def protobuf_typedefs(self):
+        """Typedefs sent in the protobuf wire format: types of parameters
+        and return values of functions that use the format, together with
+        types of their fields, in order of declaration."""
+        if self.api is None:
+            return []
+        return self._typedefs_used_by(f for f in self.api.functions
+                                      if f.wire_format == WIRE_PROTOBUF)
+
+    @property
+    def grpc_typedefs(self):
+        """Typedefs used by functions of a gRPC service, together with types
+        of their fields, in order of declaration."""
+        if self.api is None or not self.uses_grpc:
+            return []
+        return self._typedefs_used_by(self.api.functions)
+
+    def _typedefs_used_by(self, functions):
+        to_visit = []
+        for f in functions:
+            to_visit.append(f.ret_type)
+            to_visit.extend(p.type for p in f.params)
+
+        used = set()
+        while to_visit:
+            t = to_visit.pop()
+            if isinstance(t, TypedList):
+                to_visit.append(t.type)
+            elif isinstance(t, TypeDef) and t not in used:
+                used.add(t)
+                to_visit.extend(field.type for field in t.fields)
+
+        return [t for t in self.api.typedefs if t in used]
+
     def __str__(self):
         return "ServiceDecl: %s" % self.name
 
@@ -670,6 +877,8 @@ class Function(DocstringContainer):
         self.http_verb = None
         self.cb_pattern = None
         self.cb_fallback = None
+        # Limits of calls to the function from a dependent service
+        self.call_policy = None
         self.annotations = annotations if annotations else []
 
     @property
@@ -747,9 +956,9 @@ class Function(DocstringContainer):
 
         for placeholder in placeholders:
             if placeholder not in {p.name for p in self.params}:
-                raise TypeError("Placeholder '%s' not found in function "
-                                "parameters for mapping '%s'!" %
-                                (placeholder, mapping))
+                self._report_error(
+                    "Placeholder '%s' not found in function parameters for "
+                    "mapping '%s'!" % (placeholder, mapping))
 
         # Look for query parameters in the URL
         parsed = url_parser.urlparse(mapping)
@@ -759,13 +968,86 @@ class Function(DocstringContainer):
 
         for p in url_params:
             if p not in {p.name for p in self.params}:
-                raise TypeError("Query parameter '%s' not found in "
-                                "function parameters" % p)
+                self._report_error(
+                    "Query parameter '%s' not found in function parameters"
+                    % p)
 
         self.rest_path = mapping
 
+    def _report_error(self, msg):
+        # Functions created by the parser know their position in the module
+        module = self.parent.parent.parent if self.parent else None
+        if hasattr(self, "_tx_position") and hasattr(module, "_tx_parser"):
+            linecol = module._tx_parser.pos_to_linecol(self._tx_position)
+            msg = "Error in module {} {}: {}".format(module.path, linecol,
+                                                     msg)
+        report(TypeError(msg))
+
     def is_async(self):
-        return "@async" in self.annotations
+        return self.async_annotation is not None
+
+    @property
+    def async_annotation(self):
+        for ann in self.annotations:
+            if isinstance(ann, AsyncAnnotation):
+                return ann
+        return None
+
+    @property
+    def executor(self):
+        """Name of the executor that runs the function, or None if the
+        function is not async or uses the default executor."""
+        ann = self.async_annotation
+        return ann.executor if ann else None
+
+    @property
+    def cache(self):
+        """Cache annotation of the function, or None if responses of the
+        function are not cached."""
+        for ann in self.annotations:
+            if isinstance(ann, CacheAnnotation):
+                return ann
+        return None
+
+    @property
+    def batchable(self):
+        """Batchable annotation of the function, or None if calls of the
+        function are not batched."""
+        for ann in self.annotations:
+            if isinstance(ann, BatchableAnnotation):
+                return ann
+        return None
+
+    @property
+    def wire_format(self):
+        """Wire format of calls of the function, one of WIRE_* in
+        silvera.const: format from the @wire annotation, or the default
+        format of the service that declares the function."""
+        fn = self.dep if self.dep else self
+        for ann in fn.annotations:
+            if isinstance(ann, WireFormatAnnotation):
+                return ann.format
+        service = fn.parent.parent if fn.parent else None
+        if isinstance(service, ServiceDecl) and service.wire_format:
+            return service.wire_format
+        return WIRE_JSON
+
+    @property
+    def batch_path(self):
+        """REST path of the bulk endpoint of a batchable function."""
+        return "%s/batch" % self.name.lower()
+
+    @property
+    def batch_param(self):
+        """Name of the list of keys taken by the bulk method of a batchable
+        function: name of its single parameter with the 'List' suffix."""
+        return "%sList" % self.params[0].name
+
+    @property
+    def cache_key_params(self):
+        """Parameters that make the cache key: parameters that are URL
+        placeholders or query parameters."""
+        return [p for p in self.params if p.url_placeholder or p.query_param]
 
     def clone(self):
         params = [p.clone() for p in self.params]
@@ -779,6 +1061,7 @@ class Function(DocstringContainer):
         f.http_verb = self.http_verb
         f.cb_pattern = self.cb_pattern
         f.cb_fallback = self.cb_fallback
+        f.call_policy = self.call_policy
         return f
 
     @property
@@ -816,6 +1099,70 @@ class Annotation:
         raise NotImplementedError()
 
 
+class AsyncAnnotation(Annotation):
+
+    def __init__(self, parent, executor=None):
+        super().__init__(parent)
+        self.executor = executor
+
+    def clone(self):
+        return AsyncAnnotation(None, self.executor)
+
+
+class CacheAnnotation(Annotation):
+    """Caches responses of a GET function in the service.
+
+    Attributes:
+        ttl (int): how long a response is cached, in seconds
+        max_entries (int): maximal number of cached responses; least recently
+            used responses are evicted first
+    """
+
+    def __init__(self, parent, ttl=None, max_entries=None):
+        super().__init__(parent)
+        self.ttl = ttl if ttl else 60
+        self.max_entries = max_entries if max_entries else 1000
+
+    def clone(self):
+        return CacheAnnotation(None, self.ttl, self.max_entries)
+
+
+class BatchableAnnotation(Annotation):
+    """Generates a bulk endpoint for a function with a single parameter, and
+    merges concurrent calls of the function from dependent services into
+    calls of the bulk endpoint.
+
+    Attributes:
+        max_batch (int): maximal number of keys in a single bulk call
+        max_wait_ms (int): how long a call waits for other calls to join the
+            batch, in milliseconds
+    """
+
+    def __init__(self, parent, max_batch=None, max_wait_ms=None):
+        super().__init__(parent)
+        self.max_batch = max_batch if max_batch else 100
+        self.max_wait_ms = max_wait_ms if max_wait_ms else 5
+
+    def clone(self):
+        return BatchableAnnotation(None, self.max_batch, self.max_wait_ms)
+
+
+class WireFormatAnnotation(Annotation):
+    """Sets the wire format of calls of a function, overriding the default
+    format of the service.
+
+    Attributes:
+        format (str): one of WIRE_* in silvera.const
+    """
+
+    def __init__(self, parent, format=None):
+        super().__init__(parent)
+        self.format = format
+
+    def clone(self):
+        return WireFormatAnnotation(None, self.format)
+
+
 class RESTAnnotation(Annotation):
 
     def __init__(self, parent, method=None, mapping=None):
@@ -925,6 +1272,18 @@ class TypeField:
     def ordered(self):
         return any({c.ordered for c in self.classifiers})
 
+    @property
+    def tag(self):
+        """Tag of the field in binary wire formats: the explicit field id,
+        or the tag that follows the tag of the previous field (1 for the
+        first field)."""
+        tag = 0
+        for f in self.parent.fields:
+            tag = f.id if f.id else tag + 1
+            if f is self:
+                break
+        return tag
+
 
 class DataType:
 
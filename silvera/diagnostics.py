@@ -0,0 +1,75 @@
+"""
+This module collects errors found while processing a model.
+
+Errors are reported in the code with `report`, which raises the error unless
+errors are being collected with `collect`. While collecting, the error is
+recorded and processing continues where it is safe, so that all errors of a
+model are found in a single load:
+
+    with collect() as diagnostics:
+        model_processor(model)
+
+    for error in diagnostics.errors:
+        print(error_message(error))
+
+Collecting is local to the current thread (and asyncio task), so models
+loaded at the same time in other threads report their errors as usual.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Diagnostics that currently collect errors in this context
+_diagnostics = ContextVar("diagnostics", default=None)
+
+
+class Diagnostics:
+    """Errors reported while collecting, in order in which they were found.
+
+    Attributes:
+        errors (list): reported exceptions
+    """
+    def __init__(self):
+        super().__init__()
+        self.errors = []
+
+    def report(self, error):
+        self.errors.append(error)
+
+
+@contextmanager
+def collect():
+    """Collects errors reported inside the `with` block instead of raising
+    them.
+
+    Yields:
+        Diagnostics
+    """
+    diagnostics = Diagnostics()
+    token = _diagnostics.set(diagnostics)
+    try:
+        yield diagnostics
+    finally:
+        _diagnostics.reset(token)
+
+
+def report(error):
+    """Reports an error. Raises it, unless errors are being collected.
+
+    The caller must leave the model in a state in which processing can
+    continue, e.g. by leaving an unresolved reference as it is.
+
+    Args:
+        error (Exception): error to report
+    """
+    diagnostics = _diagnostics.get()
+    if diagnostics is None:
+        raise error
+    diagnostics.report(error)
+
+
+def error_message(error):
+    """Returns the message of an error. Unlike `str`, message of a KeyError
+    is not quoted."""
+    if isinstance(error, KeyError) and len(error.args) == 1:
+        return str(error.args[0])
+    return str(error)
@@ -1,4 +1,5 @@
 """This module contains exception and error definitions"""
+from silvera.diagnostics import error_message
 
 
 class SilveraTypeError(TypeError):
@@ -12,4 +13,18 @@ class SilveraTypeError(TypeError):
 class SilveraLoadError(Exception):
 
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
\ No newline at end of file
+        super().__init__(*args, **kwargs)
+
+
+class SilveraErrors(SilveraLoadError):
+    """Raised when loading with collected errors finds one or more errors.
+
+    Attributes:
+        errors (list): all errors found, in order in which they were found
+    """
+    def __init__(self, errors):
+        msg = "Found {} error(s):".format(len(errors))
+        for error in errors:
+            msg += "\n{}".format(error_message(error))
+        super().__init__(msg)
+        self.errors = errors
@@ -0,0 +1,371 @@
+"""
+This module contains the content-addressable cache of rendered files.
+
+Rendered file is stored under a key computed from the template (sources of
+all templates available to it, filters and globals of its environment) and
+from the normalized template context. Filters and globals are described by
+the sources of the modules that define them and the functions they call,
+so changes of generator code change the key even if the version does not. The cache can be shared between
+projects and builds, e.g. through a mounted volume, since the key does not
+depend on the project or output paths.
+
+Templates may only depend on their context. The key covers public
+attributes of context objects, but containers (`parent`, `model`) are
+reduced to their names, so data that a template reads through a container,
+or through a property that reads it, is not a part of the key. Generators
+must compute such data (e.g. typedefs sent in the protobuf wire format,
+which depend on the service's `wire_format`) and pass it in the context.
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import types
+import weakref
+from silvera import __version__
+
+# Context values that change on every generation, like the generation time
+# in file headers. They are left out of the cache key: rendered file is
+# stored with a placeholder, which is replaced with the actual value when
+# the file is read from the cache.
+NORMALIZED_KEYS = ("timestamp", )
+
+# Attributes which point to the containing object. Only the names of their
+# containers are used for the key, otherwise the whole model would be part
+# of the key of every file. Templates must not read data through them.
+CONTAINER_ATTRS = ("parent", "model")
+
+_PLACEHOLDER = "\x00silvera-%s\x00"
+
+# Values described by their names and the sources of their code
+_CODE_TYPES = (type, types.FunctionType, types.BuiltinFunctionType,
+               types.MethodType)
+
+# Hashes of template directories by path
+_dir_hashes = {}
+# Hashes of source files by path, modification time and size
+_file_hashes = {}
+# Hashes of jinja2 environments
+_env_hashes = weakref.WeakKeyDictionary()
+
+
+class GenerationCache:
+    """Cache of rendered files in a local directory.
+
+    Attributes:
+        cache_dir (str): path to the cache directory
+        hits (int): number of files read from the cache
+        misses (int): number of files rendered and stored into the cache
+    """
+    def __init__(self, cache_dir):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key[2:])
+
+    def get(self, key):
+        """Returns cached content for the key, or None if not cached."""
+        try:
+            with open(self._path(key)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, content):
+        """Stores content under the key.
+
+        Content is first written to a temporary file, so concurrent builds
+        that share the cache never read a half-written file.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def render(self, task):
+        """Renders the task, or reads its output from the cache.
+
+        Args:
+            task (Task): generation task
+
+        Returns:
+            str
+        """
+        key = task.cache_key()
+        if key is None:
+            return task.render()
+
+        normalized = {k: task.context[k] for k in NORMALIZED_KEYS
+                      if k in task.context}
+
+        content = self.get(key)
+        if content is None:
+            self._count(hit=False)
+            context = dict(task.context)
+            context.update({k: _PLACEHOLDER % k for k in normalized})
+            content = task.render_context(context)
+            self.put(key, content)
+        else:
+            self._count(hit=True)
+
+        for k, value in normalized.items():
+            content = content.replace(_PLACEHOLDER % k, str(value))
+        return content
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+def render_key(env, template_name, context):
+    """Returns the cache key for rendering of a template.
+
+    Args:
+        env (Environment): jinja2 environment that contains the template
+        template_name (str): template name within the environment
+        context (dict): variables for the template
+
+    Returns:
+        str
+    """
+    h = hashlib.sha256()
+    h.update(__version__.encode())
+    h.update(env_hash(env).encode())
+    h.update(template_name.encode())
+    h.update(fingerprint({k: v for k, v in context.items()
+                          if k not in NORMALIZED_KEYS}).encode())
+    return h.hexdigest()
+
+
+def env_hash(env):
+    """Returns hash of all templates, filters, tests and globals of a jinja2
+    environment."""
+    try:
+        return _env_hashes[env]
+    except KeyError:
+        pass
+
+    h = hashlib.sha256()
+    for path in _loader_paths(env.loader):
+        h.update(_dir_hash(path).encode())
+    h.update(fingerprint(env.filters).encode())
+    h.update(fingerprint(env.tests).encode())
+    h.update(fingerprint(env.globals).encode())
+
+    _env_hashes[env] = h.hexdigest()
+    return _env_hashes[env]
+
+
+def _loader_paths(loader):
+    """Returns template directories of a loader."""
+    if hasattr(loader, "loaders"):
+        paths = []
+        for sub_loader in loader.loaders:
+            paths.extend(_loader_paths(sub_loader))
+        return paths
+    if hasattr(loader, "searchpath"):
+        return list(loader.searchpath)
+    raise TypeError("Templates of %s cannot be cached." %
+                    type(loader).__name__)
+
+
+def _dir_hash(path):
+    try:
+        return _dir_hashes[path]
+    except KeyError:
+        pass
+
+    h = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            h.update(os.path.relpath(file_path, path).encode())
+            with open(file_path, "rb") as f:
+                h.update(hashlib.sha256(f.read()).digest())
+
+    _dir_hashes[path] = h.hexdigest()
+    return _dir_hashes[path]
+
+
+def fingerprint(value):
+    """Returns the hash of a value, based on its content.
+
+    Objects are described by their class and their public attributes.
+    References to already visited objects are described by the order in which
+    they were visited, so cyclic references are supported. Sets and dicts are
+    sorted, so the result does not depend on their iteration order.
+
+    Returns:
+        str
+    """
+    h = hashlib.sha256()
+    _Fingerprint(h.update).visit(value)
+    return h.hexdigest()
+
+
+class _Fingerprint:
+    def __init__(self, emit):
+        self.emit = lambda s: emit(s.encode("utf-8", "surrogatepass"))
+        self.visited = {}
+
+    def visit(self, value):
+        emit = self.emit
+        if value is None or isinstance(value, (bool, int, float, str,
+                                               bytes)):
+            emit("%s:%r;" % (type(value).__name__, value))
+            return
+
+        if id(value) in self.visited:
+            emit("@%d;" % self.visited[id(value)])
+            return
+        self.visited[id(value)] = len(self.visited)
+
+        if isinstance(value, (list, tuple)):
+            emit("[")
+            for item in value:
+                self.visit(item)
+            emit("]")
+        elif isinstance(value, (set, frozenset)):
+            emit("{")
+            for item in sorted(fingerprint(item) for item in value):
+                emit(item)
+            emit("}")
+        elif isinstance(value, dict):
+            emit("(")
+            if all(isinstance(k, str) for k in value):
+                items = sorted(value.items(), key=lambda kv: kv[0])
+            else:
+                items = sorted(((fingerprint(k), v)
+                                for k, v in value.items()),
+                               key=lambda kv: kv[0])
+            for k, v in items:
+                emit("%s=" % k)
+                self.visit(v)
+            emit(")")
+        elif isinstance(value, _CODE_TYPES):
+            emit("%s.%s:%s;" % (getattr(value, "__module__", ""),
+                                getattr(value, "__qualname__", repr(value)),
+                                code_hash(value)))
+        elif hasattr(value, "__dict__"):
+            emit("<%s.%s " % (type(value).__module__,
+                              type(value).__qualname__))
+            for k, v in sorted(vars(value).items()):
+                if k.startswith("_"):
+                    continue
+                emit("%s=" % k)
+                if k in CONTAINER_ATTRS:
+                    emit(_container_path(v))
+                else:
+                    self.visit(v)
+            emit(">")
+        else:
+            emit("%s:%r;" % (type(value).__name__, value))
+
+
+def code_hash(value):
+    """Returns hash of the sources of a function or a class: sources of the
+    module that defines it, and of the modules of functions, classes and
+    modules that its code refers to by global names or closure variables,
+    recursively.
+
+    Modules are identified by their names, so the hash does not depend on
+    where the package is installed. Builtins have no sources and are
+    described only by their names.
+
+    Returns:
+        str
+    """
+    modules = set()
+    _collect_modules(value, modules, set())
+    h = hashlib.sha256()
+    for name in sorted(modules):
+        h.update(name.encode())
+        h.update(_file_hash(sys.modules[name].__file__).encode())
+    return h.hexdigest()
+
+
+def _collect_modules(value, modules, visited):
+    if id(value) in visited:
+        return
+    visited.add(id(value))
+
+    if isinstance(value, types.MethodType):
+        value = value.__func__
+    _add_module(getattr(value, "__module__", None), modules)
+
+    if isinstance(value, type):
+        for attr in vars(value).values():
+            if isinstance(attr, (staticmethod, classmethod)):
+                attr = attr.__func__
+            elif isinstance(attr, property):
+                attr = attr.fget
+            if isinstance(attr, types.FunctionType):
+                _collect_modules(attr, modules, visited)
+    elif isinstance(value, types.FunctionType):
+        refs = [_cell_contents(cell) for cell in value.__closure__ or ()]
+        codes = [value.__code__]
+        while codes:
+            code = codes.pop()
+            codes.extend(c for c in code.co_consts
+                         if isinstance(c, types.CodeType))
+            refs.extend(value.__globals__.get(name)
+                        for name in code.co_names)
+        for ref in refs:
+            if isinstance(ref, types.ModuleType):
+                _add_module(ref.__name__, modules)
+            elif isinstance(ref, (type, types.FunctionType)):
+                _collect_modules(ref, modules, visited)
+
+
+def _cell_contents(cell):
+    try:
+        return cell.cell_contents
+    except ValueError:
+        # Variable is not assigned yet
+        return None
+
+
+def _add_module(name, modules):
+    module = sys.modules.get(name) if name else None
+    if getattr(module, "__file__", None):
+        modules.add(name)
+
+
+def _file_hash(path):
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    try:
+        return _file_hashes[key]
+    except KeyError:
+        pass
+
+    with open(path, "rb") as f:
+        _file_hashes[key] = hashlib.sha256(f.read()).hexdigest()
+    return _file_hashes[key]
+
+
+def _container_path(obj):
+    """Returns names of the object and all its containers."""
+    names = []
+    while obj is not None and len(names) < 100:
+        names.append("%s:%s" % (type(obj).__name__,
+                                getattr(obj, "name", None)))
+        obj = getattr(obj, "parent", None)
+    return "/".join(names) + ";"
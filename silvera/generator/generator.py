@@ -2,13 +2,18 @@
 This module contains code generator for Silvera.
 """
 import os
+from collections import OrderedDict
+from itertools import chain
 from jinja2 import Environment
 from jinja2.loaders import FileSystemLoader
-from silvera.generator.registration import generator_for_language
-from silvera.const import HOST_CONTAINER
+from silvera.generator.registration import (generator_for_language,
+                                            GeneratorContext)
+from silvera.generator.plan import GenerationPlan
+from silvera.const import HOST_CONTAINER, MSG_SHARED
 from silvera.openapi.serialization import OpenAPIDump
 from silvera.utils import get_templates_path
 from silvera.generator.platforms import JAVA
+from silvera.timings import phase
 
 
 def compose_entry(decl):
@@ -19,7 +24,8 @@ def compose_entry(decl):
     return res
 
 
-def generate(model, output_dir, debug=False):
+def generate(model, output_dir, debug=False, jobs=1, output=None,
+             cache=None, profiler=None, shared=None):
     """Entry function for code generation.
 
     Iterates over every declaration in the model and calls appropriate code
@@ -29,7 +35,35 @@ def generate(model, output_dir, debug=False):
         model(Model): Silvera model object
         output_dir(str): output directory
         debug (bool): debug flag
+        jobs (int): number of worker threads used for rendering
+        output (Output): where generated files are written. By default, files
+            are written into the output directory.
+        cache (GenerationCache): cache of rendered files
+        profiler (TemplateProfiler): records render time of each template
+        shared (dict): generator data shared with other generation runs
+            (see `GeneratorContext.shared`)
     """
+    with phase("generation"):
+        with phase("planning"):
+            plan = create_plan(model, output_dir, debug, shared)
+        plan.execute(jobs, output, cache, profiler)
+
+
+def create_plan(model, output_dir, debug=False, shared=None):
+    """Creates generation plan for the whole model, without generating
+    anything.
+
+    Args:
+        model(Model): Silvera model object
+        output_dir(str): output directory
+        debug (bool): debug flag
+        shared (dict): generator data shared with other generation runs
+            (see `GeneratorContext.shared`)
+
+    Returns:
+        GenerationPlan
+    """
+    plan = GenerationPlan(output_dir)
 
     compose = {
         "version": "3.6",
@@ -37,54 +71,61 @@ def generate(model, output_dir, debug=False):
     }
     for_compose = lambda x: compose["services"].append(x)
 
+    # Declarations are generated in batches, one for each language, so
+    # generators can share setup between declarations through the context.
+    decls_per_lang = OrderedDict()
+    for_lang = lambda lang, x: decls_per_lang.setdefault(lang, []).append(x)
+
     for module in model.modules:
-        for config_serv in module.config_servers:
-            # Currently, config servers can only work in Java.
-            generator = generator_for_language(JAVA)
-            generator(config_serv, output_dir, debug)
-            if config_serv.host == HOST_CONTAINER:
-                for_compose(config_serv)
-
-        for serv_registry in module.service_registries:
-            # Currently, service registry can only work in Java.
-            generator = generator_for_language(JAVA)
-            generator(serv_registry, output_dir, debug)
-            if serv_registry.host == HOST_CONTAINER:
-                for_compose(serv_registry)
-
-        for gt in module.api_gateways:
-            # Currently, API Gateways can only work in Java.
-            generator = generator_for_language(JAVA)
-            generator(gt, output_dir, debug)
-            if gt.host == HOST_CONTAINER:
-                for_compose(gt)
+        # Currently, config servers, service registries and API Gateways can
+        # only work in Java.
+        for decl in chain(module.config_servers, module.service_registries,
+                          module.api_gateways):
+            for_lang(JAVA, decl)
+            if decl.host == HOST_CONTAINER:
+                for_compose(decl)
 
         for service in module.services:
-            lang = service.lang
-            # port = service.port
-            generator = generator_for_language(lang)
-
-            generator(service, output_dir, debug)
+            for_lang(service.lang, service)
             if service.host == HOST_CONTAINER:
                 for_compose(service)
 
-            OpenAPIDump.dump(service, os.path.join(output_dir, service.name))
+    ctx = GeneratorContext(model, debug, shared)
+    for lang, decls in decls_per_lang.items():
+        generator = generator_for_language(lang)
+        generator.plan_many(decls, output_dir, plan, ctx)
+
+    with phase("openapi"):
+        for module in model.modules:
+            for service in module.services:
+                # API of a gRPC service is described by its protobuf schema
+                if service.uses_grpc:
+                    continue
+                plan.add(OpenAPIDump.task(
+                    service, os.path.join(output_dir, service.name)))
+
+    if model.msg_mode == MSG_SHARED and model.msg_pool:
+        # Currently, shared messages module can only work in Java.
+        from silvera.generator.java_generator import generate_messages_lib
+        generate_messages_lib(model, output_dir, plan)
 
     if compose["services"]:
-        _generate_docker_compose(output_dir, compose)
+        _generate_docker_compose(output_dir, compose, plan)
+
+    return plan
 
 
-def _generate_docker_compose(output_path, d):
+def _generate_docker_compose(output_path, d, plan):
     """Generates docker-compose.yml which is used to start all containers at
     the same time
 
     Args:
         output_path (str): path where file will be generated
         d (dict): data needed for template
+        plan (GenerationPlan): plan to fill
     """
     templates_path = os.path.join(get_templates_path(), JAVA)
     env = Environment(loader=FileSystemLoader(templates_path))
-    template = env.get_template("docker_compose.template")
 
     out = os.path.join(output_path, "docker-compose.yml")
-    template.stream(d).dump(out)
+    plan.render(env, "docker_compose.template", out, d)
@@ -1,144 +1,154 @@
 import os
 import warnings
+import urllib.parse as url_parser
 from datetime import datetime
 from collections import defaultdict
 from jinja2 import Environment, FileSystemLoader
-from silvera.const import HOST_CONTAINER, HTTP_POST
+from silvera.const import HOST_CONTAINER, HTTP_POST, MSG_SHARED, MSG_PRUNED, \
+    GRPC_PORT_OFFSET, MSG_LIB_NAME
 from silvera.core import (CustomType, ConfigServerDecl, ServiceRegistryDecl,
-                          ServiceDecl, APIGateway, TypeDef)
+                          ServiceDecl, APIGateway, TypeDef, TypedList,
+                          TypedSet, TypedDict)
 from silvera.generator.platforms import (
     JAVA, convert_complex_type, get_def_ret_val, is_collection, convert_list_to_array
 )
 from silvera.utils import get_templates_path
 from silvera.generator.registration import GeneratorDesc
-from silvera.generator.project_struct import java_struct, create_if_missing
+from silvera.generator.project_struct import java_struct_dirs
+from silvera.generator.plan import planning
+from silvera.generator.protobuf import (
+    proto_fields, proto_field_type, proto_name, schema_path, grpc_java_package,
+    has_implicit_id
+)
+
+
+# Name and version of the shared messages module (see `generate_messages_lib`)
+MSG_LIB_VERSION = "0.0.1b"
 
 
 def timestamp():
     return "{:%Y-%m-%d %H:%M:%S}".format(datetime.now())
 
 
-def generate_config_server(config_server, output_dir):
+def generate_config_server(config_server, output_dir, plan=None, ctx=None):
 
     templates_path = os.path.join(get_templates_path(), JAVA, "config-server")
-    env = Environment(loader=FileSystemLoader(templates_path))
+    env = get_env(ctx, templates_path)
 
     serv_name = config_server.name
     serv_version = config_server.version
     serv_port = config_server.port
 
-    conf_path = os.path.join(output_dir, serv_name)
-    java_struct(output_dir, serv_name)
+    with planning(output_dir, plan) as plan:
+        conf_path = os.path.join(output_dir, serv_name)
+        plan.add_dirs(java_struct_dirs(output_dir, serv_name))
 
-    d = {
-        "name": serv_name,
-        "port": "${PORT:%s}" % serv_port,
-        "search_path": config_server.search_path,
-        "version": serv_version,
-        "timestamp": timestamp()
-    }
+        d = {
+            "name": serv_name,
+            "port": "${PORT:%s}" % serv_port,
+            "search_path": config_server.search_path,
+            "version": serv_version,
+            "timestamp": timestamp()
+        }
 
-    res_path = os.path.join(conf_path, "src", "main", "resources")
-    if not os.path.exists(res_path):
-        os.mkdir(res_path)
-
-    #
-    # Generate application.properties
-    #
-    application_template = env.get_template("application_properties.template")
-    application_template.stream(d).dump(os.path.join(res_path,
-                                                     "application.properties"))
-    #
-    # Generate pom.xml
-    #
-    pom_template = env.get_template("pom_xml.template")
-    pom_template.stream(d).dump(os.path.join(conf_path, "pom.xml"))
-
-    content_path = os.path.join(conf_path, "src", "main", "java", "com",
-                                "silvera", serv_name)
-    #
-    # Generate {{ServiceRegistryName}}/App.java
-    #
-    app_template = env.get_template("main.template")
-    app_template.stream(d).dump(os.path.join(content_path, "App.java"))
-
-    #
-    # Generate run script
-    #
-    generate_run_script(output_dir, serv_name, serv_version, serv_port)
-
-    if config_server.host == HOST_CONTAINER:
-        # Generate Dockerfile
-        generate_dockerfile(output_dir, serv_name, serv_version, serv_port)
-
-
-def generate_service_registry(serv_registry, output_dir):
+        res_path = os.path.join(conf_path, "src", "main", "resources")
+
+        #
+        # Generate application.properties
+        #
+        plan.render(env, "application_properties.template",
+                    os.path.join(res_path, "application.properties"), d)
+        #
+        # Generate pom.xml
+        #
+        plan.render(env, "pom_xml.template",
+                    os.path.join(conf_path, "pom.xml"), d)
+
+        content_path = os.path.join(conf_path, "src", "main", "java", "com",
+                                    "silvera", serv_name)
+        #
+        # Generate {{ServiceRegistryName}}/App.java
+        #
+        plan.render(env, "main.template",
+                    os.path.join(content_path, "App.java"), d)
+
+        #
+        # Generate run script
+        #
+        generate_run_script(output_dir, serv_name, serv_version, serv_port,
+                            plan=plan, ctx=ctx)
+
+        if config_server.host == HOST_CONTAINER:
+            # Generate Dockerfile
+            generate_dockerfile(output_dir, serv_name, serv_version,
+                                serv_port, plan=plan, ctx=ctx)
+
+
+def generate_service_registry(serv_registry, output_dir, plan=None, ctx=None):
     """Creates Eureka service registry"""
 
     templates_path = os.path.join(get_templates_path(), JAVA, "eureka")
-    env = Environment(loader=FileSystemLoader(templates_path))
+    env = get_env(ctx, templates_path)
 
     reg_name = serv_registry.name
     reg_version = serv_registry.version
     reg_port = serv_registry.port
 
-    java_struct(output_dir, reg_name)
+    with planning(output_dir, plan) as plan:
+        plan.add_dirs(java_struct_dirs(output_dir, reg_name))
 
-    d = {
-        "registry_name": reg_name,
-        "url": serv_registry.url,
-        "port": "${PORT:%s}" % reg_port,
-        "client_mode": "true" if serv_registry.client_mode else "false",
-        "version": reg_version,
-        "timestamp": timestamp()
-    }
+        d = {
+            "registry_name": reg_name,
+            "url": serv_registry.url,
+            "port": "${PORT:%s}" % reg_port,
+            "client_mode": "true" if serv_registry.client_mode else "false",
+            "version": reg_version,
+            "timestamp": timestamp()
+        }
+
+        reg_path = os.path.join(output_dir, reg_name)
+        res_path = os.path.join(reg_path, "src", "main", "resources")
+        #
+        # Generate application.properties
+        #
+        plan.render(env, "eureka_application.template",
+                    os.path.join(res_path, "application.properties"), d)
+
+        #
+        # Generate pom.xml
+        #
+        plan.render(env, "eureka_pom_xml.template",
+                    os.path.join(reg_path, "pom.xml"), d)
 
-    reg_path = os.path.join(output_dir, reg_name)
-    res_path = os.path.join(reg_path, "src", "main", "resources")
-    if not os.path.exists(res_path):
-        os.mkdir(res_path)
-    #
-    # Generate application.properties
-    #
-    application_template = env.get_template("eureka_application.template")
-    application_template.stream(d).dump(os.path.join(res_path,
-                                                     "application.properties"))
-
-    #
-    # Generate pom.xml
-    #
-    pom_template = env.get_template("eureka_pom_xml.template")
-    pom_template.stream(d).dump(os.path.join(reg_path, "pom.xml"))
-
-    content_path = os.path.join(reg_path, "src", "main", "java", "com",
-                                "silvera", reg_name)
-
-    #
-    # Generate {{ServiceRegistryName}}/App.java
-    #
-    app_template = env.get_template("eureka_main.template")
-    app_template.stream(d).dump(os.path.join(content_path, "App.java"))
-
-    #
-    # Generate run script
-    #
-    generate_run_script(output_dir, reg_name, reg_version, reg_port)
-
-    if serv_registry.host == HOST_CONTAINER:
-        # Generate Dockerfile
-        generate_dockerfile(output_dir, reg_name, reg_version, reg_port)
-
-
-def generate_api_gateway(api_gateway, output_dir):
+        content_path = os.path.join(reg_path, "src", "main", "java", "com",
+                                    "silvera", reg_name)
+
+        #
+        # Generate {{ServiceRegistryName}}/App.java
+        #
+        plan.render(env, "eureka_main.template",
+                    os.path.join(content_path, "App.java"), d)
+
+        #
+        # Generate run script
+        #
+        generate_run_script(output_dir, reg_name, reg_version, reg_port,
+                            plan=plan, ctx=ctx)
+
+        if serv_registry.host == HOST_CONTAINER:
+            # Generate Dockerfile
+            generate_dockerfile(output_dir, reg_name, reg_version, reg_port,
+                                plan=plan, ctx=ctx)
+
+
+def generate_api_gateway(api_gateway, output_dir, plan=None, ctx=None):
     """Creates Zuul API Gateway"""
 
     templates_path = os.path.join(get_templates_path(), JAVA, "api-gateway")
-    env = Environment(loader=FileSystemLoader(templates_path))
+    env = get_env(ctx, templates_path)
 
     gname = api_gateway.name
 
-    java_struct(output_dir, gname)
-
     if api_gateway.service_registry:
         reg = api_gateway.service_registry
         reg_url = "%s:%s/eureka" % (reg.url, reg.port)
@@ -159,50 +169,52 @@ def generate_api_gateway(api_gateway, output_dir):
         "user_service_registry": user_service_registry
     }
 
-    gt_path = os.path.join(output_dir, gname)
-    res_path = os.path.join(gt_path, "src", "main", "resources")
-    if not os.path.exists(res_path):
-        os.mkdir(res_path)
-
-    #
-    # Generate application.properties
-    #
-    application_template = env.get_template("application_properties.template")
-    application_template.stream(d).dump(os.path.join(res_path,
-                                                     "application.properties"))
-
-    #
-    # Generate pom.xml
-    #
-    pom_template = env.get_template("pom_xml.template")
-    pom_template.stream(d).dump(os.path.join(gt_path, "pom.xml"))
-
-    content_path = os.path.join(gt_path, "src", "main", "java", "com",
-                                "silvera", gname)
-
-    #
-    # Generate main class: App.java
-    #
-    app_template = env.get_template("main.template")
-    app_template.stream(d).dump(os.path.join(content_path, "App.java"))
-
-    #
-    # Generate run script
-    #
-    generate_run_script(output_dir,
-                        gname,
-                        api_gateway.version,
-                        api_gateway.port)
-
-    if api_gateway.host == HOST_CONTAINER:
-        # Generate Dockerfile
-        generate_dockerfile(output_dir,
+    with planning(output_dir, plan) as plan:
+        plan.add_dirs(java_struct_dirs(output_dir, gname))
+
+        gt_path = os.path.join(output_dir, gname)
+        res_path = os.path.join(gt_path, "src", "main", "resources")
+
+        #
+        # Generate application.properties
+        #
+        plan.render(env, "application_properties.template",
+                    os.path.join(res_path, "application.properties"), d)
+
+        #
+        # Generate pom.xml
+        #
+        plan.render(env, "pom_xml.template",
+                    os.path.join(gt_path, "pom.xml"), d)
+
+        content_path = os.path.join(gt_path, "src", "main", "java", "com",
+                                    "silvera", gname)
+
+        #
+        # Generate main class: App.java
+        #
+        plan.render(env, "main.template",
+                    os.path.join(content_path, "App.java"), d)
+
+        #
+        # Generate run script
+        #
+        generate_run_script(output_dir,
                             gname,
                             api_gateway.version,
-                            api_gateway.port)
+                            api_gateway.port,
+                            plan=plan, ctx=ctx)
+
+        if api_gateway.host == HOST_CONTAINER:
+            # Generate Dockerfile
+            generate_dockerfile(output_dir,
+                                gname,
+                                api_gateway.version,
+                                api_gateway.port,
+                                plan=plan, ctx=ctx)
 
 
-def generate_service(service, output_dir):
+def generate_service(service, output_dir, plan=None, ctx=None):
 
     """Creates Java project with following folder structure:
 
@@ -221,11 +233,11 @@ def generate_service(service, output_dir):
         - pom.xml
     """
     if service.uses_messaging:
-        generator = MsgServiceGenerator(service)
+        generator = MsgServiceGenerator(service, ctx)
     else:
-        generator = RPCServiceGenerator(service)
+        generator = RPCServiceGenerator(service, ctx)
 
-    generator.generate(output_dir)
+    generator.generate(output_dir, plan)
 
 
 class ServiceGenerator:
@@ -233,12 +245,17 @@ class ServiceGenerator:
 
     Attributes:
         service (Service): core service object
+        plan (GenerationPlan): plan that is being filled during generation
+        ctx (GeneratorContext): context shared with other declarations, or
+            None
         _templates_path (str): path to templates used during code generation
     """
-    def __init__(self, service):
+    def __init__(self, service, ctx=None):
         super().__init__()
 
         self.service = service
+        self.plan = None
+        self.ctx = ctx
         self._templates_path = os.path.join(
             get_templates_path(),
             JAVA,
@@ -248,8 +265,26 @@ class ServiceGenerator:
 
         self.model = service.parent.model
 
+    @property
+    def messages_lib(self):
+        """Name of the shared messages module used by the service, or None if
+        message classes are generated inside the service itself."""
+        return None
+
+    @property
+    def messages_pkg(self):
+        """Java package that contains message classes used by the service."""
+        if self.messages_lib:
+            return "com.silvera.%s" % self.messages_lib
+        return "com.silvera.%s.messages" % self.service.name
+
     def _get_env(self):
-        env = Environment(loader=FileSystemLoader(self._templates_path))
+        # Environment depends only on templates, so it is shared between
+        # services. Service-specific values (e.g. `messages_pkg`) are passed
+        # to templates in the render context.
+        return get_env(self.ctx, self._templates_path, self._init_env)
+
+    def _init_env(self, env):
         env.filters["firstupper"] = lambda x: x[0].upper() + x[1:]
         env.filters["firstlower"] = lambda x: x[0].lower() + x[1:]
         env.filters["converttype"] = lambda x: convert_complex_type(JAVA, x)
@@ -262,11 +297,26 @@ class ServiceGenerator:
         env.filters["unfold_function_params_rest"] = lambda x: unfold_function_params(
             JAVA, x)
         env.filters["param_names"] = get_param_names
+        env.filters["executor"] = get_executor_constant
+        env.filters["uses_fallback_cache"] = uses_fallback_cache
+        env.filters["uses_resilience"] = uses_resilience
+        env.filters["uses_hedging"] = uses_hedging
+        env.filters["proto_fields"] = proto_fields
+        env.filters["schema_file"] = schema_path
+        env.filters["proto_name"] = proto_name
+        env.filters["proto_field_type"] = proto_field_type
+        env.filters["grpc_package"] = grpc_java_package
+        env.filters["has_implicit_id"] = has_implicit_id
         env.filters["topics"] = lambda f: ", ".join(
             ['"%s"' % c for c in f.channels]
         )
 
         env.globals["generate_cb_annotation"] = generate_cb_annotation
+        env.globals["resilient_call"] = get_resilient_call
+        env.globals["to_proto"] = to_proto_value
+        env.globals["from_proto"] = from_proto_value
+        env.globals["proto_setter"] = get_proto_setter
+        env.globals["proto_getter"] = get_proto_getter
         env.globals["get_default_for_cb_pattern"] = lambda x: \
             get_default_for_cb_pattern(JAVA, x)
         env.globals["get_rest_call"] = lambda x: get_rest_call(JAVA, x)
@@ -276,8 +326,6 @@ class ServiceGenerator:
 
         env.tests["collection"] = lambda x: is_collection(x)
 
-        return env
-
     def generate_main(self, env, content_path, d):
         """Generate main class: {{ServiceName}}Application.java
 
@@ -286,8 +334,8 @@ class ServiceGenerator:
             content_path (str): path to the parent folder in generated project
             d (dict): dict with variables for templates
         """
-        app_template = env.get_template("main.template")
-        app_template.stream(d).dump(os.path.join(content_path, "App.java"))
+        self.plan.render(env, "main.template",
+                         os.path.join(content_path, "App.java"), d)
 
     def generate_application_properties(self, env, output_dir, d):
         """Generate application.properties
@@ -302,8 +350,6 @@ class ServiceGenerator:
         root = os.path.join(output_dir, service.name)
         res_path = os.path.join(root, "src", "main", "resources")
 
-        application_template = env.get_template("application_properties.template")
-
         if service.config_server:
             d["config_server_uri"] = "http://localhost:%s" % \
                                       service.config_server.port
@@ -313,8 +359,27 @@ class ServiceGenerator:
             url = "%s:%s/eureka" % (reg.url, reg.port)
             d["service_registry_url"] = url
 
-        application_template.stream(d).dump(os.path.join(res_path,
-                                                         "application.properties"))
+        if service.uses_grpc:
+            d["grpc_port"] = "${GRPC_PORT:%s}" % (service.port +
+                                                  GRPC_PORT_OFFSET)
+
+        # Addresses of gRPC servers of dependencies: instances from the
+        # registry, or all instances known from the deployment.
+        d["grpc_clients"] = []
+        for s in service.dependencies:
+            if not s.uses_grpc:
+                continue
+            if s.service_registry:
+                address = "discovery:///%s" % s.name
+            else:
+                host = url_parser.urlparse(s.url).hostname or s.url
+                address = "static://" + ",".join(
+                    "%s:%s" % (host, i.port + GRPC_PORT_OFFSET)
+                    for i in s.parent.service_instances if i.type is s)
+            d["grpc_clients"].append((s.name, address))
+
+        self.plan.render(env, "application_properties.template",
+                         os.path.join(res_path, "application.properties"), d)
 
     def generate_pom_xml(self, env, output_dir, d):
         """Generate pom.xml
@@ -327,8 +392,8 @@ class ServiceGenerator:
         service = self.service
         root = os.path.join(output_dir, service.name)
 
-        pom_template = env.get_template("pom_xml.template")
-        pom_template.stream(d).dump(os.path.join(root, "pom.xml"))
+        self.plan.render(env, "pom_xml.template",
+                         os.path.join(root, "pom.xml"), d)
 
     def generate_config(self, env, content_path):
         """Generate files in config folder
@@ -345,23 +410,53 @@ class ServiceGenerator:
             env (Environment): jinja2 enviroment used during generation.
             content_path (str): path to the parent folder in generated project
         """
-        controller_path = create_if_missing(
-            os.path.join(content_path, "controller")
-        )
+        controller_path = os.path.join(content_path, "controller")
+
+        if self.service.uses_grpc:
+            self.generate_grpc_service(env, content_path)
+            if not self.service.uses_messaging:
+                return
+            # Controller of a messaging service receives messages, too.
 
         controller_data = {
             "service_name": self.service.name,
             "api": self.service.api,
             "timestamp": timestamp(),
             "typedefs": self.get_typedefs(self.service),
-            "consumers_per_message": self.get_consumers_per_message()
+            "consumers_per_message": self.get_consumers_per_message(),
+            "async": self.service.has_async(),
+            "cached_functions": [f for f in self.service.api.functions
+                                 if f.cache],
+            "messages_pkg": self.messages_pkg
         }
-        controller_template = env.get_template(
-            "controller/controller.template")
-        controller_template.stream(controller_data).dump(
-            os.path.join(controller_path,
-                         self.service.name + "Controller.java")
-        )
+        self.plan.render(env, "controller/controller.template",
+                         os.path.join(controller_path,
+                                      self.service.name + "Controller.java"),
+                         controller_data)
+
+        if controller_data["cached_functions"]:
+            self.plan.render(env, "controller/response_cache.template",
+                             os.path.join(controller_path,
+                                          "ResponseCache.java"),
+                             controller_data)
+
+    def generate_grpc_service(self, env, content_path):
+        """Generate gRPC endpoints of the service, used instead of the REST
+        controller.
+
+        Args:
+            env (Environment): jinja2 enviroment used during generation.
+            content_path (str): path to the parent folder in generated project
+        """
+        service = self.service
+        self.plan.render(env, "grpc/grpc_service.template",
+                         os.path.join(content_path, "grpc",
+                                      service.name + "GrpcService.java"),
+                         {"service_name": service.name,
+                          "api": service.api,
+                          "async": service.has_async(),
+                          "mapper": service.name + "ProtoMapper",
+                          "timestamp": timestamp()})
 
     def generate_domain_model(self, env, content_path):
         """Generate domain model
@@ -370,8 +465,8 @@ class ServiceGenerator:
             env (Environment): jinja2 enviroment used during generation.
             content_path (str): path to the parent folder in generated project
         """
-        domain_path = create_if_missing(os.path.join(content_path, "domain"))
-        model_path = create_if_missing(os.path.join(domain_path, "model"))
+        domain_path = os.path.join(content_path, "domain")
+        model_path = self.plan.add_dir(os.path.join(domain_path, "model"))
 
         api = self.service.api
 
@@ -392,15 +487,13 @@ class ServiceGenerator:
                 "id_attr": id_attr,
                 "timestamp": timestamp()
             }
-            class_template = env.get_template("domain/class.template")
-            class_template.stream(data).dump(os.path.join(model_path,
-                                             typedef.name + ".java"))
+            self.plan.render(env, "domain/class.template",
+                             os.path.join(model_path, typedef.name + ".java"),
+                             data)
 
         if self.service.dep_typedefs:
             # domain dependency classes
-            dependencies_path = create_if_missing(
-                os.path.join(domain_path, "dependencies")
-            )
+            dependencies_path = os.path.join(domain_path, "dependencies")
             for typedef in self.service.dep_typedefs:
                 data = {
                     "dependency": True,
@@ -409,10 +502,10 @@ class ServiceGenerator:
                     "attributes": typedef.fields,
                     "timestamp": timestamp()
                 }
-                class_template = env.get_template("domain/class.template")
-                class_template.stream(data).dump(
-                    os.path.join(dependencies_path, typedef.name + ".java")
-                )
+                self.plan.render(env, "domain/class.template",
+                                 os.path.join(dependencies_path,
+                                              typedef.name + ".java"),
+                                 data)
 
     def generate_repositories(self, env, content_path):
         """Generate repository folder
@@ -421,7 +514,8 @@ class ServiceGenerator:
             env (Environment): jinja2 enviroment used during generation.
             content_path (str): path to the parent folder in generated project
         """
-        repo_path = create_if_missing(os.path.join(content_path, "repository"))
+        repo_path = self.plan.add_dir(os.path.join(content_path,
+                                                   "repository"))
 
         api = self.service.api
 
@@ -438,9 +532,10 @@ class ServiceGenerator:
                 "typedef": typedef.name,
                 "id_datatype": id_datatype
             }
-            class_template = env.get_template("repository/repository.template")
-            class_template.stream(data).dump(os.path.join(repo_path,
-                                             typedef.name + "Repository.java"))
+            self.plan.render(env, "repository/repository.template",
+                             os.path.join(repo_path,
+                                          typedef.name + "Repository.java"),
+                             data)
 
     def generate_services(self, env, content_path):
         """Generate services
@@ -449,14 +544,14 @@ class ServiceGenerator:
             env (Environment): jinja2 enviroment used during generation.
             content_path (str): path to the parent folder in generated project
         """
-        service_path = create_if_missing(os.path.join(content_path, "service"))
+        service_path = os.path.join(content_path, "service")
         service = self.service
         service_name = service.name
 
         typedefs = self.get_typedefs(service)
 
         # base service
-        base_path = create_if_missing(os.path.join(service_path, "base"))
+        base_path = os.path.join(service_path, "base")
         service_data = {
             "service_name": service_name,
             "package_name": service_name,
@@ -467,36 +562,39 @@ class ServiceGenerator:
             "consumers": service.f_consumers,
             "produced_msgs": self.get_produced_msgs(),
             "consumed_msgs": self.get_consumed_msgs(),
-            "consumers_per_message": self.get_consumers_per_message()
+            "consumers_per_message": self.get_consumers_per_message(),
+            "async": service.has_async(),
+            "messages_pkg": self.messages_pkg
         }
 
-        base_template = env.get_template("service/service_interface.template")
-        base_template.stream(service_data).dump(
-            os.path.join(base_path, "I" + service_name + "Service.java")
-        )
+        self.plan.render(env, "service/service_interface.template",
+                         os.path.join(base_path,
+                                      "I" + service_name + "Service.java"),
+                         service_data)
 
-        # impl service
-        impl_path = create_if_missing(os.path.join(service_path, "impl"))
+        # impl service, preserved between compilations
+        impl_path = os.path.join(service_path, "impl")
         impl_file = os.path.join(impl_path, service_name + "Service.java")
-        if not os.path.exists(impl_file):
-            impl_template = env.get_template("service/service.template")
-            impl_template.stream(service_data).dump(impl_file)
+        self.plan.render(env, "service/service.template", impl_file,
+                         service_data, overwrite=False)
 
         if service.dependencies:
             self.generate_serv_dependencies(env, service, content_path)
 
     def generate_serv_dependencies(self, env, service, content_path):
         dp_path = os.path.join(content_path, "service", "dependencies")
-        create_if_missing(dp_path)
 
         fns_by_service = defaultdict(list)
         use_circuit_breaker = False
         for fn in service.dep_functions:
-            if fn.cb_pattern not in {None, "fail_fast"}:
+            if fn.cb_pattern not in {None, "fail_fast"} or fn.call_policy:
                 use_circuit_breaker = True
             fns_by_service[fn.service_name].append(fn)
 
         for s in service.dependencies:
+            dependency = service.dependency_decls[s.name]
+            template = "service/grpc_client.template" if s.uses_grpc \
+                else "service/dependency_service.template"
             s_data = {
                 "service_name": s.name,
                 "package_name": service.name,
@@ -505,13 +603,172 @@ class ServiceGenerator:
                 "use_circuit_breaker": use_circuit_breaker,
                 "timestamp": timestamp(),
                 "uses_registry": True if s.service_registry else False,
-                "service_url": "%s:%s" % (s.url, s.port)
+                "load_balancer": dependency.load_balancer,
+                "fallback_cache": dependency.fallback_cache,
+                "uses_async": any(f.is_async()
+                                  for f in fns_by_service[s.name]),
+                "uses_async_policy": any(f.is_async() and f.call_policy
+                                         for f in fns_by_service[s.name]),
+                "uses_batching": any(f.batchable
+                                     for f in fns_by_service[s.name]),
+                "uses_hedging": any(uses_hedging(f)
+                                    for f in fns_by_service[s.name]),
+                # Statically known instances, used without a registry
+                "instance_urls": ["%s:%s" % (s.url, i.port)
+                                  for i in s.parent.service_instances
+                                  if i.type is s],
+                "mapper": s.name + "ProtoMapper"
             }
-            service_template = env.get_template(
-                "service/dependency_service.template")
-            service_template.stream(s_data).dump(
-                os.path.join(dp_path,
-                             s.name + "Client.java"))
+            self.plan.render(env, template,
+                             os.path.join(dp_path, s.name + "Client.java"),
+                             s_data)
+
+        # gRPC clients use channels of the gRPC starter instead of the load
+        # balancer and HTTP clients.
+        rest_dependencies = [service.dependency_decls[s.name]
+                             for s in service.dependencies
+                             if not s.uses_grpc]
+        if rest_dependencies:
+            self.plan.render(env, "service/load_balancer.template",
+                             os.path.join(dp_path, "LoadBalancer.java"),
+                             {"package_name": service.name,
+                              "timestamp": timestamp()})
+
+        if any(f.batchable for f in service.dep_functions):
+            self.plan.render(env, "service/batch_loader.template",
+                             os.path.join(dp_path, "BatchLoader.java"),
+                             {"package_name": service.name,
+                              "timestamp": timestamp()})
+
+        if any(uses_resilience(f) for f in service.dep_functions):
+            self.plan.render(env, "service/resilience.template",
+                             os.path.join(dp_path, "Resilience.java"),
+                             {"package_name": service.name,
+                              "timestamp": timestamp()})
+
+        if any(uses_fallback_cache(f) for f in service.dep_functions):
+            self.plan.render(env, "service/fallback_cache.template",
+                             os.path.join(dp_path, "FallbackCache.java"),
+                             {"package_name": service.name,
+                              "timestamp": timestamp()})
+
+        if not rest_dependencies:
+            return
+
+        # HTTP clients used by the dependency clients
+        cfg_data = {
+            "service_name": service.name,
+            "package_name": service.name,
+            "dependencies": rest_dependencies,
+            "async_dependencies": {f.service_name
+                                   for f in service.dep_functions
+                                   if f.is_async()},
+            "protobuf_typedefs": self.get_dep_protobuf_typedefs(),
+            "timestamp": timestamp()
+        }
+        self.plan.render(env, "config/http_client_config.template",
+                         os.path.join(content_path, "config",
+                                      "HttpClientConfig.java"),
+                         cfg_data)
+
+    def get_dep_protobuf_typedefs(self):
+        """Returns typedefs of each dependency that are sent in the protobuf
+        wire format to the service, by dependency name.
+
+        Returns:
+            dict
+        """
+        service = self.service
+        return {s.name: [t for t in s.protobuf_typedefs
+                         if t in service.dep_typedefs]
+                for s in service.dependencies}
+
+    def generate_wire_format(self, env, output_dir, content_path):
+        """Generate protobuf schemas and converters of types that the
+        service sends or receives in the protobuf wire format.
+
+        Args:
+            env (Environment): jinja2 enviroment used during generation.
+            output_dir (str): path to the output dir
+            content_path (str): path to the parent folder in generated project
+        """
+        service = self.service
+        res_path = os.path.join(output_dir, service.name, "src", "main",
+                                "resources")
+        cfg_path = os.path.join(content_path, "config")
+
+        # Schemas of all services whose types are sent: service's own types
+        # and types of its dependencies.
+        dep_typedefs = self.get_dep_protobuf_typedefs()
+        schemas = [s for s in service.dependencies if dep_typedefs[s.name]]
+        if service.protobuf_typedefs:
+            schemas.append(service)
+        if not schemas:
+            return
+
+        for s in schemas:
+            self.plan.render(env, "proto_schema.template",
+                             os.path.join(res_path, schema_path(s.name)),
+                             {"service_name": s.name,
+                              "typedefs": s.protobuf_typedefs,
+                              "timestamp": timestamp()})
+
+        d = {
+            "package_name": service.name,
+            "schema_file": schema_path(service.name),
+            "typedefs": service.protobuf_typedefs,
+            "timestamp": timestamp()
+        }
+        self.plan.render(env, "config/protobuf_converter.template",
+                         os.path.join(cfg_path, "ProtobufConverter.java"), d)
+        if service.protobuf_typedefs:
+            self.plan.render(env, "config/wire_format_config.template",
+                             os.path.join(cfg_path, "WireFormatConfig.java"),
+                             d)
+
+    def generate_grpc(self, env, output_dir, content_path):
+        """Generate gRPC schemas of the service and of its dependencies that
+        use gRPC, and mappers between domain classes and protobuf messages.
+
+        Java classes of messages and stubs are generated from schemas by the
+        protobuf maven plugin during the build.
+
+        Args:
+            env (Environment): jinja2 enviroment used during generation.
+            output_dir (str): path to the output dir
+            content_path (str): path to the parent folder in generated project
+        """
+        service = self.service
+        proto_path = os.path.join(output_dir, service.name, "src", "main",
+                                  "proto")
+
+        # Mapped typedefs and their domain package, by service
+        schemas = [(s, [t for t in s.grpc_typedefs
+                        if t in service.dep_typedefs],
+                    "com.silvera.%s.domain.dependencies" % service.name)
+                   for s in service.dependencies if s.uses_grpc]
+        if service.uses_grpc:
+            schemas.append((service, service.grpc_typedefs,
+                            "com.silvera.%s.domain.model" % service.name))
+
+        for s, typedefs, domain_package in schemas:
+            self.plan.render(env, "proto_schema.template",
+                             os.path.join(proto_path, s.name + ".proto"),
+                             {"service_name": s.name,
+                              "typedefs": s.grpc_typedefs,
+                              "functions": s.api.functions,
+                              "timestamp": timestamp()})
+
+            mapper = s.name + "ProtoMapper"
+            self.plan.render(env, "grpc/proto_mapper.template",
+                             os.path.join(content_path, "grpc",
+                                          mapper + ".java"),
+                             {"package_name": service.name,
+                              "service_name": s.name,
+                              "mapper": mapper,
+                              "domain_package": domain_package,
+                              "typedefs": typedefs,
+                              "timestamp": timestamp()})
 
     def get_typedefs(self, service):
         """For given service returns type with typedef names and type of the
@@ -585,14 +842,19 @@ class ServiceGenerator:
         generate_run_script(output_dir,
                             self.service.name,
                             self.service.version,
-                            self.service.port)
+                            self.service.port,
+                            self.messages_lib,
+                            plan=self.plan,
+                            ctx=self.ctx)
 
         if self.service.host == HOST_CONTAINER:
             # Generate Dockerfile
             generate_dockerfile(output_dir,
                                 self.service.name,
                                 self.service.version,
-                                self.service.port)
+                                self.service.port,
+                                plan=self.plan,
+                                ctx=self.ctx)
 
             # # Copy wait-for-it.sh
             # from shutil import copy2
@@ -600,27 +862,47 @@ class ServiceGenerator:
             #                    "wait-for-it.sh")
             # copy2(src, root)
 
-    def generate(self, output_dir):
+    def generate(self, output_dir, plan=None):
         """Generate service application.
 
         Args:
             output_dir (str): path to the output dir
+            plan (GenerationPlan): plan to fill. If not given, service
+                is generated right away.
         """
+        with planning(output_dir, plan) as plan:
+            self.plan = plan
+            self._generate(output_dir)
+
+    def _generate(self, output_dir):
         env = self._get_env()
 
         service = self.service
         service_name = service.name
 
-        java_struct(output_dir, service_name)
+        self.plan.add_dirs(java_struct_dirs(output_dir, service_name))
         root = os.path.join(output_dir, service_name)
 
+        grpc_deps = {s.name for s in service.dependencies if s.uses_grpc}
         d = {
             "service_name": service.name,
             "service_port": "${PORT:%s}" % service.port,
             "service_version": service.version,
             "use_circuit_breaker": len(service.dependencies) > 0,
+            # HTTP clients are used only by REST dependencies
+            "has_rest_dependencies": any(not s.uses_grpc
+                                         for s in service.dependencies),
+            "uses_async_clients": any(f.is_async()
+                                      for f in service.dep_functions
+                                      if f.service_name not in grpc_deps),
+            "uses_protobuf": bool(service.protobuf_typedefs) or any(
+                self.get_dep_protobuf_typedefs().values()),
+            "uses_grpc": service.uses_grpc or any(
+                s.uses_grpc for s in service.dependencies),
             "timestamp": timestamp(),
-            "uses_registry": service.service_registry is not None
+            "uses_registry": service.service_registry is not None,
+            "messages_lib": self.messages_lib,
+            "messages_lib_version": MSG_LIB_VERSION
         }
 
         # Generate root files
@@ -638,6 +920,8 @@ class ServiceGenerator:
         self.generate_controllers(env, content_path)
         self.generate_services(env, content_path)
         self.generate_messages(env, content_path)
+        self.generate_wire_format(env, output_dir, content_path)
+        self.generate_grpc(env, output_dir, content_path)
 
         self.generate_run_script(output_dir)
 
@@ -650,16 +934,27 @@ class RPCServiceGenerator(ServiceGenerator):
 
         # Generate {{ServiceName}}AsyncConfiguration.java, if needed
         if self.service.has_async():
-            cfg_template = env.get_template("config/config.template")
+            d = dict(d, concurrency=self.service.concurrency)
             cfg_name = self.service.name + "AsyncConfiguration.java"
-            cfg_template.stream(d).dump(os.path.join(content_path, cfg_name))
+            self.plan.render(env, "config/config.template",
+                             os.path.join(content_path, cfg_name), d)
+            self.plan.render(env, "config/async_config.template",
+                             os.path.join(content_path, "AsyncConfig.java"),
+                             d)
 
 
 class MsgServiceGenerator(ServiceGenerator):
     """Generates code for service that uses messaging as a style of
        communication."""
+
+    @property
+    def messages_lib(self):
+        if self.model.msg_mode == MSG_SHARED:
+            return MSG_LIB_NAME
+        return None
+
     def generate_config(self, env, content_path):
-        cfg_path = create_if_missing(os.path.join(content_path, "config"))
+        cfg_path = os.path.join(content_path, "config")
 
         def get_produced_msgs(service):
             """Returns the list of message FQN produced by the service."""
@@ -679,11 +974,12 @@ class MsgServiceGenerator(ServiceGenerator):
             "timestamp": timestamp(),
             "produced_msgs": get_produced_msgs(self.service),
             "consumed_msgs": consumed_msgs,
-            "consumed_channels": consumed_channels
+            "consumed_channels": consumed_channels,
+            "messages_pkg": self.messages_pkg
         }
 
-        msg_template = env.get_template("config/kafka_config.template")
-        msg_template.stream(d).dump(os.path.join(cfg_path, "KafkaConfig.java"))
+        self.plan.render(env, "config/kafka_config.template",
+                         os.path.join(cfg_path, "KafkaConfig.java"), d)
 
         # NOTE: This probably is not needed, for now.
         # if consumed_msgs:
@@ -696,55 +992,170 @@ class MsgServiceGenerator(ServiceGenerator):
         #                               "MessageDeserializer.java"))
 
     def generate_messages(self, env, content_path):
-        msg_path = create_if_missing(os.path.join(content_path, "messages"))
+        if self.messages_lib:
+            # Message classes are generated once, in the shared module.
+            return
 
-        d = {
-            "package_name": self.service.name,
-            "timestamp": timestamp()
-        }
+        msg_path = os.path.join(content_path, "messages")
 
-        msg_template = env.get_template("message/message.template")
-        msg_template.stream(d).dump(os.path.join(msg_path, "Message.java"))
+        messages = None
+        if self.model.msg_mode == MSG_PRUNED:
+            messages = self.get_used_messages()
 
-        ann_template = env.get_template("message/message_annotation.template")
-        ann_template.stream(d).dump(os.path.join(msg_path,
-                                                 "MessageAnnotation.java"))
+        generate_message_classes(env, self.plan, msg_path,
+                                 self.model.msg_pool.groups,
+                                 self.messages_pkg, messages)
 
-        field_template = env.get_template("message/message_field.template")
-        field_template.stream(d).dump(os.path.join(msg_path,
-                                                   "MessageField.java"))
+    def get_used_messages(self):
+        """Returns the set of messages that the service produces or consumes,
+        together with all messages referenced from their fields.
 
-        class_template = env.get_template("message/class.template")
+        Returns:
+            set
+        """
+        service = self.service
+        pool = {m.fqn: m for m in self.model.msg_pool.messages}
 
-        msg_pool = self.model.msg_pool
+        to_visit = list(service.produces) + list(service.consumes)
+        for t in service.api.typedefs:
+            to_visit.extend(pool[v[0]] for v in t.event_for.values())
 
-        def create_package(group, path, parent_pkg="messages"):
-            """
-            Creates a package for given message group, and generates
-            its messages as Java classes
-            """
-            group_name = group.name.lower()
-            curr_path = create_if_missing(os.path.join(path, group_name))
+        result = set()
+        while to_visit:
+            msg = to_visit.pop()
+            if msg in result:
+                continue
+            result.add(msg)
 
-            curr_pkg = "%s.%s" % (parent_pkg, group_name)
-            for msg in group.messages:
-                d.update({
-                    "service_name": self.service.name,
-                    "pkg": curr_pkg,
-                    "name": msg.name,
-                    "fqn": msg.fqn,
-                    "attributes": msg.fields
-                })
-                class_name = "%s.java" % msg.name
-                class_template.stream(d).dump(os.path.join(curr_path,
-                                                           class_name))
+            group_fqn = msg.parent.fqn
+            for field in msg.fields:
+                for type_name in _field_type_names(field.type):
+                    ref = pool.get(type_name,
+                                   pool.get("%s.%s" % (group_fqn, type_name)))
+                    if ref is not None:
+                        to_visit.append(ref)
+
+        return result
+
+
+def _field_type_names(field_type):
+    """Returns names of all custom types used by a message field type."""
+    if isinstance(field_type, str):
+        return [field_type]
+    if isinstance(field_type, (TypedList, TypedSet)):
+        return _field_type_names(field_type.type)
+    if isinstance(field_type, TypedDict):
+        return _field_type_names(field_type.key_type) + \
+            _field_type_names(field_type.value_type)
+    return []
+
+
+def generate_message_classes(env, plan, msg_path, groups, messages_pkg,
+                             messages=None):
+    """Generates message classes for given message groups.
+
+    Base classes (Message, MessageAnnotation, MessageField) are generated
+    in `msg_path`, while each group becomes a package inside it.
+
+    Args:
+        env (Environment): jinja2 environment with messaging templates.
+        plan (GenerationPlan): plan to fill
+        msg_path (str): path to the root messages package
+        groups (list): list of MessageGroup objects
+        messages_pkg (str): Java package of the root messages package
+        messages (set): if given, only these messages (and the groups that
+            contain them) will be generated
+    """
+    d = {
+        "messages_pkg": messages_pkg,
+        "timestamp": timestamp()
+    }
+
+    plan.render(env, "message/message.template",
+                os.path.join(msg_path, "Message.java"), d)
+    plan.render(env, "message/message_annotation.template",
+                os.path.join(msg_path, "MessageAnnotation.java"), d)
+    plan.render(env, "message/message_field.template",
+                os.path.join(msg_path, "MessageField.java"), d)
+
+    def is_used(group):
+        """Checks if group (or any of its subgroups) contains a message
+        that should be generated."""
+        if messages is None:
+            return True
+        return any(m in messages for m in group.messages) or \
+            any(is_used(g) for g in group.groups)
+
+    def create_package(group, path, parent_pkg=None):
+        """
+        Creates a package for given message group, and generates
+        its messages as Java classes
+        """
+        if not is_used(group):
+            return
+
+        group_name = group.name.lower()
+        curr_path = plan.add_dir(os.path.join(path, group_name))
+
+        curr_pkg = "%s.%s" % (parent_pkg, group_name) if parent_pkg \
+            else group_name
+        for msg in group.messages:
+            if messages is not None and msg not in messages:
+                continue
+            d.update({
+                "pkg": curr_pkg,
+                "name": msg.name,
+                "fqn": msg.fqn,
+                "attributes": msg.fields
+            })
+            class_name = "%s.java" % msg.name
+            plan.render(env, "message/class.template",
+                        os.path.join(curr_path, class_name), d)
+
+        for g in group.groups:
+            create_package(g, curr_path, curr_pkg)
+
+    # Groups will be packages
+    for group in groups:
+        create_package(group, msg_path)
+
+
+def generate_messages_lib(model, output_dir, plan=None):
+    """Creates a Maven module with message classes for all messages from the
+    message pool. Services that use messaging depend on this module instead
+    of generating their own copy of the message pool.
+
+    Args:
+        model (Model): Silvera model object
+        output_dir (str): output directory
+        plan (GenerationPlan): plan to fill. If not given, module is
+            generated right away.
+    """
+    templates_path = os.path.join(get_templates_path(), JAVA)
+    env = Environment(loader=FileSystemLoader(
+        [os.path.join(templates_path, "service", "messaging"),
+         os.path.join(templates_path, "messages")]))
+    env.filters["firstupper"] = lambda x: x[0].upper() + x[1:]
+    env.filters["converttype"] = lambda x: convert_complex_type(JAVA, x)
+    env.tests["collection"] = lambda x: is_collection(x)
+
+    lib_path = os.path.join(output_dir, MSG_LIB_NAME)
+
+    d = {
+        "name": MSG_LIB_NAME,
+        "version": MSG_LIB_VERSION,
+        "timestamp": timestamp()
+    }
 
-            for g in group.groups:
-                create_package(g, curr_path, curr_pkg)
+    with planning(output_dir, plan) as plan:
+        plan.add_dirs(java_struct_dirs(output_dir, MSG_LIB_NAME))
+        plan.render(env, "pom_xml.template",
+                    os.path.join(lib_path, "pom.xml"), d)
 
-        # Groups will be packages
-        for group in msg_pool.groups:
-            create_package(group, msg_path)
+        msg_path = os.path.join(lib_path, "src", "main", "java", "com",
+                                "silvera", MSG_LIB_NAME)
+        generate_message_classes(env, plan, msg_path, model.msg_pool.groups,
+                                 "com.silvera.%s" % MSG_LIB_NAME)
 
 
 _obj_to_fnc = {
@@ -755,6 +1166,34 @@ _obj_to_fnc = {
 }
 
 
+def get_env(ctx, templates_path, init=None):
+    """Returns jinja2 environment for templates from a given path.
+
+    If generator context is given, environment is created only once and
+    shared by all declarations generated with that context (and by all
+    generation runs that share its `shared` data), so templates are loaded
+    and compiled only once.
+
+    Args:
+        ctx (GeneratorContext): generator context, or None
+        templates_path (str): path to templates
+        init (callable): called with a new environment, e.g. to register
+            filters and globals. It must not depend on the declaration,
+            since the environment is shared.
+
+    Returns:
+        Environment
+    """
+    envs = ctx.shared.setdefault("java.envs", {}) if ctx else {}
+    env_key = (templates_path, init.__qualname__ if init else None)
+    if env_key not in envs:
+        env = Environment(loader=FileSystemLoader(templates_path))
+        if init:
+            init(env)
+        envs[env_key] = env
+    return envs[env_key]
+
+
 def generate(decl, output_dir, debug):
     """Java 1.8 code generator.
 
@@ -762,8 +1201,50 @@ def generate(decl, output_dir, debug):
         decl(Decl): can be declaration of service, registry or config server.
         output_dir(str): output directory
     """
+    with planning(output_dir) as plan:
+        plan_generation(decl, output_dir, plan, debug)
+
+
+def plan_generation(decl, output_dir, plan, debug):
+    """Adds everything that Java code generator creates for a given
+    declaration to the generation plan.
+
+    Args:
+        decl(Decl): can be declaration of service, registry or config server.
+        output_dir(str): output directory
+        plan(GenerationPlan): plan to fill
+    """
     fnc = _obj_to_fnc[decl.__class__]
-    fnc(decl, output_dir)
+    fnc(decl, output_dir, plan)
+
+
+def generate_many(decls, output_dir, ctx):
+    """Generates code for a list of declarations which share the generator
+    context.
+
+    Args:
+        decls(list): declarations of services, registries or config servers.
+        output_dir(str): output directory
+        ctx(GeneratorContext): generator context
+    """
+    with planning(output_dir) as plan:
+        plan_many(decls, output_dir, plan, ctx)
+
+
+def plan_many(decls, output_dir, plan, ctx):
+    """Adds everything that Java code generator creates for given
+    declarations to the generation plan. Template environments are shared
+    between declarations.
+
+    Args:
+        decls(list): declarations of services, registries or config servers.
+        output_dir(str): output directory
+        plan(GenerationPlan): plan to fill
+        ctx(GeneratorContext): generator context
+    """
+    for decl in decls:
+        fnc = _obj_to_fnc[decl.__class__]
+        fnc(decl, output_dir, plan, ctx)
 
 
 def calculate_type(platform, _type):
@@ -787,6 +1268,14 @@ def get_return_type(function):
     return ret_type
 
 
+def get_executor_constant(function):
+    """Returns the name of the AsyncConfig constant that holds the bean name
+    of the executor of an async function."""
+    if function.executor is None:
+        return "CONFIG_NAME"
+    return "%s_EXECUTOR" % function.executor.upper()
+
+
 def get_param_names(func):
     params = [p.name for p in func.params]
     return ", ".join(params) if params else ""
@@ -818,10 +1307,148 @@ def _build_msg_fqn(msg_obj):
 
 
 def generate_cb_annotation(func):
-    if not func.cb_pattern or func.cb_pattern == "fail_fast":
-        return ""
+    uses_fallback = func.cb_pattern and func.cb_pattern != "fail_fast"
+    policy = func.call_policy
+    if policy is None:
+        if not uses_fallback:
+            return ""
+        return '@HystrixCommand(fallbackMethod = "%s")' % func.cb_fallback
+
+    # Each function gets its own thread pool (bulkhead) without a queue, so
+    # a slow dependency function cannot take threads of other calls.
+    args = []
+    if uses_fallback:
+        args.append('fallbackMethod = "%s"' % func.cb_fallback)
+    args.append('threadPoolKey = "%s.%s"' % (func.service_name, func.name))
+    args.append(
+        'commandProperties = {\n'
+        '            @HystrixProperty(name = "execution.isolation.thread.'
+        'timeoutInMilliseconds", value = "%d")\n'
+        '        }' % policy.timeout_ms)
+    args.append(
+        'threadPoolProperties = {\n'
+        '            @HystrixProperty(name = "coreSize", value = "%d"),\n'
+        '            @HystrixProperty(name = "maxQueueSize", value = "-1")\n'
+        '        }' % policy.max_concurrent)
+    return "@HystrixCommand(%s)" % ",\n        ".join(args)
+
+
+def get_resilient_call(func):
+    """Returns the Java expression that calls the private method which makes
+    a single request to a dependency function, with retries and hedged
+    requests set in the call policy of the function."""
+    params = get_param_names(func)
+    call = "call%s%s(%s)" % (func.name[0].upper(), func.name[1:], params)
+    policy = func.call_policy
+    if policy is None:
+        return call
+
+    if func.ret_type == "void":
+        callable_ = "() -> { %s; return null; }" % call
+    else:
+        callable_ = "() -> %s" % call
+    if policy.hedge_after_ms:
+        call = "Resilience.hedge(%d, %sHedgeExecutor, %s)" % (
+            policy.hedge_after_ms, func.name, callable_)
+        callable_ = "() -> %s" % call
+    if policy.retries:
+        call = "Resilience.retry(%d, %d, %d, %s)" % (
+            policy.retries, policy.backoff_ms, policy.timeout_ms, callable_)
+    return call
+
+
+def uses_resilience(func):
+    """Returns True if a blocking call of a dependency function is retried
+    or hedged."""
+    policy = func.call_policy
+    return not func.is_async() and policy is not None and \
+        bool(policy.retries or policy.hedge_after_ms)
+
+
+def uses_hedging(func):
+    """Returns True if a blocking call of a dependency function is hedged,
+    so the client needs an executor for the hedged calls."""
+    return uses_resilience(func) and bool(func.call_policy.hedge_after_ms)
+
+
+def uses_fallback_cache(func):
+    """Returns True if the last successful responses of a dependency function
+    are cached and served by its fallback. Functions that return no value
+    fall back to an empty response."""
+    return func.cb_pattern == "fallback_cache" and func.ret_type != "void"
+
+
+def to_proto_value(_type, expr, mapper):
+    """Returns the Java expression that converts a domain value of a basic
+    type or a typedef into its protobuf value.
 
-    return '@HystrixCommand(fallbackMethod = "%s")' % func.cb_fallback
+    Args:
+        _type: basic type or TypeDef
+        expr (str): Java expression of the domain value
+        mapper (str): name of the class that converts typedefs
+    """
+    if isinstance(_type, TypeDef):
+        return "%s.toProto(%s)" % (mapper, expr)
+    if _type == "i64":
+        return "%s.longValue()" % expr
+    if _type == "date":
+        return "%s.getTime()" % expr
+    return expr
+
+
+def from_proto_value(_type, expr, mapper):
+    """Returns the Java expression that converts a protobuf value into the
+    domain value of a basic type or a typedef. See `to_proto_value`."""
+    if isinstance(_type, TypeDef):
+        return "%s.fromProto(%s)" % (mapper, expr)
+    if _type == "i64":
+        return "(int) %s" % expr
+    if _type == "date":
+        return "new java.util.Date(%s)" % expr
+    return expr
+
+
+def get_proto_setter(_type, builder, name, expr, mapper):
+    """Returns the Java statement that sets a field of a protobuf message
+    builder to a domain value. Null values are not set.
+
+    Args:
+        _type: field type
+        builder (str): name of the builder variable
+        name (str): field name
+        expr (str): Java expression of the domain value
+        mapper (str): name of the class that converts typedefs
+    """
+    if isinstance(_type, TypedList):
+        return "if (%s != null) { for (var v : %s) { %s.add%s(%s); } }" % (
+            expr, expr, builder, proto_name(name),
+            to_proto_value(_type.type, "v", mapper))
+    return "if (%s != null) { %s.set%s(%s); }" % (
+        expr, builder, proto_name(name), to_proto_value(_type, expr, mapper))
+
+
+def get_proto_getter(_type, message, name, mapper):
+    """Returns the Java expression that reads the domain value of a field
+    of a protobuf message. Fields that are not set are read as null.
+
+    Args:
+        _type: field type
+        message (str): name of the message variable
+        name (str): field name
+        mapper (str): name of the class that converts typedefs
+    """
+    accessor = proto_name(name)
+    if isinstance(_type, TypedList):
+        value = from_proto_value(_type.type, "v", mapper)
+        if value == "v":
+            return "new java.util.ArrayList<>(%s.get%sList())" % (message,
+                                                                  accessor)
+        return "%s.get%sList().stream().map(v -> %s)" \
+               ".collect(java.util.stream.Collectors.toList())" % (
+                   message, accessor, value)
+    return "%s.has%s() ? %s : null" % (
+        message, accessor,
+        from_proto_value(_type, "%s.get%s()" % (message, accessor), mapper))
 
 
 def get_default_for_cb_pattern(platform, func):
@@ -839,8 +1466,9 @@ def get_default_for_cb_pattern(platform, func):
                           "default value instead of empty response. Sorry :(. ")
             return get_def_ret_val(platform, func.ret_type)
         elif func.cb_pattern == "fallback_cache":
-            warnings.warn("Circuit Breaker pattern 'fallback_cache' returns "
-                          "default value instead of cached value. Sorry :(. ")
+            # Returned only if there is no cached response.
+            if isinstance(func.ret_type, TypeDef):
+                return "null"
             return get_def_ret_val(platform, func.ret_type)
 
 
@@ -915,7 +1543,8 @@ def get_java_rest_call(url, rest_mapping):
     return '"%s%s"%s' % (url, base_url, rest_mapping)
 
 
-def generate_run_script(output_path, app_name, app_version, app_port):
+def generate_run_script(output_path, app_name, app_version, app_port,
+                        messages_lib=None, plan=None, ctx=None):
     """Generates run.sh script for application in its root folder
 
     Args:
@@ -923,23 +1552,29 @@ def generate_run_script(output_path, app_name, app_version, app_port):
         app_name (str): application name
         app_version (str): application version
         app_version (str): port that application uses
+        messages_lib (str): name of the shared messages module that must be
+            installed before the application is built
+        plan (GenerationPlan): plan to fill. If not given, script is
+            generated right away.
+        ctx (GeneratorContext): generator context
 
     Returns:
         None
     """
     templates_path = os.path.join(get_templates_path(), JAVA)
-    env = Environment(loader=FileSystemLoader(templates_path))
-
-    d = {"name": app_name, "version": app_version, "port": app_port}
-    for template_name, ext in [("run_sh", "sh"), ("run_cmd", "cmd")]:
-        run_template = env.get_template("%s.template" % template_name)
+    env = get_env(ctx, templates_path)
 
-        out = os.path.join(output_path, app_name, "run.%s" % ext)
+    d = {"name": app_name, "version": app_version, "port": app_port,
+         "messages_lib": messages_lib}
+    with planning(output_path, plan) as plan:
+        for template_name, ext in [("run_sh", "sh"), ("run_cmd", "cmd")]:
+            out = os.path.join(output_path, app_name, "run.%s" % ext)
 
-        run_template.stream(d).dump(out)
+            plan.render(env, "%s.template" % template_name, out, d)
 
 
-def generate_dockerfile(output_path, app_name, app_version, app_port):
+def generate_dockerfile(output_path, app_name, app_version, app_port,
+                        plan=None, ctx=None):
     """Generates Dockerfile for application in its root folder
 
     Args:
@@ -947,20 +1582,24 @@ def generate_dockerfile(output_path, app_name, app_version, app_port):
         app_name (str): application name
         app_version (str): application version
         app_version (str): port that application uses
+        plan (GenerationPlan): plan to fill. If not given, Dockerfile is
+            generated right away.
+        ctx (GeneratorContext): generator context
 
     Returns:
         None
     """
     templates_path = os.path.join(get_templates_path(), JAVA)
-    env = Environment(loader=FileSystemLoader(templates_path))
-    template = env.get_template("Dockerfile.template")
+    env = get_env(ctx, templates_path)
 
     out = os.path.join(output_path, app_name, "Dockerfile")
 
     d = {"app_name": app_name,
          "app_version": app_version,
          "app_port": app_port}
-    template.stream(d).dump(out)
+
+    with planning(output_path, plan) as plan:
+        plan.render(env, "Dockerfile.template", out, d)
 
 
 # Create built-in Java generator.
@@ -968,5 +1607,8 @@ java = GeneratorDesc(
     language_name="java",
     language_ver="17",
     description="Java 17 code generator",
-    gen_func=generate
+    gen_func=generate,
+    plan_func=plan_generation,
+    gen_many_func=generate_many,
+    plan_many_func=plan_many
 )
\ No newline at end of file
@@ -0,0 +1,263 @@
+"""
+This module contains outputs for the generation plan.
+
+Output collects rendered files in memory and writes them all at once, after
+the whole plan has been rendered. If rendering of any file fails, nothing is
+written. Files are written either into the file system or into an archive.
+"""
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+from collections import OrderedDict
+
+# Supported archive formats by file extension. Value is tarfile write mode,
+# or None for zip archives.
+ARCHIVE_FORMATS = OrderedDict([
+    (".zip", None),
+    (".tar", "w"),
+    (".tar.gz", "w:gz"),
+    (".tgz", "w:gz"),
+    (".tar.bz2", "w:bz2"),
+    (".tar.xz", "w:xz"),
+    (".tar.zst", "w|"),
+])
+
+
+class PartialOutputError(Exception):
+    """Raised when writing of rendered files fails after some of them have
+    already been written, so the output may be partially updated."""
+
+    def __init__(self, written, total, error):
+        super().__init__(
+            "Writing generated files failed after %d of %d file(s) were "
+            "written, so the output directory may be partially updated: %s"
+            % (written, total, error))
+        self.written = written
+        self.total = total
+
+
+class Output:
+    """Base class for generation outputs.
+
+    Attributes:
+        files (OrderedDict): content of rendered files by their path
+    """
+    def __init__(self):
+        super().__init__()
+        self.files = OrderedDict()
+
+    def __len__(self):
+        return len(self.files)
+
+    def exists(self, path):
+        """Returns True if file with the given path already exists in the
+        output."""
+        return path in self.files
+
+    def write(self, path, content):
+        """Adds file to the output."""
+        self.files[path] = content
+
+    def check_dir(self, output_dir):
+        """Checks if the output directory can be used."""
+        pass
+
+    def generate(self, generator, decls, output_dir, ctx):
+        """Generates code for declarations whose generator does not support
+        planning, and therefore writes files on its own."""
+        generator.generate_many(decls, output_dir, ctx)
+
+    def flush(self, dirs=()):
+        """Writes collected files to their final destination.
+
+        Args:
+            dirs (list): directories that should be created even if they
+                contain no files
+        """
+        raise NotImplementedError()
+
+
+class DirectoryOutput(Output):
+    """Writes files into the file system.
+
+    Directories are created in one pass, and each file is first written to a
+    temporary file next to it and then moved in its place, so an existing
+    file is never left half-written.
+
+    The output directory itself is not replaced as a whole, since it can
+    contain files which are not generated, like manually changed service
+    implementations. If writing fails midway, `PartialOutputError` is raised,
+    and the directory contains a mix of old and new files.
+    """
+
+    def check_dir(self, output_dir):
+        if not os.path.exists(output_dir):
+            raise Exception("Output path does not exist.")
+
+    def exists(self, path):
+        return path in self.files or os.path.exists(path)
+
+    def flush(self, dirs=()):
+        for path in leaf_dirs(list(dirs) +
+                              [os.path.dirname(p) for p in self.files]):
+            os.makedirs(path, exist_ok=True)
+
+        for written, (path, content) in enumerate(self.files.items()):
+            try:
+                write_atomic(path, content)
+            except Exception as ex:
+                raise PartialOutputError(written, len(self.files), ex) \
+                    from ex
+
+        self.files.clear()
+
+
+class ArchiveOutput(Output):
+    """Writes files into a zip or tar archive, without writing them into the
+    file system.
+
+    Paths in the archive are relative to the output directory of the plan.
+    Archive format is chosen by the extension of the archive path (see
+    `ARCHIVE_FORMATS`). `.tar.zst` archives require the `zstandard` package.
+
+    Attributes:
+        archive_path (str): path to the archive
+        output_dir (str): directory that is the root of the archive
+    """
+    def __init__(self, archive_path, output_dir):
+        super().__init__()
+        self.archive_path = archive_path
+        self.output_dir = output_dir
+        self.ext = archive_ext(archive_path)
+        if self.ext is None:
+            raise Exception("Unsupported archive format: %s. Supported "
+                            "formats: %s" % (archive_path,
+                                             ", ".join(ARCHIVE_FORMATS)))
+
+    def generate(self, generator, decls, output_dir, ctx):
+        # Generator writes files on its own, so let it write into a temporary
+        # directory and collect the files from there.
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            generator.generate_many(decls, tmp_dir, ctx)
+            for root, _, files in os.walk(tmp_dir):
+                for name in files:
+                    tmp_path = os.path.join(root, name)
+                    path = os.path.join(output_dir,
+                                        os.path.relpath(tmp_path, tmp_dir))
+                    with open(tmp_path) as f:
+                        self.write(path, f.read())
+
+    def arcname(self, path):
+        return os.path.relpath(path, self.output_dir).replace(os.sep, "/")
+
+    def flush(self, dirs=()):
+        dirs = [self.arcname(d) for d in dirs
+                if os.path.normpath(d) != os.path.normpath(self.output_dir)]
+
+        tmp_path = self.archive_path + ".silvera-tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                if self.ext == ".zip":
+                    self._write_zip(f, dirs)
+                elif self.ext == ".tar.zst":
+                    self._write_zst(f, dirs)
+                else:
+                    mode = ARCHIVE_FORMATS[self.ext]
+                    self._write_tar(tarfile.open(fileobj=f, mode=mode), dirs)
+            os.replace(tmp_path, self.archive_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.files.clear()
+
+    def _write_zip(self, f, dirs):
+        with zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as archive:
+            date_time = time.localtime()[:6]
+            for d in dirs:
+                info = zipfile.ZipInfo(d + "/", date_time)
+                info.external_attr = (0o40755 << 16) | 0x10
+                archive.writestr(info, "")
+            for path, content in self.files.items():
+                info = zipfile.ZipInfo(self.arcname(path), date_time)
+                info.external_attr = 0o644 << 16
+                info.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(info, content)
+
+    def _write_zst(self, f, dirs):
+        try:
+            import zstandard
+        except ImportError:
+            raise Exception("Package 'zstandard' is required to create "
+                            ".tar.zst archives.")
+        with zstandard.ZstdCompressor().stream_writer(f) as zf:
+            self._write_tar(tarfile.open(fileobj=zf,
+                                         mode=ARCHIVE_FORMATS[self.ext]),
+                            dirs)
+
+    def _write_tar(self, archive, dirs):
+        mtime = time.time()
+        with archive:
+            for d in dirs:
+                info = tarfile.TarInfo(d)
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+                info.mtime = mtime
+                archive.addfile(info)
+            for path, content in self.files.items():
+                data = content.encode("utf-8")
+                info = tarfile.TarInfo(self.arcname(path))
+                info.size = len(data)
+                info.mode = 0o644
+                info.mtime = mtime
+                archive.addfile(info, io.BytesIO(data))
+
+
+def archive_ext(path):
+    """Returns the extension of a supported archive format, or None if the
+    format of the archive is not supported."""
+    for ext in ARCHIVE_FORMATS:
+        if path.endswith(ext):
+            return ext
+    return None
+
+
+def leaf_dirs(dirs):
+    """Returns only directories which are not parents of other given
+    directories, since creating them creates their parents too.
+
+    Args:
+        dirs (list): directory paths
+
+    Returns:
+        list
+    """
+    dirs = {os.path.normpath(d) for d in dirs}
+    parents = {os.path.dirname(d) for d in dirs}
+    return sorted(dirs - parents)
+
+
+def write_atomic(path, content):
+    """Writes content to a temporary file and then replaces the file with the
+    given path. If the file already exists, its permissions are kept.
+
+    Args:
+        path (str): file path
+        content (str): file content
+    """
+    tmp_path = path + ".silvera-tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(content)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
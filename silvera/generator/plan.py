@@ -0,0 +1,266 @@
+"""
+This module contains the code generation plan.
+
+Generation is performed in two phases. During planning, code generators only
+collect what should be generated: directories and tasks, where each task knows
+its output path, the template and the context used to render it. During
+execution, the plan is rendered and written to the output (see
+`silvera.generator.output`).
+"""
+import os
+import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from silvera.generator.cache import render_key
+from silvera.generator.output import DirectoryOutput
+from silvera.timings import phase
+from silvera.trace import span, recording
+from silvera.utils import get_templates_path
+
+# Task statuses reported for a dry-run
+STATUS_NEW = "new"
+STATUS_OVERWRITE = "overwrite"
+STATUS_KEEP = "keep"
+
+
+class Task:
+    """Base class for generation tasks.
+
+    Attributes:
+        path (str): path to the output file
+        overwrite (bool): if False, the output file is preserved if it
+            already exists
+    """
+    def __init__(self, path, overwrite=True):
+        super().__init__()
+        self.path = path
+        self.overwrite = overwrite
+
+    @property
+    def label(self):
+        """Returns the name of the template used by the task."""
+        raise NotImplementedError()
+
+    def render(self):
+        """Returns the content of the output file.
+
+        Returns:
+            str
+        """
+        raise NotImplementedError()
+
+    def cache_key(self):
+        """Returns the key used to store the output file in the generation
+        cache, or None if the output should not be cached."""
+        return None
+
+    def status(self):
+        """Returns what will happen with the output file if the task is
+        executed.
+
+        Returns:
+            str
+        """
+        if not os.path.exists(self.path):
+            return STATUS_NEW
+        return STATUS_OVERWRITE if self.overwrite else STATUS_KEEP
+
+
+class RenderTask(Task):
+    """Renders a jinja2 template into a file.
+
+    Attributes:
+        env (Environment): jinja2 environment that contains the template
+        template_name (str): template name within the environment
+        context (dict): variables for the template
+    """
+    def __init__(self, path, env, template_name, context, overwrite=True):
+        super().__init__(path, overwrite)
+        self.env = env
+        self.template_name = template_name
+        # Copy the context, because generators reuse dicts between templates.
+        self.context = dict(context)
+
+    @property
+    def template(self):
+        return self.env.get_template(self.template_name)
+
+    @property
+    def label(self):
+        filename = self.template.filename
+        templates_path = get_templates_path()
+        if filename and filename.startswith(templates_path):
+            return os.path.relpath(filename, templates_path).replace(os.sep,
+                                                                     "/")
+        return self.template_name
+
+    def render(self):
+        return self.render_context(self.context)
+
+    def render_context(self, context):
+        return self.template.render(context)
+
+    def cache_key(self):
+        return render_key(self.env, self.template_name, self.context)
+
+
+class DumpTask(Task):
+    """Dumps data into a JSON file.
+
+    Attributes:
+        data_func (callable): returns data that will be dumped
+        name (str): name shown in place of the template name
+    """
+    def __init__(self, path, data_func, name, overwrite=True):
+        super().__init__(path, overwrite)
+        self.data_func = data_func
+        self.name = name
+
+    @property
+    def label(self):
+        return self.name
+
+    def render(self):
+        return json.dumps(self.data_func())
+
+
+class GenerationPlan:
+    """List of directories and tasks that should be created for a model.
+
+    Tasks are stored by their output path, so if two tasks write the same
+    file, only the last one is kept.
+
+    Attributes:
+        output_dir (str): output directory
+        dirs (list): directories that will be created
+        tasks (OrderedDict): tasks by their output path
+        opaque (list): (generator, decls, ctx) for declarations whose
+            generators do not support planning and generate code directly
+    """
+    def __init__(self, output_dir):
+        super().__init__()
+        self.output_dir = output_dir
+        self.dirs = []
+        self._dirs = set()
+        self.tasks = OrderedDict()
+        self.opaque = []
+
+    def __iter__(self):
+        return iter(self.tasks.values())
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def add_dir(self, path):
+        """Adds directory to the plan.
+
+        Returns:
+            str: given path
+        """
+        if path not in self._dirs:
+            self._dirs.add(path)
+            self.dirs.append(path)
+        return path
+
+    def add_dirs(self, paths):
+        """Adds directories to the plan."""
+        for path in paths:
+            self.add_dir(path)
+
+    def add(self, task):
+        """Adds task to the plan."""
+        self.add_dir(os.path.dirname(task.path))
+        self.tasks.pop(task.path, None)
+        self.tasks[task.path] = task
+
+    def render(self, env, template_name, path, context, overwrite=True):
+        """Adds a task that renders the template into a given path."""
+        self.add(RenderTask(path, env, template_name, context, overwrite))
+
+    def add_opaque(self, generator, decls, ctx):
+        """Adds declarations that will be generated directly by a generator
+        that does not support planning."""
+        self.opaque.append((generator, decls, ctx))
+
+    def relpath(self, path):
+        return os.path.relpath(path, self.output_dir)
+
+    def execute(self, jobs=1, output=None, cache=None, profiler=None):
+        """Executes the plan. See `execute`."""
+        execute(self, jobs, output, cache, profiler)
+
+
+def execute(plan, jobs=1, output=None, cache=None, profiler=None):
+    """Executes the generation plan.
+
+    All tasks are rendered into the output first, so nothing is written if
+    rendering of any file fails. Then declarations whose generators do not
+    support planning are generated, and finally the output is flushed.
+
+    Args:
+        plan (GenerationPlan): generation plan
+        jobs (int): number of worker threads used for rendering
+        output (Output): where rendered files are written. By default, files
+            are written into the file system.
+        cache (GenerationCache): if given, rendered files are read from the
+            cache when possible
+        profiler (TemplateProfiler): if given, records render time of each
+            template
+    """
+    if output is None:
+        output = DirectoryOutput()
+
+    output.check_dir(plan.output_dir)
+
+    tasks = [task for task in plan
+             if task.overwrite or not output.exists(task.path)]
+
+    render = cache.render if cache else lambda t: t.render()
+    if profiler:
+        render = partial(profiler.render, render=render)
+    if recording():
+        render = partial(_traced_render, plan, render=render)
+
+    with phase("rendering"):
+        if jobs > 1:
+            with ThreadPoolExecutor(max_workers=jobs,
+                                    thread_name_prefix="worker") as executor:
+                contents = list(executor.map(render, tasks))
+        else:
+            contents = [render(task) for task in tasks]
+
+        for task, content in zip(tasks, contents):
+            output.write(task.path, content)
+
+    with phase("writing"):
+        for generator, decls, ctx in plan.opaque:
+            output.generate(generator, decls, plan.output_dir, ctx)
+
+        output.flush(plan.dirs)
+
+
+def _traced_render(plan, task, render):
+    with span(task.label, "render", path=plan.relpath(task.path)):
+        return render(task)
+
+
+@contextmanager
+def planning(output_dir, plan=None):
+    """Provides a plan to fill.
+
+    If `plan` is not given, a new plan is created and executed as soon as
+    it is filled. This allows generation functions to be used both as a
+    part of a bigger plan and on their own.
+
+    Args:
+        output_dir (str): output directory
+        plan (GenerationPlan): plan to fill
+    """
+    if plan is not None:
+        yield plan
+    else:
+        plan = GenerationPlan(output_dir)
+        yield plan
+        plan.execute()
@@ -171,6 +171,8 @@ def convert_list_to_array(platform, lst):
 
 def get_def_ret_val(platform, _type):
     """Returns the default return value for given platform and data type"""
+    if isinstance(_type, TypedList):
+        _type = LIST
     return platforms[platform][DEF_RET_VAL][_type]
 
 
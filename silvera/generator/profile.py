@@ -0,0 +1,96 @@
+"""
+This module contains the profiler of template rendering.
+"""
+import json
+import math
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+
+class TemplateProfiler:
+    """Collects render times and output sizes for each template.
+
+    Attributes:
+        times (dict): render times in seconds by template name
+        sizes (dict): total number of bytes rendered by template name
+    """
+    def __init__(self):
+        super().__init__()
+        self.times = defaultdict(list)
+        self.sizes = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def render(self, task, render):
+        """Renders the task with the given render function and records how
+        long it took.
+
+        Args:
+            task (Task): generation task
+            render (callable): called with the task, returns rendered content
+
+        Returns:
+            str
+        """
+        start = time.perf_counter()
+        content = render(task)
+        elapsed = time.perf_counter() - start
+        self.record(task.label, elapsed, len(content.encode("utf-8")))
+        return content
+
+    def record(self, name, seconds, size):
+        with self._lock:
+            self.times[name].append(seconds)
+            self.sizes[name] += size
+
+    def stats(self):
+        """Returns statistics for each template, sorted by the total render
+        time, slowest first.
+
+        Returns:
+            list: dicts with template name, render count, total and p95 render
+                time in milliseconds and number of bytes
+        """
+        result = []
+        for name, times in self.times.items():
+            result.append(OrderedDict([
+                ("template", name),
+                ("count", len(times)),
+                ("total_ms", sum(times) * 1000),
+                ("p95_ms", percentile(times, 95) * 1000),
+                ("bytes", self.sizes[name])
+            ]))
+        result.sort(key=lambda s: s["total_ms"], reverse=True)
+        return result
+
+    def to_table(self):
+        """Returns statistics formatted as a table.
+
+        Returns:
+            str
+        """
+        stats = self.stats()
+        width = max([len("Template")] + [len(s["template"]) for s in stats])
+        row = "{:<%d} {:>7} {:>12} {:>10} {:>10}" % width
+        lines = [row.format("Template", "Count", "Total (ms)", "p95 (ms)",
+                            "Bytes")]
+        for s in stats:
+            lines.append(row.format(s["template"], s["count"],
+                                    "%.2f" % s["total_ms"],
+                                    "%.2f" % s["p95_ms"], s["bytes"]))
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Dumps statistics into a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.stats(), f, indent=2)
+
+
+def percentile(values, p):
+    """Returns the p-th percentile of values, using the nearest-rank
+    method."""
+    if not values:
+        return 0
+    values = sorted(values)
+    rank = max(int(math.ceil(p / 100.0 * len(values))), 1)
+    return values[rank - 1]
@@ -9,20 +9,32 @@ def create_if_missing(dir_path):
     return dir_path
 
 
+def java_struct_dirs(output_path, app_name):
+    """Returns the list of directories of Java project structure, ordered
+    from parent to child directories."""
+    app_root = os.path.join(output_path, app_name)
+    app_src = os.path.join(app_root, "src")
+    app_main = os.path.join(app_src, "main")
+    app_java = os.path.join(app_main, "java")
+    app_com = os.path.join(app_java, "com")
+    app_silvera = os.path.join(app_com, "silvera")
+
+    return [app_root,
+            app_src,
+            app_main,
+            os.path.join(app_src, "test"),
+            app_java,
+            os.path.join(app_main, "resources"),
+            app_com,
+            app_silvera,
+            os.path.join(app_silvera, app_name)]
+
+
 def java_struct(output_path, app_name):
     """Generates Java project structure"""
 
     if not os.path.exists(output_path):
         raise Exception("Output path does not exist.")
 
-    app_root = create_if_missing(os.path.join(output_path, app_name))
-    app_src = create_if_missing(os.path.join(app_root, "src"))
-    app_main = create_if_missing(os.path.join(app_src, "main"))
-    _ = create_if_missing(os.path.join(app_src, "test"))
-
-    app_java = create_if_missing(os.path.join(app_main, "java"))
-    _ = create_if_missing(os.path.join(app_main, "resources"))
-
-    app_com = create_if_missing(os.path.join(app_java, "com"))
-    app_silvera = create_if_missing(os.path.join(app_com, "silvera"))
-    app_name = create_if_missing(os.path.join(app_silvera, app_name))
+    for dir_path in java_struct_dirs(output_path, app_name):
+        create_if_missing(dir_path)
@@ -0,0 +1,97 @@
+"""
+This module creates protobuf schemas of typedefs that services send in the
+protobuf wire format (see `ServiceDecl.protobuf_typedefs`), and of APIs of
+gRPC services.
+"""
+from silvera.core import TypeDef, TypedList
+
+# Protobuf types of Silvera basic types. Dates are sent as milliseconds
+# since the epoch, like in JSON.
+PROTOBUF_TYPES = {
+    "int": "int32",
+    "i16": "int32",
+    "i32": "int32",
+    "i64": "int64",
+    "float": "double",
+    "double": "double",
+    "bool": "bool",
+    "str": "string",
+    "pwd": "string",
+    "date": "int64"
+}
+
+
+def proto_type(_type):
+    """Returns the protobuf type of a basic type or a typedef."""
+    if isinstance(_type, TypeDef):
+        return _type.name
+    return PROTOBUF_TYPES[_type]
+
+
+def proto_field_type(_type):
+    """Returns the label and the protobuf type of a field of a given type.
+
+    Returns:
+        tuple: (label, type), e.g. ("repeated", "string") for list<str>
+    """
+    if isinstance(_type, TypedList):
+        return "repeated", proto_type(_type.type)
+    return "optional", proto_type(_type)
+
+
+def proto_name(name):
+    """Returns a name in upper camel case, as used by protoc in Java
+    accessors of a field (e.g. `ItemId` for `item_id` in `getItemId`), and
+    for names of generated messages and methods."""
+    result = ""
+    cap_next = True
+    for ch in name:
+        if ch == "_":
+            cap_next = True
+        elif ch.isdigit():
+            result += ch
+            cap_next = True
+        else:
+            result += ch.upper() if cap_next else ch
+            cap_next = False
+    return result
+
+
+def proto_fields(typedef):
+    """Returns fields of the protobuf message of a typedef.
+
+    Generated domain classes have a string `id` if the typedef has no @id
+    field, so it is added to the message with the tag that follows the
+    largest tag of the typedef.
+
+    Args:
+        typedef (TypeDef): typedef object
+
+    Returns:
+        list: (label, type, name, tag) tuples
+    """
+    fields = [proto_field_type(f.type) + (f.name, f.tag)
+              for f in typedef.fields]
+
+    if has_implicit_id(typedef):
+        tag = max([f[3] for f in fields], default=0) + 1
+        fields.append(("optional", "string", "id", tag))
+    return fields
+
+
+def has_implicit_id(typedef):
+    """Returns True if the generated domain class of a typedef has a string
+    `id` that is not a field of the typedef."""
+    return not any(f.isid or f.name == "id" for f in typedef.fields)
+
+
+def schema_path(service_name):
+    """Returns the path of the protobuf schema of a service's typedefs,
+    relative to the resources folder of a generated project."""
+    return "proto/%s.proto" % service_name
+
+
+def grpc_java_package(service_name):
+    """Returns the Java package of classes generated by protoc from the
+    gRPC schema of a service."""
+    return "com.silvera.%s.grpc" % service_name
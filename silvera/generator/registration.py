@@ -6,11 +6,36 @@ generators = None
 built_in_generators = {}
 
 
+class GeneratorContext:
+    """Context shared by all generator calls in one generation run.
+
+    Generators can use it to share setup cost between declarations, e.g. to
+    create template environments or type maps only once.
+
+    Attributes:
+        model (Model): Silvera model object which is being generated
+        debug (bool): debug flag
+        data (dict): generator specific data, e.g. caches. Keys should be
+            prefixed with the generator's language name.
+        shared (dict): like `data`, but may be shared between generation
+            runs of different models, e.g. when several projects are
+            compiled in one process. Only for data that doesn't depend on
+            the model, like template environments.
+    """
+    def __init__(self, model=None, debug=False, shared=None):
+        super().__init__()
+        self.model = model
+        self.debug = debug
+        self.data = {}
+        self.shared = shared if shared is not None else {}
+
+
 class GeneratorDesc:
     """Generator description class, used for generator registration and
     discovery.
     """
-    def __init__(self, language_name, language_ver, description, gen_func):
+    def __init__(self, language_name, language_ver, description, gen_func,
+                 plan_func=None, gen_many_func=None, plan_many_func=None):
         """Initialize object
 
         Args:
@@ -18,6 +43,17 @@ class GeneratorDesc:
             language_ver (str): language version
             description (str): a short description of the generator
             gen_func (callable): A callable that performs the generation
+            plan_func (callable): Optional callable that adds generation
+                tasks to a `GenerationPlan` instead of generating code
+                directly. Called with declaration, output dir, plan and
+                debug flag.
+            gen_many_func (callable): Optional callable that performs the
+                generation for a list of declarations at once. Called with
+                declarations, output dir and `GeneratorContext`.
+            plan_many_func (callable): Optional callable that adds generation
+                tasks for a list of declarations to a `GenerationPlan`.
+                Called with declarations, output dir, plan and
+                `GeneratorContext`.
 
         """
         super().__init__()
@@ -25,11 +61,59 @@ class GeneratorDesc:
         self.lang_ver = language_ver
         self.description = description
         self.gen_func = gen_func
+        self.plan_func = plan_func
+        self.gen_many_func = gen_many_func
+        self.plan_many_func = plan_many_func
         self.project_name = None
 
     def __call__(self, decl, output_dir, debug):
         self.gen_func(decl, output_dir, debug)
 
+    @property
+    def supports_planning(self):
+        return self.plan_func is not None or self.plan_many_func is not None
+
+    def generate_many(self, decls, output_dir, ctx):
+        """Generates code for all given declarations.
+
+        Args:
+            decls (list): declarations
+            output_dir (str): output directory
+            ctx (GeneratorContext): context shared by all generator calls
+        """
+        if self.gen_many_func:
+            self.gen_many_func(decls, output_dir, ctx)
+        else:
+            for decl in decls:
+                self.gen_func(decl, output_dir, ctx.debug)
+
+    def plan(self, decl, output_dir, plan, debug):
+        """Adds generation tasks for given declaration to the plan. If
+        generator doesn't support planning, declaration will be generated
+        directly when the plan is executed."""
+        if self.plan_func:
+            self.plan_func(decl, output_dir, plan, debug)
+        else:
+            self.plan_many([decl], output_dir, plan,
+                           GeneratorContext(debug=debug))
+
+    def plan_many(self, decls, output_dir, plan, ctx):
+        """Adds generation tasks for all given declarations to the plan.
+
+        Args:
+            decls (list): declarations
+            output_dir (str): output directory
+            plan (GenerationPlan): plan to fill
+            ctx (GeneratorContext): context shared by all generator calls
+        """
+        if self.plan_many_func:
+            self.plan_many_func(decls, output_dir, plan, ctx)
+        elif self.plan_func:
+            for decl in decls:
+                self.plan_func(decl, output_dir, plan, ctx.debug)
+        else:
+            plan.add_opaque(self, decls, ctx)
+
 
 def generator(lang_name, lang_ver):
     """Decorator used for entry point registration
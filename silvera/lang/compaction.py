@@ -0,0 +1,48 @@
+"""
+This module releases parser state after the model is loaded.
+
+textX keeps a parser for each module, together with the whole parse tree and
+the input text. Silvera only needs it to convert object positions into line
+and column numbers in error messages, so after loading, each parser is
+replaced with a compact index of line ends.
+"""
+import re
+from array import array
+from bisect import bisect_left
+
+
+class LineIndex:
+    """Converts positions in the module text into (line, column) pairs.
+
+    Provides the same `pos_to_linecol` as the textX parser, so it can be
+    used in its place.
+
+    Attributes:
+        line_ends (array): positions of line ends in the text
+    """
+    def __init__(self, text):
+        super().__init__()
+        self.line_ends = array("q", (m.start()
+                                     for m in re.finditer("\n", text)))
+
+    def pos_to_linecol(self, pos):
+        """Calculate (line, column) tuple for the given position in the
+        text."""
+        line = bisect_left(self.line_ends, pos)
+        col = pos
+        if line > 0:
+            col -= self.line_ends[line - 1] + 1
+        return line + 1, col + 1
+
+
+def compact(model):
+    """Replaces parsers of all modules with line indexes.
+
+    Args:
+        model (Model): loaded model
+    """
+    for module in model.modules:
+        parser = getattr(module, "_tx_parser", None)
+        if parser is None or isinstance(parser, LineIndex):
+            continue
+        module._tx_parser = LineIndex(parser.input)
@@ -5,7 +5,9 @@ from silvera.core import Module, ServiceDecl, ServiceRegistryDecl, TypeDef, \
     Function, FunctionParameter, ConfigServerDecl, APIGateway, RESTAnnotation, \
     Deployment, MessagePool, MessageBroker, MessageGroup, Message, \
     ProducerAnnotation, ConsumerAnnotation, TypeField, Set, TypedSet, Dict, \
-    TypedDict
+    TypedDict, Dependency, HTTPClient, LoadBalancer, Concurrency, Executor, \
+    AsyncAnnotation, CacheAnnotation, FallbackCache, CallPolicy, \
+    BatchableAnnotation, WireFormatAnnotation
 
 from silvera.utils import get_root_path
 
@@ -14,7 +16,10 @@ _classes = (Module, ServiceDecl, ServiceRegistryDecl, TypeDef,
             FunctionParameter, ConfigServerDecl, APIGateway, RESTAnnotation,
             Deployment, MessagePool, MessageBroker, MessageGroup, Message,
             ProducerAnnotation, ConsumerAnnotation, TypeField,
-            Set, TypedSet, Dict, TypedDict)
+            Set, TypedSet, Dict, TypedDict, Dependency, HTTPClient,
+            LoadBalancer, Concurrency, Executor, AsyncAnnotation,
+            CacheAnnotation, FallbackCache, CallPolicy, BatchableAnnotation,
+            WireFormatAnnotation)
 
 
 def get_metamodel():
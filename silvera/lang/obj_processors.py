@@ -4,11 +4,15 @@ processors are used during parsing.
 """
 from collections import deque, OrderedDict, defaultdict
 
-from silvera.const import BASIC_TYPES
+from silvera.const import BASIC_TYPES, MSG_LIB_NAME
 from silvera.core import (ServiceDecl, ConfigServerDecl, ServiceRegistryDecl,
                           TypedList, TypeDef, Deployable, Deployment,
-                          MessagePool, ProducerAnnotation, APIGateway, TypedSet)
+                          MessagePool, ProducerAnnotation, APIGateway, TypedSet,
+                          Concurrency)
+from silvera.diagnostics import report
 from silvera.exceptions import SilveraTypeError, SilveraLoadError
+from silvera.timings import phase
+from silvera.trace import span
 from silvera.utils import available_port
 
 
@@ -23,29 +27,37 @@ def process_dependency(module):
         start = dependency.start
         end = dependency.end
 
+        # Unresolved start or end has already been reported
+        if not isinstance(start, ServiceDecl) or \
+                not isinstance(end, ServiceDecl):
+            continue
+
         if hasattr(start, "circuit_breaked"):
             start.circuit_breaked = True
 
-        use = {c.method_name: (c.failure_pattern, c.fallback_method)
+        use = {c.method_name: (c.failure_pattern, c.fallback_method,
+                               c.call_policy)
                for c in dependency.circuit_break_defs}
         end_api_functions = {f.name: f for f in end.api.functions}
 
         # Check if all methods are defined in the end service
         non_existing = {f for f in use if f not in end_api_functions}
         if non_existing:
-            raise SilveraLoadError(
+            report(SilveraLoadError(
                 "Following functions are not defined in service '{}': {}".format(
                     end.name,
                     sorted(non_existing)
-                ))
+                )))
+            continue
 
         for orig_name, orig_fn in end_api_functions.items():
             if orig_name in use:
-                failure_pattern, fallback_method = use[orig_name]
+                failure_pattern, fallback_method, call_policy = use[orig_name]
 
                 fn_clone = orig_fn.clone()
                 fn_clone.dep = orig_fn
                 fn_clone.cb_pattern = failure_pattern
+                fn_clone.call_policy = call_policy
 
                 # Set default value for fallback function
                 if fallback_method is None:
@@ -54,13 +66,15 @@ def process_dependency(module):
                 fn_clone.cb_fallback = fallback_method
                 start.dep_functions.append(fn_clone)
 
-                ret_type = orig_fn.ret_type
-                if isinstance(ret_type, TypeDef):
-                    start.dep_typedefs.extend(recurse_typedef(ret_type))
-                elif isinstance(ret_type, TypedList):
-                    start.dep_typedefs.extend(recurse_typedef(ret_type.type))
+                for _type in [orig_fn.ret_type] + [p.type for p in
+                                                   orig_fn.params]:
+                    if isinstance(_type, TypedList):
+                        _type = _type.type
+                    if isinstance(_type, TypeDef):
+                        start.dep_typedefs.extend(recurse_typedef(_type))
 
         start.dependencies.append(end)
+        start.dependency_decls[end.name] = dependency
 
 
 def recurse_typedef(typedef, visited=None):
@@ -74,10 +88,11 @@ def recurse_typedef(typedef, visited=None):
     visited.add(typedef)
 
     for field in typedef.fields:
-        if isinstance(field.type, TypeDef):
-            recurse_typedef(field.type, visited)
-        elif isinstance(field.type, TypedList):
-            recurse_typedef(field.type.type, visited)
+        field_type = field.type
+        if isinstance(field_type, TypedList):
+            field_type = field_type.type
+        if isinstance(field_type, TypeDef):
+            recurse_typedef(field_type, visited)
 
     return visited
 
@@ -90,6 +105,10 @@ def assign_ref(decl, attr_name, module=None, lookup_name=None):
         attr_name (str): attribute name
         module (Module): module object
         lookup_name (str): lookup name
+
+    Returns:
+        bool: True if the reference is resolved. If not, the error is
+            reported and the attribute is left unchanged.
     """
     if module is None:
         module = decl.parent
@@ -104,9 +123,11 @@ def assign_ref(decl, attr_name, module=None, lookup_name=None):
         msg = "Error in module {} {}: {}".format(module.path,
                                                  linecol,
                                                  ex)
-        raise KeyError(msg)
+        report(KeyError(msg))
+        return False
 
     setattr(decl, attr_name, ref_obj)
+    return True
 
 
 def lookup(module, name):
@@ -173,15 +194,13 @@ def resolve_custom_types(service_decl):
                     _resolve_typed_list(service_decl, field.type)
                 else:
                     try:
-                        ft = service_decl.domain_objs[field.type]
+                        field.type = service_decl.domain_objs[field.type]
                     except KeyError:
                         linecol = module._tx_parser.pos_to_linecol(
                             field._tx_position)
-                        raise SilveraTypeError(module.path,
-                                               field.type,
-                                               linecol)
-
-                    field.type = ft
+                        report(SilveraTypeError(module.path,
+                                                field.type,
+                                                linecol))
 
         # Resolve public functions
         functions = api.functions
@@ -204,9 +223,6 @@ def _resolve_fnc(module, service_decl, fnc):
         service_decl (ServiceDecl): service where function is declared.
         fnc (Function): function to resolve.
     """
-    model = module.model
-    msg_pool = model.msg_pool
-
     # Resolve function's return type
     ret_type = fnc.ret_type
     if not is_type_resolved(ret_type):
@@ -214,13 +230,11 @@ def _resolve_fnc(module, service_decl, fnc):
             _resolve_typed_list(service_decl, ret_type)
         else:
             try:
-                rtd = service_decl.domain_objs[ret_type]
+                fnc.ret_type = service_decl.domain_objs[ret_type]
             except KeyError:
                 linecol = module._tx_parser.pos_to_linecol(
                     fnc._tx_position)
-                raise SilveraTypeError(module.path, ret_type, linecol)
-
-            fnc.ret_type = rtd
+                report(SilveraTypeError(module.path, ret_type, linecol))
 
     # Resolve function's parameters
     for param in [p for p in fnc.params
@@ -229,133 +243,122 @@ def _resolve_fnc(module, service_decl, fnc):
             _resolve_typed_list(service_decl, param.type)
         else:
             try:
-                td = service_decl.domain_objs[param.type]
+                param.type = service_decl.domain_objs[param.type]
             except KeyError:
                 linecol = module._tx_parser.pos_to_linecol(
                     param._tx_position)
-                raise SilveraTypeError(module.path, param.type, linecol)
-
-            param.type = td
+                report(SilveraTypeError(module.path, param.type, linecol))
 
     # Resolve messaging annotations
     for ann in fnc.msg_annotations:
         for subscr in ann.subscriptions:
-            message_fqn = subscr.message
-
-            # Find Message object represented by given FQN, and
-            # set reference to it.
-            try:
-                subscr.message = msg_pool.get(message_fqn)
-            except ValueError:
-                linecol = module._tx_parser.pos_to_linecol(
-                    subscr._tx_position)
-                raise SilveraLoadError(
-                    "Cannot resolve annotation ({} {}). Message '{}' "
-                    "not defined in message pool.".format(
-                        module.path,
-                        linecol,
-                        message_fqn)
-                )
-
-            # Find MessageChannel object represented by given FQN, and
-            # set reference to it.
-            channel_fqn = subscr.channel
-            fqn = channel_fqn.split(".")
-            broker_name = fqn[0]
-            try:
-                broker = model.msg_brokers[broker_name]
-            except KeyError:
-                linecol = module._tx_parser.pos_to_linecol(
-                    subscr._tx_position)
-                raise SilveraLoadError(
-                    "Cannot resolve annotation ({} {}). Broker '{}' "
-                    "not defined.".format(
-                        module.path,
-                        linecol,
-                        broker_name)
-                )
-
-            channel_name = fqn[1]
-            try:
-                channel = broker.channels[channel_name]
-                subscr.channel = channel
-            except KeyError:
-                linecol = module._tx_parser.pos_to_linecol(
-                    subscr._tx_position)
-                raise SilveraLoadError(
-                    "Cannot resolve annotation ({} {}). Channel '{}' "
-                    "not defined in broker '{}'".format(
-                        module.path,
-                        linecol,
-                        channel_name,
-                        broker_name)
-                )
+            # Find Message and MessageChannel objects represented by given
+            # FQNs, and set references to them.
+            message = _find_message(module, subscr, subscr.message)
+            found = _find_channel(module, subscr, subscr.channel)
+            if message is None or found is None:
+                continue
+            subscr.message = message
+            broker, subscr.channel = found
 
             # Perform registrations
             if isinstance(ann, ProducerAnnotation):
-                broker.register_producer(channel_name, fnc)
+                broker.register_producer(subscr.channel.name, fnc)
             else:
-                broker.register_consumer(channel_name, fnc)
+                broker.register_consumer(subscr.channel.name, fnc)
 
 
-def _resolve_msg_inst(module, msg_container):
-    if msg_container.message is None:
-        return
-    # Find Message object represented by given FQN, and
-    # set reference to it.
+def _find_message(module, container, message_fqn):
+    """Returns Message object from the message pool represented by given FQN.
+    If message is not found, the error is reported and None is returned.
+
+    Args:
+        module (Module): module object
+        container (object): object that references the message
+        message_fqn (str): FQN of the message
+
+    Returns:
+        Message
+    """
     msg_pool = module.model.msg_pool
-    message_fqn = msg_container.message
-    try:
-        msg_container.message = msg_pool.get(message_fqn)
-    except ValueError:
-        linecol = module._tx_parser.pos_to_linecol(
-            msg_container._tx_position)
-        raise SilveraLoadError(
-            "Cannot resolve annotation ({} {}). Message '{}' "
-            "not defined in message pool.".format(
-                module.path,
-                linecol,
-                message_fqn)
-        )
+    if msg_pool is not None:
+        try:
+            return msg_pool.get(message_fqn)
+        except ValueError:
+            pass
 
+    linecol = module._tx_parser.pos_to_linecol(container._tx_position)
+    report(SilveraLoadError(
+        "Cannot resolve annotation ({} {}). Message '{}' "
+        "not defined in message pool.".format(
+            module.path,
+            linecol,
+            message_fqn)
+    ))
 
-def _resolve_ch_inst(module, channel_container):
-    if channel_container.channel is None:
-        return
-    # Find MessageChannel object represented by given FQN, and
-    # set reference to it.
-    model = module.model
-    channel_fqn = channel_container.channel
+
+def _find_channel(module, container, channel_fqn):
+    """Returns MessageBroker object and its MessageChannel object represented
+    by given FQN. If channel is not found, the error is reported and None is
+    returned.
+
+    Args:
+        module (Module): module object
+        container (object): object that references the channel
+        channel_fqn (str): FQN of the channel, i.e. "<broker>.<channel>"
+
+    Returns:
+        tuple: (MessageBroker, MessageChannel)
+    """
     fqn = channel_fqn.split(".")
     broker_name = fqn[0]
     try:
-        broker = model.msg_brokers[broker_name]
+        broker = module.model.msg_brokers[broker_name]
     except KeyError:
-        linecol = module._tx_parser.pos_to_linecol(
-            channel_container._tx_position)
-        raise SilveraLoadError(
+        linecol = module._tx_parser.pos_to_linecol(container._tx_position)
+        report(SilveraLoadError(
             "Cannot resolve annotation ({} {}). Broker '{}' "
             "not defined.".format(
                 module.path,
                 linecol,
                 broker_name)
-        )
+        ))
+        return None
 
     channel_name = fqn[1]
     try:
-        channel = broker.channels[channel_name]
-        channel_container.channel = channel
+        return broker, broker.channels[channel_name]
     except KeyError:
-        linecol = module._tx_parser.pos_to_linecol(
-            channel_container._tx_position)
-        raise SilveraLoadError(
+        linecol = module._tx_parser.pos_to_linecol(container._tx_position)
+        report(SilveraLoadError(
             "Cannot resolve annotation ({} {}). Channel '{}' "
             "not defined in broker '{}'".format(
                 module.path,
                 linecol,
                 channel_name,
                 broker_name)
-        )
+        ))
+
+
+def _resolve_msg_inst(module, msg_container):
+    if msg_container.message is None:
+        return
+    # Find Message object represented by given FQN, and
+    # set reference to it.
+    message = _find_message(module, msg_container, msg_container.message)
+    if message is not None:
+        msg_container.message = message
+
+
+def _resolve_ch_inst(module, channel_container):
+    if channel_container.channel is None:
+        return
+    # Find MessageChannel object represented by given FQN, and
+    # set reference to it.
+    found = _find_channel(module, channel_container,
+                          channel_container.channel)
+    if found is not None:
+        _, channel_container.channel = found
 
     # Perform registrations
     # if isinstance(ann, ProducerAnnotation):
@@ -371,16 +374,14 @@ def _resolve_typed_list(service_decl, typed_list):
     else:
         if not is_type_resolved(typed_list.type):
             try:
-                ft = service_decl.domain_objs[typed_list.type]
+                typed_list.type = service_decl.domain_objs[typed_list.type]
             except KeyError:
                 module = service_decl.parent
                 linecol = module._tx_parser.pos_to_linecol(
                     typed_list._tx_position)
-                raise SilveraTypeError(module.path,
-                                       typed_list.type,
-                                       linecol)
-
-            typed_list.type = ft
+                report(SilveraTypeError(module.path,
+                                        typed_list.type,
+                                        linecol))
 
 
 def is_type_resolved(_type):
@@ -479,7 +480,12 @@ def resolve_inheritance(module, service_decl):
     if base_service_name is None:
         return
 
-    assign_ref(service_decl, "extends")
+    if not assign_ref(service_decl, "extends"):
+        # Continue as if the service does not extend any other service.
+        service_decl.extends = None
+        if service_decl.deployment is None:
+            service_decl.deployment = Deployment(service_decl)
+        return
     base_service = service_decl.extends
 
     if service_decl.config_server is None:
@@ -488,10 +494,147 @@ def resolve_inheritance(module, service_decl):
     if service_decl.service_registry is None:
         service_decl.service_registry = base_service.service_registry
 
+    if service_decl.concurrency is None:
+        service_decl.concurrency = base_service.concurrency
+
+    if service_decl.wire_format is None:
+        service_decl.wire_format = base_service.wire_format
+
+    if service_decl.comm_style is None:
+        service_decl.comm_style = base_service.comm_style
+
     resolve_deployment_inheritance(base_service, service_decl)
     resolve_api_inheritance(base_service, service_decl)
 
 
+def check_concurrency(service_decl):
+    """Checks executors of @async functions of a service. If concurrency is
+    not defined, default executor is used for all @async functions.
+
+    Error will be reported in following cases:
+    1. Executor name is not unique.
+    2. Executor names differ only in case, since the generated Java
+       constants of executors are upper case.
+    3. Executor is named 'async', like the bean of the default executor.
+    4. Executor's max_pool is lower than its core_pool.
+    5. Function uses an executor that is not defined.
+    """
+    if service_decl.concurrency is None:
+        service_decl.concurrency = Concurrency(service_decl)
+    concurrency = service_decl.concurrency
+
+    names = set()
+    # Names of named executors by their upper case form
+    upper_names = {}
+    for executor in [concurrency] + concurrency.executors:
+        name = executor.name if executor.name else "default"
+        if executor.name in names:
+            report(SilveraLoadError(
+                "Redefinition of executor '%s' in service '%s'!" %
+                (name, service_decl.name)))
+        elif executor.name and executor.name.upper() in upper_names:
+            report(SilveraLoadError(
+                "Executors '%s' and '%s' in service '%s' differ only in "
+                "case!" % (upper_names[executor.name.upper()], name,
+                           service_decl.name)))
+        if executor.name == "async":
+            report(SilveraLoadError(
+                "Executor name 'async' in service '%s' is reserved for the "
+                "default executor!" % service_decl.name))
+        names.add(executor.name)
+        if executor.name:
+            upper_names.setdefault(executor.name.upper(), executor.name)
+
+        if executor.max_pool < executor.core_pool:
+            report(SilveraLoadError(
+                "Executor '%s' in service '%s' has max_pool (%d) lower than "
+                "core_pool (%d)!" % (name, service_decl.name,
+                                     executor.max_pool, executor.core_pool)))
+
+    if service_decl.api is None:
+        return
+    for f in service_decl.api.functions:
+        if f.executor is not None and f.executor not in names:
+            report(SilveraLoadError(
+                "Executor '%s' of function '%s' is not defined in service "
+                "'%s'!" % (f.executor, f.name, service_decl.name)))
+
+
+def _protobuf_supported(_type):
+    """Returns True if values of a type can be encoded in protobuf: basic
+    types, typedefs and lists of those."""
+    if isinstance(_type, TypedList):
+        _type = _type.type
+    return isinstance(_type, TypeDef) or \
+        (_type in BASIC_TYPES and _type != "void")
+
+
+def check_wire_format(service_decl):
+    """Checks typedefs that are sent in the protobuf wire format, or over
+    gRPC.
+
+    Error will be reported in following cases:
+    1. Two fields of a typedef have the same tag.
+    2. Tag is in the range reserved by protobuf (19000-19999).
+    3. Field type cannot be encoded: only basic types, typedefs and lists
+       of those are supported.
+    """
+    if service_decl.uses_grpc:
+        # All functions of a gRPC service send protobuf
+        typedefs = service_decl.grpc_typedefs
+    else:
+        typedefs = service_decl.protobuf_typedefs
+
+    for typedef in typedefs:
+        tags = {}
+        for field in typedef.fields:
+            if field.tag in tags:
+                report(SilveraLoadError(
+                    "Fields '%s' and '%s' of type '%s' in service '%s' have "
+                    "the same tag %d!" % (tags[field.tag], field.name,
+                                          typedef.name, service_decl.name,
+                                          field.tag)))
+            tags[field.tag] = field.name
+
+            if 19000 <= field.tag <= 19999:
+                report(SilveraLoadError(
+                    "Tag %d of field '%s' of type '%s' in service '%s' is "
+                    "reserved by protobuf!" % (field.tag, field.name,
+                                               typedef.name,
+                                               service_decl.name)))
+
+            if not _protobuf_supported(field.type):
+                report(SilveraLoadError(
+                    "Field '%s' of type '%s' in service '%s' cannot be sent "
+                    "in protobuf wire format!" % (field.name, typedef.name,
+                                                  service_decl.name)))
+
+
+def check_grpc(service_decl):
+    """Checks functions of a gRPC service.
+
+    Error will be reported in following cases:
+    1. Type of a parameter or return value cannot be encoded in protobuf.
+    2. Function is annotated with @cache or @batchable, which are supported
+       only by REST endpoints.
+    """
+    if not service_decl.uses_grpc or service_decl.api is None:
+        return
+
+    for f in service_decl.api.functions:
+        if f.ret_type != "void" and not _protobuf_supported(f.ret_type):
+            f._report_error("Return type of function '%s' cannot be sent "
+                            "over gRPC!" % f.name)
+        for p in f.params:
+            if not _protobuf_supported(p.type):
+                f._report_error("Parameter '%s' of function '%s' cannot be "
+                                "sent over gRPC!" % (p.name, f.name))
+        if f.cache or f.batchable:
+            f._report_error("Function '%s' of gRPC service '%s' cannot be "
+                            "cached or batched!" % (f.name,
+                                                    service_decl.name))
+
+
 def resolve_api_gateway(module, api_gateway):
 
     reg = api_gateway.service_registry
@@ -528,6 +671,9 @@ def process_module(module):
         if isinstance(decl, ServiceDecl):
             resolve_inheritance(module, decl)
             resolve_custom_types(decl)
+            check_concurrency(decl)
+            check_wire_format(decl)
+            check_grpc(decl)
 
             cfg = decl.config_server
             if cfg and not isinstance(cfg, ConfigServerDecl):
@@ -560,7 +706,7 @@ def process_module(module):
 def check_msg_pool(msg_pool):
     """Checks if all messages and groups are defined correctly.
 
-    Exception will be raised in following cases:
+    Error will be reported in following cases:
     1. MessageGroup is empty (no messages defined inside group).
     2. MessageGroup's ID not unique.
     3. Message's name within the group is not unique.
@@ -587,7 +733,7 @@ def check_msg_pool(msg_pool):
             for g in groups:
                 err_msg += to_err_line(g)
 
-            raise SilveraLoadError(err_msg)
+            report(SilveraLoadError(err_msg))
 
         # Check if there are messages in group
         group = groups[0]
@@ -605,13 +751,32 @@ def check_msg_pool(msg_pool):
                 for msg in messages:
                     err_msg += to_err_line(msg)
 
-                raise SilveraLoadError(err_msg)
+                report(SilveraLoadError(err_msg))
 
     if empty_groups:
         err_msg = "Group(s) without messages found: "
         for g in empty_groups:
             err_msg += to_err_line(g)
-        raise SilveraLoadError(err_msg)
+        report(SilveraLoadError(err_msg))
+
+
+def check_msg_lib_name(model):
+    """Checks that no declaration is named like the shared messages module.
+
+    Message classes can be generated in a shared module (see MSG_SHARED)
+    whose Java package and output folder would collide with those of such a
+    declaration. Names are compared case-insensitively, since output folders
+    may be on a case-insensitive file system.
+    """
+    for module in model.modules:
+        for decl in module.decls:
+            if not isinstance(decl, (ServiceDecl, ConfigServerDecl,
+                                     ServiceRegistryDecl, APIGateway)):
+                continue
+            if decl.name.lower() == MSG_LIB_NAME:
+                report(SilveraLoadError(
+                    "Declaration '%s' in module '%s' is named like the shared "
+                    "module of message classes!" % (decl.name, module.path)))
 
 
 def get_msg_pool(model):
@@ -633,7 +798,8 @@ def get_msg_pool(model):
             for _, file_path, linecol in results:
                 err_msg += "\n\t * {} {}".format(file_path, linecol)
 
-            raise SilveraLoadError(err_msg)
+            # Continue with the first message pool
+            report(SilveraLoadError(err_msg))
 
         msg_pool, _, _ = results[0]
         return msg_pool
@@ -661,21 +827,22 @@ def resolve_channel(msg_channel):
         msg_channel.msg_type = msg
     except ValueError:
         linecol = module._tx_parser.pos_to_linecol(msg_channel._tx_position)
-        raise SilveraLoadError(
+        report(SilveraLoadError(
             "Cannot instantiate message channel '{}'({} {}). Message '{}' not "
             "defined in message pool.".format(
                 msg_channel.name,
                 module.path,
                 linecol,
                 msg_type
-            ))
+            )))
 
 
 def resolve_brokers(brokers):
     """Resolves MessageBroker objects.
 
-    If broker's name if not unique, SilveraLoadError is raised.
-    If channel's name within broker if not unique, SilveraLoadError is raised.
+    If broker's name if not unique, SilveraLoadError is reported.
+    If channel's name within broker if not unique, SilveraLoadError is
+    reported.
 
     Args:
         brokers (list): list of message broker objects
@@ -696,7 +863,7 @@ def resolve_brokers(brokers):
                 err_msg = "Redefinition of message channel found:"
                 for c in chs:
                     err_msg += to_err_line(c)
-                raise SilveraLoadError(err_msg)
+                report(SilveraLoadError(err_msg))
 
         visited[b.name].append(b)
 
@@ -707,7 +874,7 @@ def resolve_brokers(brokers):
             for b in brokers:
                 err_msg += to_err_line(b)
 
-            raise SilveraLoadError(err_msg)
+            report(SilveraLoadError(err_msg))
 
     return {n: b[0] for n, b in visited.items()}
 
@@ -724,11 +891,13 @@ def model_processor(model):
         for dep_path in module.depends_on():
             deps[module].append(dep_path)
 
-    msg_pool = get_msg_pool(model)
+    with phase("msg_pool"):
+        msg_pool = get_msg_pool(model)
 
-    if msg_pool:
-        check_msg_pool(msg_pool)
-        model.msg_pool = msg_pool
+        if msg_pool:
+            check_msg_pool(msg_pool)
+            check_msg_lib_name(model)
+            model.msg_pool = msg_pool
 
     # topologically sort modules
     modules = sort(deps)
@@ -740,16 +909,19 @@ def model_processor(model):
 
     if msg_brokers:
         if not msg_pool:
-            raise SilveraLoadError("Message pool must be defined in order to "
-                                   "instantiate message brokers.")
-
-        # check if message brokers are valid
-        brokers = resolve_brokers(msg_brokers)
-        model.msg_brokers = brokers
+            report(SilveraLoadError("Message pool must be defined in order "
+                                    "to instantiate message brokers."))
+        else:
+            # check if message brokers are valid
+            with phase("brokers"):
+                brokers = resolve_brokers(msg_brokers)
+            model.msg_brokers = brokers
 
     # process all modules
-    for module in reversed(modules.keys()):
-        process_module(module)
+    with phase("process_module"):
+        for module in reversed(modules.keys()):
+            with span(module.path, "process_module"):
+                process_module(module)
 
 
 def sort(modules):
@@ -6,6 +6,7 @@ import json
 
 from silvera.const import BASIC_TYPES
 from silvera.core import TypedList, TypedSet, TypedDict
+from silvera.generator.plan import DumpTask
 
 
 class OpenAPISerializer:
@@ -460,6 +461,23 @@ class OpenAPISerializer:
 class OpenAPIDump:
     """Creates OpenAPI JSON file for given service declaration."""
 
+    @staticmethod
+    def task(service_decl, output_dir):
+        """Returns generation task that creates OpenAPI JSON file for given
+        service declaration. Service is serialized right away, only the
+        JSON file is created when the task is executed.
+
+        Args:
+            service_decl (ServiceDecl): service declaration object
+            output_dir (str): output directory
+
+        Returns:
+            DumpTask
+        """
+        data = OpenAPISerializer().serialize(service_decl)
+        return DumpTask(os.path.join(output_dir, "openapi.json"),
+                        lambda: data, "openapi.json")
+
     @staticmethod
     def dump(service_decl, output_dir):
         """Creates OpenAPI JSON file for given service declaration.
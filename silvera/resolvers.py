@@ -3,6 +3,7 @@ This module contains classes for REST annotations resolvers.
 """
 from silvera.const import HTTP_GET
 from silvera.core import ServiceDecl
+from silvera.trace import span
 
 NO_STRATEGY = 0
 PREFER_POST_OVER_PUT = 1
@@ -81,33 +82,20 @@ class RESTResolver:
 
     def resolve_model(self, model):
         """Resolve model."""
-        for decl in (d for module in model.modules for d in module.decls):
-            if isinstance(decl, ServiceDecl):
+        services = [d for module in model.modules for d in module.decls
+                    if isinstance(d, ServiceDecl)]
+        for decl in services:
+            with span(decl.name, "resolve"):
                 self.resolve_service(decl)
 
+        # Functions of dependencies are resolved once all services are, since
+        # they take the HTTP method from the function of the end service.
+        for decl in services:
+            self.resolve_dependencies(decl)
+
     def resolve_service(self, service):
         """Resolve service."""
-        def http_get_params(func_params):
-            return "/".join(["{%s}" % p.name for p in func_params])
-
-        def func_name_mapping(func):
-            ann = rest_annotation(func)
-            if ann and ann.mapping:
-                fn_mapping = ann.mapping
-            else:
-                fn_mapping = "%s" % func.name.lower()
-
-                if func.http_verb == HTTP_GET and func.params:
-                    fn_mapping += "/" + http_get_params(func.params)
-
-            return fn_mapping
-
-        model = service.parent.model
-        # name = service.name
-        api = service.api
-
-        # path = "%s/" % name.lower()
-        for func in api.functions:
+        for func in service.api.functions:
             ann = rest_annotation(func)
             if ann is not None:
                 self._apply_annotation(func)
@@ -115,13 +103,28 @@ class RESTResolver:
                 self._apply_strategy(func)
 
             func.add_rest_mappings(func_name_mapping(func))
+            if func.cache:
+                self._check_cache(func)
+            if func.batchable:
+                self._check_batchable(func)
 
+    def resolve_dependencies(self, service):
+        """Resolve functions that the service calls in its dependencies."""
+        model = service.parent.model
         for func in service.dep_functions:
             org_serv = model.find_by_fqn(func.service_fqn)
             org_fn = org_serv.get_function(func.name)
             func.http_verb = org_fn.http_verb
             func.rest_path = func_name_mapping(func)
 
+            policy = func.call_policy
+            if policy and policy.hedge_after_ms and \
+                    func.http_verb != HTTP_GET:
+                func._report_error(
+                    "Only GET functions can be hedged, but '%s' of service "
+                    "'%s' is %s!" % (func.name, func.service_name,
+                                     func.http_verb))
+
     def _apply_annotation(self, func):
         """Applies the REST annotation given in .si file.
 
@@ -131,6 +134,47 @@ class RESTResolver:
         ann = rest_annotation(func)
         func.http_verb = ann.method
 
+    def _check_cache(self, func):
+        """Checks if responses of a function annotated with @cache can be
+        cached. Cached function must be a GET function that returns a value,
+        and all its parameters must be in the URL, since they make the cache
+        key.
+
+        Args:
+            func (Function): function object
+        """
+        if func.http_verb != HTTP_GET:
+            func._report_error("Only GET functions can be cached, but '%s' "
+                               "is %s!" % (func.name, func.http_verb))
+        elif func.ret_type == "void":
+            func._report_error("Function '%s' returns no value and cannot "
+                               "be cached!" % func.name)
+        else:
+            for p in func.params:
+                if p not in func.cache_key_params:
+                    func._report_error(
+                        "Parameter '%s' of cached function '%s' must be a "
+                        "URL placeholder or a query parameter!" %
+                        (p.name, func.name))
+
+    def _check_batchable(self, func):
+        """Checks if calls of a function annotated with @batchable can be
+        batched. Batchable function must take a single parameter (the key),
+        return a value, and must not be async.
+
+        Args:
+            func (Function): function object
+        """
+        if len(func.params) != 1:
+            func._report_error("Batchable function '%s' must have exactly "
+                               "one parameter!" % func.name)
+        elif func.ret_type == "void":
+            func._report_error("Function '%s' returns no value and cannot "
+                               "be batched!" % func.name)
+        elif func.is_async():
+            func._report_error("Function '%s' cannot be both async and "
+                               "batchable!" % func.name)
+
     def _apply_strategy(self, func):
         """Tries to calculate REST path for the function based on chosen
         resolution strategy.
@@ -141,6 +185,20 @@ class RESTResolver:
         self.strategy.apply(func)
 
 
+def func_name_mapping(func):
+    """Returns the REST mapping of a function: mapping from its @rest
+    annotation, or the function name followed by its parameters for GET
+    functions."""
+    ann = rest_annotation(func)
+    if ann and ann.mapping:
+        return ann.mapping
+
+    fn_mapping = "%s" % func.name.lower()
+    if func.http_verb == HTTP_GET and func.params:
+        fn_mapping += "/" + "/".join(["{%s}" % p.name for p in func.params])
+    return fn_mapping
+
+
 class ResolvingStrategy:
 
     def __init__(self):
@@ -1,13 +1,29 @@
+import copy
 import os
 import fnmatch
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from silvera import __version__
+from silvera.generator.cache import GenerationCache
 from silvera.generator.generator import generate
 from silvera.lang.meta import get_metamodel
 from silvera.lang.obj_processors import model_processor
+from silvera.lang.compaction import compact
 from silvera.resolvers import RESTResolver, NO_STRATEGY
 from silvera.core import Model, Module
+from silvera.const import MSG_PER_SERVICE
+from silvera.diagnostics import collect, error_message
+from silvera.exceptions import SilveraErrors
+from silvera.timings import phase
+from silvera.trace import span
 
 
-def compile(src_path, output_dir=None, rest_res_strategy=NO_STRATEGY):
+def compile(src_path, output_dir=None, rest_res_strategy=NO_STRATEGY,
+            msg_mode=MSG_PER_SERVICE):
     """Runs Silvera compiler
 
     After this function is called, Silvera will process the given .si file,
@@ -18,11 +34,14 @@ def compile(src_path, output_dir=None, rest_res_strategy=NO_STRATEGY):
         output_dir (str): path to the directory where compiled application will
             be stored
         rest_res_strategy (int): REST resolving strategy.
+        msg_mode (str): how message classes are generated (see MSG_* in
+            silvera.const)
 
     Returns:
         None
     """
     model = load(src_path, rest_res_strategy)
+    model.msg_mode = msg_mode
 
     if output_dir is None:
         output_dir = src_path
@@ -32,15 +51,153 @@ def compile(src_path, output_dir=None, rest_res_strategy=NO_STRATEGY):
     generate(model, output_dir)
 
 
+# Generator data, like template environments, shared by all projects
+# compiled by `compile_many` in this process.
+_shared_generator_data = {}
+
+
+class ProjectResult:
+    """Result of compiling one of the projects with `compile_many`.
+
+    Attributes:
+        project_dir (str): path to the project
+        output_dir (str): path to the generated code
+        error (str): error message, or None if compilation succeeded
+        duration (float): compilation time in seconds
+    """
+    def __init__(self, project_dir, output_dir, error=None, duration=0):
+        super().__init__()
+        self.project_dir = project_dir
+        self.output_dir = output_dir
+        self.error = error
+        self.duration = duration
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def exit_code(self):
+        return 0 if self.ok else 1
+
+    def to_dict(self):
+        return OrderedDict([
+            ("project_dir", self.project_dir),
+            ("output_dir", self.output_dir),
+            ("exit_code", self.exit_code),
+            ("error", self.error),
+            ("duration", self.duration)
+        ])
+
+
+def compile_many(projects, output_root=None, rest_res_strategy=NO_STRATEGY,
+                 msg_mode=MSG_PER_SERVICE, workers=1, jobs=1, cache_dir=None,
+                 debug=False):
+    """Compiles several projects in one process, or in a pool of worker
+    processes.
+
+    The metamodel, template environments and hashes of templates are created
+    once per process and shared by all projects compiled in it. A failure of
+    one project doesn't stop compilation of the others.
+
+    Args:
+        projects (list): paths to the projects
+        output_root (str): directory in which code of each project is
+            generated into a directory named after the project. By default,
+            code is generated into the "output" directory of each project.
+        rest_res_strategy (int): REST resolving strategy.
+        msg_mode (str): how message classes are generated (see MSG_* in
+            silvera.const)
+        workers (int): number of worker processes. If 1, projects are
+            compiled in the current process.
+        jobs (int): number of worker threads used for rendering of each
+            project
+        cache_dir (str): directory of the cache of rendered files, shared by
+            all projects and workers
+        debug (bool): debug flag
+
+    Returns:
+        list: ProjectResult for each project, in order of `projects`
+    """
+    projects = [os.path.abspath(p) for p in projects]
+    if output_root is None:
+        output_dirs = [os.path.join(p, "output") for p in projects]
+    else:
+        output_dirs = [os.path.join(os.path.abspath(output_root),
+                                    os.path.basename(p)) for p in projects]
+    if len(set(output_dirs)) != len(output_dirs):
+        raise ValueError("Projects must have different names to be "
+                         "generated into the same directory.")
+
+    args = [(p, o, rest_res_strategy, msg_mode, jobs, cache_dir, debug)
+            for p, o in zip(projects, output_dirs)]
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            return list(executor.map(_compile_project, *zip(*args)))
+    return [_compile_project(*a) for a in args]
+
+
+def _compile_project(project_dir, output_dir, rest_res_strategy, msg_mode,
+                     jobs, cache_dir, debug):
+    """Compiles one project for `compile_many`. Errors are returned in the
+    result instead of being raised."""
+    start = time.perf_counter()
+    error = None
+    try:
+        model = load(project_dir, rest_res_strategy)
+        model.msg_mode = msg_mode
+        os.makedirs(output_dir, exist_ok=True)
+        cache = GenerationCache(cache_dir) if cache_dir else None
+        generate(model, output_dir, debug, jobs, cache=cache,
+                 shared=_shared_generator_data)
+    except Exception as ex:
+        error = error_message(ex) or type(ex).__name__
+    return ProjectResult(project_dir, output_dir, error,
+                         time.perf_counter() - start)
+
+
+def read_project_list(path):
+    """Reads paths to projects from a file, one per line.
+
+    Empty lines and lines starting with "#" are skipped. Relative paths are
+    relative to the directory of the file.
+
+    Args:
+        path (str): path to the file
+
+    Returns:
+        list
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+    projects = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                projects.append(os.path.join(base_dir, line))
+    return projects
+
+
 _metamodel = None
 
+# Models loaded from in-memory sources, by hash of the sources, in order
+# from the least to the most recently used.
+_sources_cache = OrderedDict()
+_sources_cache_lock = threading.Lock()
+
+# Number of models kept in the cache of `load_from_sources`
+SOURCES_CACHE_SIZE = 32
+
 
-def load(src_path, rest_res_strategy=NO_STRATEGY):
+def load(src_path, rest_res_strategy=NO_STRATEGY, collect_errors=False):
     """Loads project
 
     Args:
         src_path(str): path to the project root dir, or to a single .si file.
         rest_res_strategy (int): REST resolving strategy.
+        collect_errors (bool): if True, loading doesn't stop on the first
+            error in the model. All errors are collected and raised together
+            as SilveraErrors.
 
     Returns:
         Model
@@ -49,26 +206,156 @@ def load(src_path, rest_res_strategy=NO_STRATEGY):
         raise ValueError("Loading failed. Directory '%s' doesn't exist." %
                          src_path)
 
-    global _metamodel
+    with phase("load"):
+        metamodel = _get_metamodel()
+
+        with phase("discovery"):
+            module_paths = []
+            for root, _, filenames in os.walk(src_path):
+                for filename in fnmatch.filter(filenames, "*.si"):
+                    module_paths.append(os.path.join(root, filename))
+
+        sources = OrderedDict((module_path.replace(src_path, "")[1:],
+                               module_path)
+                              for module_path in module_paths)
+        return _load_modules(Model(src_path), sources,
+                             metamodel.model_from_file, rest_res_strategy,
+                             collect_errors)
+
 
+def load_from_sources(sources, rest_res_strategy=NO_STRATEGY,
+                      collect_errors=False, use_cache=True):
+    """Loads project from sources in memory, without accessing the disk.
+
+    Loaded models are kept in a LRU cache (see SOURCES_CACHE_SIZE), so the
+    same sources are parsed only once. Each call returns a copy of the cached
+    model, which callers can modify (e.g. generators annotate its objects).
+
+    Args:
+        sources (dict): module sources by module path relative to the
+            project root, e.g. {"user.si": "service UserService {...}"}
+        rest_res_strategy (int): REST resolving strategy.
+        collect_errors (bool): if True, loading doesn't stop on the first
+            error in the model. All errors are collected and raised together
+            as SilveraErrors.
+        use_cache (bool): if False, the model is always loaded and not stored
+            in the cache
+
+    Returns:
+        Model
+    """
+    sources = OrderedDict((os.path.normpath(path), sources[path])
+                          for path in sorted(sources))
+    key = sources_hash(sources, rest_res_strategy)
+
+    if use_cache:
+        with _sources_cache_lock:
+            if key in _sources_cache:
+                _sources_cache.move_to_end(key)
+                return _copy_model(_sources_cache[key])
+
+    with phase("load"):
+        metamodel = _get_metamodel()
+        model = _load_modules(Model(None), sources, metamodel.model_from_str,
+                              rest_res_strategy, collect_errors)
+
+    if use_cache:
+        with _sources_cache_lock:
+            _sources_cache[key] = model
+            while len(_sources_cache) > SOURCES_CACHE_SIZE:
+                _sources_cache.popitem(last=False)
+        return _copy_model(model)
+
+    return model
+
+
+def _copy_model(model):
+    """Returns a deep copy of a loaded model. Copying is much faster than
+    parsing. The metamodel is shared by the copies."""
+    memo = {}
+    for module in model.modules:
+        metamodel = getattr(module, "_tx_metamodel", None)
+        if metamodel is not None:
+            memo[id(metamodel)] = metamodel
+    return copy.deepcopy(model, memo)
+
+
+def sources_hash(sources, rest_res_strategy=NO_STRATEGY):
+    """Returns hash of module sources, used as the cache key of
+    `load_from_sources`.
+
+    Args:
+        sources (dict): module sources by module path
+        rest_res_strategy (int): REST resolving strategy.
+
+    Returns:
+        str
+    """
+    h = hashlib.sha256()
+    h.update(__version__.encode())
+    h.update(str(rest_res_strategy).encode())
+    for path in sorted(sources):
+        h.update(path.encode())
+        h.update(hashlib.sha256(sources[path].encode()).digest())
+    return h.hexdigest()
+
+
+def _get_metamodel():
+    global _metamodel
     if not _metamodel:
-        _metamodel = get_metamodel()
+        with phase("metamodel"):
+            _metamodel = get_metamodel()
+    return _metamodel
+
 
-    model = Model(src_path)
-    for root, _, filenames in os.walk(src_path):
-        for filename in fnmatch.filter(filenames, "*.si"):
-            module_path = os.path.join(root, filename)
-            module = _metamodel.model_from_file(module_path)
+def _load_modules(model, sources, parse, rest_res_strategy, collect_errors):
+    """Parses and processes modules of a model.
+
+    Args:
+        model (Model): empty model
+        sources (dict): sources passed to `parse` by module path
+        parse (callable): returns Module parsed from its source
+        rest_res_strategy (int): REST resolving strategy.
+        collect_errors (bool): if True, all errors are collected and raised
+            together as SilveraErrors.
+
+    Returns:
+        Model
+    """
+    with phase("parsing"):
+        for path, source in sources.items():
+            with span(path, "parse"):
+                module = parse(source)
             if not isinstance(module, Module):
                 raise ValueError("Loading failed. Invalid module: %s" %
-                                 module_path)
+                                 path)
             module.model = model
-            module.path = module_path.replace(src_path, "")[1:]
+            module.path = path
             model.modules.append(module)
 
-    model_processor(model)
+    with ExitStack() as stack:
+        diagnostics = stack.enter_context(collect()) if collect_errors \
+            else None
+        try:
+            with phase("model_processor"):
+                model_processor(model)
+
+            with phase("rest_resolver"):
+                resolver = RESTResolver(rest_res_strategy)
+                resolver.resolve_model(model)
+        except Exception as ex:
+            # Processing can fail because of errors that were already
+            # collected, so report all of them.
+            if diagnostics is None or not diagnostics.errors:
+                raise
+            diagnostics.report(ex)
+
+    if diagnostics is not None and diagnostics.errors:
+        raise SilveraErrors(diagnostics.errors)
 
-    resolver = RESTResolver(rest_res_strategy)
-    resolver.resolve_model(model)
+    # Parsers are not needed anymore, keep only what is needed for
+    # error messages.
+    with phase("compaction"):
+        compact(model)
 
     return model
@@ -0,0 +1,167 @@
+"""
+This module measures how long each compilation phase takes.
+
+Phases are marked in the code with `phase`, which does nothing unless
+timings are being collected with `collect`:
+
+    with collect() as timings:
+        model = load(project_dir)
+        generate(model, output_dir)
+
+    for p in timings.phases:
+        print(p.name, p.wall, p.cpu, p.peak_mem)
+
+Phases can be nested, in which case the name of the nested phase contains
+the names of all enclosing phases, e.g. "load/model_processor/brokers".
+"""
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+from silvera.trace import span
+
+# Timings that are currently collected
+_timings = None
+
+
+class Phase:
+    """Measurements of a single phase.
+
+    Attributes:
+        name (str): phase name, including names of enclosing phases
+        depth (int): number of enclosing phases
+        wall (float): wall time in seconds
+        cpu (float): CPU time of the process in seconds
+        peak_mem (int): peak size of memory blocks traced by tracemalloc
+            during the phase, in bytes
+    """
+    def __init__(self, name, depth):
+        super().__init__()
+        self.name = name
+        self.depth = depth
+        self.wall = 0
+        self.cpu = 0
+        self.peak_mem = 0
+
+    def to_dict(self):
+        return OrderedDict([
+            ("name", self.name),
+            ("wall", self.wall),
+            ("cpu", self.cpu),
+            ("peak_mem", self.peak_mem)
+        ])
+
+
+class Timings:
+    """Measurements of all phases, in order in which phases were started.
+
+    Attributes:
+        phases (list): list of `Phase` objects
+        trace_memory (bool): if False, peak memory is not measured
+    """
+    def __init__(self, trace_memory=True):
+        super().__init__()
+        self.phases = []
+        self.trace_memory = trace_memory
+        self._stack = []
+
+    def __getitem__(self, name):
+        for p in self.phases:
+            if p.name == name:
+                return p
+        raise KeyError(name)
+
+    def to_dict(self):
+        return [p.to_dict() for p in self.phases]
+
+    def to_table(self):
+        """Returns measurements formatted as a table. Nested phases are
+        indented.
+
+        Returns:
+            str
+        """
+        names = ["  " * p.depth + p.name.split("/")[-1] for p in self.phases]
+        width = max([len("Phase")] + [len(n) for n in names])
+        row = "{:<%d} {:>10} {:>10} {:>14}" % width
+        lines = [row.format("Phase", "Wall (s)", "CPU (s)", "Peak mem (KB)")]
+        for name, p in zip(names, self.phases):
+            lines.append(row.format(name, "%.3f" % p.wall, "%.3f" % p.cpu,
+                                    "%.1f" % (p.peak_mem / 1024)))
+        return "\n".join(lines)
+
+    def _peak_mem(self):
+        return tracemalloc.get_traced_memory()[1] if self.trace_memory else 0
+
+    @contextmanager
+    def phase(self, name):
+        if self._stack:
+            parent = self._stack[-1]
+            name = "%s/%s" % (parent.name, name)
+            # Peak is reset for the nested phase, so remember the enclosing
+            # phase's peak so far.
+            parent.peak_mem = max(parent.peak_mem, self._peak_mem())
+
+        p = Phase(name, len(self._stack))
+        self.phases.append(p)
+        self._stack.append(p)
+
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield p
+        finally:
+            p.wall = time.perf_counter() - wall
+            p.cpu = time.process_time() - cpu
+            p.peak_mem = max(p.peak_mem, self._peak_mem())
+            self._stack.pop()
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak_mem = max(parent.peak_mem, p.peak_mem)
+
+
+@contextmanager
+def collect(trace_memory=True):
+    """Collects timings of all phases run inside the `with` block.
+
+    Memory allocations are traced with tracemalloc during collection, which
+    slows down the compilation.
+
+    Args:
+        trace_memory (bool): if False, memory is not traced, and only wall
+            and CPU times are measured
+
+    Yields:
+        Timings
+    """
+    global _timings
+    timings = Timings(trace_memory)
+    prev_timings, _timings = _timings, timings
+
+    tracing = tracemalloc.is_tracing() or not trace_memory
+    if not tracing:
+        tracemalloc.start()
+    try:
+        yield timings
+    finally:
+        _timings = prev_timings
+        if not tracing:
+            tracemalloc.stop()
+
+
+@contextmanager
+def phase(name):
+    """Marks a compilation phase. Measured only if timings are being
+    collected. Phase is also recorded as a span, if spans are being recorded
+    (see `silvera.trace`).
+
+    Args:
+        name (str): phase name
+    """
+    with span(name, "phase"):
+        if _timings is None:
+            yield None
+        else:
+            with _timings.phase(name) as p:
+                yield p
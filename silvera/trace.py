@@ -0,0 +1,125 @@
+"""
+This module records spans of compiler activity in Trace Event Format, which
+can be opened in trace viewers like Perfetto or chrome://tracing.
+
+Spans are marked in the code with `span`, which does nothing unless spans are
+being recorded with `record`:
+
+    with record() as tracer:
+        model = load(project_dir)
+    tracer.dump("trace.json")
+
+Compilation phases (see `silvera.timings`) are recorded as spans too.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Tracer that currently records spans
+_tracer = None
+
+
+class Tracer:
+    """Collects spans from all threads.
+
+    Attributes:
+        events (list): recorded trace events
+    """
+    def __init__(self):
+        super().__init__()
+        self.events = []
+        self._start = time.perf_counter()
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    def _tid(self):
+        """Returns the id of the current thread. Ids are small numbers in
+        order in which threads recorded their first span, and are named
+        after threads (main thread, worker threads)."""
+        thread = threading.current_thread()
+        with self._lock:
+            if thread.ident not in self._threads:
+                tid = len(self._threads)
+                self._threads[thread.ident] = tid
+                self.events.append({
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": os.getpid(),
+                    "tid": tid,
+                    "args": {"name": thread.name}
+                })
+            return self._threads[thread.ident]
+
+    def _now(self):
+        """Returns microseconds since the tracer was created."""
+        return (time.perf_counter() - self._start) * 1e6
+
+    @contextmanager
+    def span(self, name, cat, **args):
+        tid = self._tid()
+        start = self._now()
+        try:
+            yield
+        finally:
+            event = {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": start,
+                "dur": self._now() - start,
+                "pid": os.getpid(),
+                "tid": tid
+            }
+            if args:
+                event["args"] = args
+            with self._lock:
+                self.events.append(event)
+
+    def to_dict(self):
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def dump(self, path):
+        """Dumps recorded spans into a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+
+@contextmanager
+def record():
+    """Records spans from all code run inside the `with` block.
+
+    Yields:
+        Tracer
+    """
+    global _tracer
+    tracer = Tracer()
+    prev_tracer, _tracer = _tracer, tracer
+    try:
+        yield tracer
+    finally:
+        _tracer = prev_tracer
+
+
+def recording():
+    """Returns True if spans are being recorded. Used to skip preparing
+    arguments of spans that would not be recorded."""
+    return _tracer is not None
+
+
+@contextmanager
+def span(name, cat, **args):
+    """Marks a span of compiler activity. Recorded only if spans are being
+    recorded.
+
+    Args:
+        name (str): span name, e.g. module path or template name
+        cat (str): span category, e.g. "parse" or "render"
+        args: additional data shown for the span
+    """
+    if _tracer is None:
+        yield
+    else:
+        with _tracer.span(name, cat, **args):
+            yield
@@ -1,6 +1,7 @@
 import os
 import pytest
-from silvera.run import compile
+from silvera.generator.generator import create_plan
+from silvera.run import compile, load
 from silvera.utils import get_root_path
 
 
@@ -12,3 +13,71 @@ def example_path():
 
 def test_async(example_path):
     compile(example_path, output_dir=os.path.join(example_path, "src-gen"))
+
+
+def test_async_non_blocking(example_path, tmp_path):
+    model = load(example_path)
+    files = {os.path.basename(t.path): t for t in create_plan(model,
+                                                              str(tmp_path))}
+
+    controller = files["TasksBoardController.java"].render()
+    assert "public CompletableFuture<Board> getBoard(" in controller
+    assert "return tasksBoardService.getBoard(id);" in controller
+    assert ".get()" not in controller
+    # Nothing blocks, so no method declares InterruptedException
+    assert "InterruptedException" not in controller
+    assert "InterruptedException" not in \
+        files["ITasksBoardService.java"].render()
+
+    # Async functions of dependencies are called with a non-blocking client
+    client = files["EmployeeClient.java"].render()
+    assert "public CompletableFuture<Employee> getEmployee(" in client
+    assert "webClient.get()" in client
+    assert "restTemplate.getForObject" not in client
+    assert '@Bean(name = "EmployeeWebClient")' in \
+        files["HttpClientConfig.java"].render()
+
+
+def test_async_call_policy(example_path, tmp_path):
+    model = load(example_path)
+    files = {os.path.basename(t.path): t for t in create_plan(model,
+                                                              str(tmp_path))}
+    client = files["EmployeeClient.java"].render()
+    assert "new Semaphore(50);" in client
+    assert "Mono.delay(Duration.ofMillis(150)).then(call)" in client
+    assert "Retry.backoff(2, Duration.ofMillis(100)).jitter(0.5)" in client
+    assert ".timeout(Duration.ofMillis(500))" in client
+
+
+def test_async_executors(example_path, tmp_path):
+    model = load(example_path)
+    board = model.find_by_fqn("board.TasksBoard")
+    concurrency = board.concurrency
+    assert (concurrency.core_pool, concurrency.max_pool,
+            concurrency.queue_capacity, concurrency.rejection) == \
+        (4, 8, 200, "caller_runs")
+    io = concurrency.get_executor("io")
+    assert (io.core_pool, io.max_pool, io.queue_capacity, io.rejection) == \
+        (16, 64, 1000, "abort")
+    assert board.get_function("assignTask").executor == "io"
+    assert board.get_function("getBoard").executor is None
+
+    # Services without the concurrency section use the default executor
+    employee = model.find_by_fqn("board.Employee").concurrency
+    assert (employee.core_pool, employee.max_pool, employee.executors) == \
+        (3, 3, [])
+
+    files = {os.path.basename(t.path): t for t in create_plan(model,
+                                                              str(tmp_path))}
+    config = files["AsyncConfig.java"].render()
+    assert "CORE_POOL_SIZE = 4;" in config
+    assert 'IO_EXECUTOR = "ioExecutor";' in config
+    assert "IO_MAX_POOL_SIZE = 64;" in config
+
+    async_cfg = files["TasksBoardAsyncConfiguration.java"].render()
+    assert "@Bean(name=AsyncConfig.IO_EXECUTOR)" in async_cfg
+    assert "new ThreadPoolExecutor.CallerRunsPolicy()" in async_cfg
+
+    service = files["ITasksBoardService.java"].render()
+    assert "@Async(AsyncConfig.IO_EXECUTOR)" in service
+    assert "@Async(AsyncConfig.CONFIG_NAME)" in service
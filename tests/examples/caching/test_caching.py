@@ -0,0 +1,40 @@
+import os
+import pytest
+from silvera.generator.generator import create_plan
+from silvera.run import load
+from silvera.utils import get_root_path
+
+
+@pytest.fixture
+def example_path():
+    return os.path.join(get_root_path(), "tests", "examples", "caching")
+
+
+def test_cache(example_path, tmp_path):
+    model = load(example_path)
+    catalog = model.find_by_fqn("catalog.Catalog")
+
+    get_product = catalog.get_function("getProduct")
+    assert (get_product.cache.ttl, get_product.cache.max_entries) == \
+        (30, 10000)
+    search = catalog.get_function("search")
+    assert (search.cache.ttl, search.cache.max_entries) == (60, 1000)
+    assert [p.name for p in search.cache_key_params] == ["name"]
+    count = catalog.get_function("count")
+    assert (count.cache.ttl, count.cache.max_entries) == (60, 1)
+    assert catalog.get_function("price").cache is None
+
+    files = {os.path.basename(t.path): t for t in create_plan(model,
+                                                              str(tmp_path))}
+    controller = files["CatalogController.java"].render()
+    assert 'getProductCache = new ResponseCache("getProduct", 30000L, ' \
+           '10000);' in controller
+    assert "return getProductCache.get(Arrays.asList(id), () -> " \
+           "catalogService.getProduct(id));" in controller
+    assert "return searchCache.get(Arrays.asList(name), () -> " \
+           "catalogService.search(name));" in controller
+    assert "return countCache.get(Arrays.asList(), () -> " \
+           "catalogService.count());" in controller
+    assert "priceCache" not in controller
+    assert "searchCache.bindTo(registry);" in controller
+    assert "ResponseCache.java" in files
@@ -0,0 +1,152 @@
+import os
+import pytest
+from silvera.generator.generator import create_plan
+from silvera.run import load
+from silvera.utils import get_root_path
+
+
+@pytest.fixture
+def example_path():
+    return os.path.join(get_root_path(), "tests", "examples", "dependencies")
+
+
+def rendered(plan, file_name):
+    for task in plan:
+        if os.path.basename(task.path) == file_name:
+            return task.render()
+    raise KeyError(file_name)
+
+
+def test_http_client(example_path, tmp_path):
+    model = load(example_path)
+    order = model.find_by_fqn("shop.Order")
+
+    client = order.dependency_decls["Stock"].http_client
+    assert client.max_connections == 100
+    assert client.max_per_route == 40
+    assert client.connect_timeout == 500
+    assert client.read_timeout == 3000
+    assert client.idle_timeout == 10000
+
+    # Defaults are used if http-client is not defined
+    client = order.dependency_decls["Customer"].http_client
+    assert client.max_connections == 50
+    assert client.read_timeout == 10000
+
+    plan = create_plan(model, str(tmp_path))
+    config = rendered(plan, "HttpClientConfig.java")
+    assert '@Bean(name = "StockRestTemplate")' in config
+    assert '@Bean(name = "CustomerRestTemplate")' in config
+    assert "connectionManager.setMaxTotal(100);" in config
+    assert ".evictIdleConnections(10000, TimeUnit.MILLISECONDS)" in config
+
+    stock_client = rendered(plan, "StockClient.java")
+    assert '@Qualifier("StockRestTemplate")' in stock_client
+    assert "new RestTemplate()" not in stock_client
+
+
+def test_load_balancer(example_path, tmp_path):
+    model = load(example_path)
+    order = model.find_by_fqn("shop.Order")
+
+    lb = order.dependency_decls["Stock"].load_balancer
+    assert lb.strategy == "least_outstanding"
+    assert lb.refresh_interval == 5000
+    lb = order.dependency_decls["Customer"].load_balancer
+    assert lb.strategy == "round_robin"
+
+    plan = create_plan(model, str(tmp_path))
+    stock_client = rendered(plan, "StockClient.java")
+    assert '"Stock",\n        LoadBalancer.Strategy.LEAST_OUTSTANDING,\n' \
+           '        5000,' in stock_client
+    # Without a registry, all replicas are known statically
+    assert 'Arrays.asList("http://localhost:8081", "http://localhost:8082")' \
+        in stock_client
+    assert "DiscoveryClient" not in stock_client
+    assert "loadBalancer.release(targetUri);" in stock_client
+    balancer = rendered(plan, "LoadBalancer.java")
+    assert "class LoadBalancer" in balancer
+    assert "throw new NoInstancesException(serviceName);" in balancer
+    # Instances are fetched again on each call until some are known
+    assert "return instances.isEmpty() || now - refreshedAt >= " \
+           "refreshInterval;" in balancer
+
+
+def test_fallback_cache(example_path, tmp_path):
+    model = load(example_path)
+    order = model.find_by_fqn("shop.Order")
+
+    cache = order.dependency_decls["Customer"].fallback_cache
+    assert (cache.ttl, cache.max_entries) == (60, 500)
+    cache = order.dependency_decls["Stock"].fallback_cache
+    assert (cache.ttl, cache.max_entries) == (300, 1000)
+
+    plan = create_plan(model, str(tmp_path))
+    client = rendered(plan, "CustomerClient.java")
+    assert "emailFallbackCache = new FallbackCache(60000L, 500);" in client
+    # Successful responses are recorded, and served by the fallback
+    assert "emailFallbackCache.put(Arrays.asList(customerId), response);" \
+        in client
+    assert 'return emailFallbackCache.get(Arrays.asList(customerId), "");' \
+        in client
+    assert "FallbackCache" not in rendered(plan, "StockClient.java")
+    assert "class FallbackCache" in rendered(plan, "FallbackCache.java")
+
+
+def test_call_policy(example_path, tmp_path):
+    model = load(example_path)
+    order = model.find_by_fqn("shop.Order")
+    functions = {f.name: f for f in order.dep_functions}
+
+    policy = functions["available"].call_policy
+    assert (policy.timeout_ms, policy.max_concurrent, policy.retries,
+            policy.backoff_ms, policy.hedge_after_ms) == (300, 20, 2, 50, 100)
+    assert functions["reserve"].call_policy is None
+
+    plan = create_plan(model, str(tmp_path))
+    client = rendered(plan, "StockClient.java")
+    assert 'threadPoolKey = "Stock.available"' in client
+    assert '"execution.isolation.thread.timeoutInMilliseconds", ' \
+           'value = "300"' in client
+    assert '@HystrixProperty(name = "coreSize", value = "20")' in client
+    assert "return Resilience.retry(2, 50, 300, () -> Resilience.hedge(" \
+           "100, availableHedgeExecutor, () -> callAvailable(product)));" \
+        in client
+    # Hedged calls run on a bounded executor of the function
+    assert 'availableHedgeExecutor =\n        Resilience.hedgeExecutor(' \
+           '"Stock.available", 20);' in client
+    # Functions without a policy are called directly
+    assert "callReserve" not in client
+    assert "public static <T> T retry(" in \
+        rendered(plan, "Resilience.java")
+
+
+def test_batching(example_path, tmp_path):
+    model = load(example_path)
+    email = model.find_by_fqn("shop.Customer").get_function("email")
+    assert (email.batchable.max_batch, email.batchable.max_wait_ms) == \
+        (50, 10)
+
+    plan = create_plan(model, str(tmp_path))
+    # Bulk endpoint of the callee
+    controller = rendered(plan, "CustomerController.java")
+    assert '@PostMapping(value="email/batch")' in controller
+    assert "emailBatch(@RequestBody java.util.List<java.lang.Integer> " \
+           "customerIdList)" in controller
+    assert "return customerService.emailBatch(customerIdList);" in controller
+    assert "public default java.util.List<java.lang.String> emailBatch(" in \
+        rendered(plan, "ICustomerService.java")
+
+    # Coalescing client of the caller
+    client = rendered(plan, "CustomerClient.java")
+    assert "BatchLoader<java.lang.Integer, java.lang.String> emailLoader" \
+        in client
+    assert "new BatchLoader<>(50, 10, this::emailBatch);" in client
+    assert "return emailLoader.get(customerId);" in client
+    assert 'targetUri + "/email/batch"' in client
+    loader = rendered(plan, "BatchLoader.java")
+    assert "class BatchLoader<K, V>" in loader
+    # Bulk calls run on a bounded pool with a bounded queue
+    assert "new ArrayBlockingQueue<>(MAX_QUEUED_BATCHES)" in loader
+    assert "newCachedThreadPool" not in loader
+    assert "BatchLoader" not in rendered(plan, "StockClient.java")
@@ -0,0 +1,81 @@
+import os
+import pytest
+from silvera.generator.generator import create_plan
+from silvera.run import load
+from silvera.utils import get_root_path
+
+
+@pytest.fixture
+def example_path():
+    return os.path.join(get_root_path(), "tests", "examples", "grpc")
+
+
+def test_grpc(example_path, tmp_path):
+    model = load(example_path)
+    catalog = model.find_by_fqn("catalog.Catalog")
+    store = model.find_by_fqn("catalog.Store")
+
+    assert catalog.uses_grpc
+    assert not store.uses_grpc
+    assert [t.name for t in catalog.grpc_typedefs] == ["Product"]
+
+    files = {os.path.relpath(t.path, str(tmp_path)): t
+             for t in create_plan(model, str(tmp_path))}
+
+    schema = files["Catalog/src/main/proto/Catalog.proto"].render()
+    assert 'option java_package = "com.silvera.Catalog.grpc";' in schema
+    assert "repeated string tags = 4;" in schema
+    assert "message SearchRequest {\n" \
+           "    optional string query = 1;\n" \
+           "    optional int64 limit = 2;\n" \
+           "}" in schema
+    assert "message RemoveResponse {\n}" in schema
+    assert "rpc GetProduct(GetProductRequest) returns " \
+           "(GetProductResponse);" in schema
+    assert "rpc Search(SearchRequest) returns (stream SearchResponse);" \
+        in schema
+
+    # gRPC endpoints replace the REST controller and the OpenAPI spec
+    java_path = "Catalog/src/main/java/com/silvera/Catalog/"
+    assert java_path + "controller/CatalogController.java" not in files
+    assert "Catalog/openapi.json" not in files
+    grpc_service = files[java_path + "grpc/CatalogGrpcService.java"].render()
+    assert "extends CatalogGrpc.CatalogImplBase" in grpc_service
+    assert "responseObserver.onNext(SearchResponse.newBuilder()" \
+           ".setValue(CatalogProtoMapper.toProto(value)).build());" \
+        in grpc_service
+    assert "catalogService.addProduct(request.hasProduct() ? " \
+           "CatalogProtoMapper.fromProto(request.getProduct()) : null)" \
+           ".whenComplete(" in grpc_service
+
+    mapper = files[java_path + "grpc/CatalogProtoMapper.java"].render()
+    assert "builder.setAdded(value.getAdded().getTime());" in mapper
+    assert "value.setTags(new java.util.ArrayList<>(message.getTagsList()));" \
+        in mapper
+
+    props = files["Catalog/src/main/resources/application.properties"]
+    assert "grpc.server.port=${GRPC_PORT:18080}" in props.render()
+    assert "grpc-spring-boot-starter" in files["Catalog/pom.xml"].render()
+
+    # Dependent service calls all instances over a gRPC channel
+    props = files["Store/src/main/resources/application.properties"].render()
+    assert "grpc.client.Catalog.address=" \
+           "static://localhost:18080,localhost:18081" in props
+    assert "Store/src/main/proto/Catalog.proto" in files
+    assert "protobuf-maven-plugin" in files["Store/pom.xml"].render()
+    assert "httpclient" not in files["Store/pom.xml"].render()
+
+    dp_path = "Store/src/main/java/com/silvera/Store/service/dependencies/"
+    client = files[dp_path + "CatalogClient.java"].render()
+    assert '@GrpcClient("Catalog")' in client
+    assert "blockingStub.withDeadlineAfter(300, TimeUnit.MILLISECONDS)" \
+           ".getProduct(getProductRequest(code));" in client
+    assert "Resilience.retry(2, 100, 300, () -> callGetProduct(code));" \
+        in client
+    assert "HedgeExecutor" not in client
+    assert "asyncStub.addProduct(addProductRequest(product)" in client
+    assert "if (limit != null) { builder.setLimit(limit.longValue()); }" \
+        in client
+    assert dp_path + "LoadBalancer.java" not in files
+    assert "Store/src/main/java/com/silvera/Store/config/" \
+           "HttpClientConfig.java" not in files
@@ -2,6 +2,7 @@ import os
 import pytest
 from silvera.utils import get_root_path
 from silvera.run import compile
+from silvera.const import MSG_SHARED, MSG_PRUNED
 
 
 @pytest.fixture()
@@ -12,3 +13,33 @@ def examples_path():
 def test_messaging_example(examples_path):
     path = os.path.join(examples_path, "messaging")
     compile(path, output_dir=os.path.join(path, "src-gen"))
+
+
+def test_messaging_shared_messages(examples_path, tmp_path):
+    path = os.path.join(examples_path, "messaging")
+    compile(path, output_dir=str(tmp_path), msg_mode=MSG_SHARED)
+
+    lib_pkg = os.path.join(str(tmp_path), "messages", "src", "main", "java",
+                           "com", "silvera", "messages")
+    assert os.path.exists(os.path.join(str(tmp_path), "messages", "pom.xml"))
+    assert os.path.exists(os.path.join(lib_pkg, "Message.java"))
+
+    task_pkg = os.path.join(str(tmp_path), "Task", "src", "main", "java",
+                            "com", "silvera", "Task")
+    assert not os.path.exists(os.path.join(task_pkg, "messages"))
+
+    with open(os.path.join(str(tmp_path), "Task", "pom.xml")) as f:
+        assert "<artifactId>messages</artifactId>" in f.read()
+
+
+def test_messaging_pruned_messages(examples_path, tmp_path):
+    path = os.path.join(examples_path, "messaging")
+    compile(path, output_dir=str(tmp_path), msg_mode=MSG_PRUNED)
+
+    msg_pkg = os.path.join(str(tmp_path), "Employee", "src", "main", "java",
+                           "com", "silvera", "Employee", "messages")
+    assert os.path.exists(os.path.join(msg_pkg, "Message.java"))
+    assert os.path.exists(os.path.join(msg_pkg, "employeemsggroup",
+                                       "EMPLOYEE_CREATED.java"))
+    assert not os.path.exists(os.path.join(msg_pkg, "taskmsggroup"))
+    assert not os.path.exists(os.path.join(msg_pkg, "boardmsggroup"))
@@ -0,0 +1,64 @@
+import os
+import pytest
+from silvera.generator.generator import create_plan
+from silvera.run import load
+from silvera.utils import get_root_path
+
+
+@pytest.fixture
+def example_path():
+    return os.path.join(get_root_path(), "tests", "examples", "wire_format")
+
+
+def test_wire_format(example_path, tmp_path):
+    model = load(example_path)
+    inventory = model.find_by_fqn("inventory.Inventory")
+    order = model.find_by_fqn("inventory.Order")
+
+    assert inventory.get_function("getItem").wire_format == "protobuf"
+    assert inventory.get_function("report").wire_format == "json"
+    assert order.get_function("getItem").wire_format == "protobuf"
+    assert order.get_function("count").wire_format == "json"
+    assert [t.name for t in inventory.protobuf_typedefs] == ["Item",
+                                                             "Location"]
+
+    item = inventory.domain_objs["Item"]
+    assert [f.tag for f in item.fields] == [1, 2, 4, 5]
+
+    files = {os.path.relpath(t.path, str(tmp_path)): t
+             for t in create_plan(model, str(tmp_path))}
+    schema = files["Inventory/src/main/resources/proto/Inventory.proto"]
+    schema = schema.render()
+    assert 'package inventory;' in schema
+    assert "optional string sku = 1;" in schema
+    assert "optional double price = 4;" in schema
+    assert "repeated Location locations = 5;" in schema
+    # Location has no @id field, so generated class has a string id
+    assert "optional int32 quantity = 2;\n" \
+           "    optional string id = 3;" in schema
+    assert "message Report" not in schema
+
+    # Dependent service gets the same schema
+    assert files["Order/src/main/resources/proto/Inventory.proto"]\
+        .render().split("\n", 5)[-1] == schema.split("\n", 5)[-1]
+    assert "Order/src/main/resources/proto/Order.proto" not in files
+
+    cfg_path = "Inventory/src/main/java/com/silvera/Inventory/config/"
+    cfg = files[cfg_path + "WireFormatConfig.java"].render()
+    assert 'converters.add(new ProtobufConverter("proto/Inventory.proto")\n' \
+           '            .register(Item.class)\n' \
+           '            .register(Location.class));' in cfg
+    assert cfg_path + "ProtobufConverter.java" in files
+    assert "jackson-dataformat-protobuf" in \
+        files["Inventory/pom.xml"].render()
+
+    cfg_path = "Order/src/main/java/com/silvera/Order/config/"
+    client_cfg = files[cfg_path + "HttpClientConfig.java"].render()
+    assert 'restTemplate.getMessageConverters().add(0, new ' \
+           'ProtobufConverter("proto/Inventory.proto")\n' \
+           '            .register(Item.class)\n' \
+           '            .register(Location.class));' in client_cfg
+    assert "import com.silvera.Order.domain.dependencies.*;" in client_cfg
+    assert cfg_path + "ProtobufConverter.java" in files
+    assert cfg_path + "WireFormatConfig.java" not in files
+    assert "jackson-dataformat-protobuf" in files["Order/pom.xml"].render()
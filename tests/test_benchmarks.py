@@ -0,0 +1,28 @@
+"""
+This module tests synthetic projects used for benchmarks
+"""
+from benchmarks.run import compare
+from benchmarks.synthetic import ProjectSpec, create_project
+from silvera.run import load
+
+
+def test_synthetic_project(tmp_path):
+    spec = ProjectSpec(services=12, modules=3, gateways=2)
+    model = load(create_project(str(tmp_path), spec))
+
+    services = [s for m in model.modules for s in m.services]
+    assert len(services) == 12
+    assert len(model.msg_brokers) == spec.brokers
+    # Each service depends on services declared before it
+    assert len(services[-1].dependencies) == spec.dependencies
+
+
+def test_compare():
+    baseline = {"10": {"load": 1.0, "generate": 0.01}}
+    results = {"10": {"load": 1.5, "generate": 0.03},
+               "100": {"load": 10.0}}
+
+    regressions = compare(results, baseline, 0.25)
+    # Small differences and sizes without baseline are ignored
+    assert len(regressions) == 1
+    assert "load" in regressions[0]
@@ -27,3 +27,13 @@ def test_init(remove_test_project):
 
     check_res = runner.invoke(check, ["test_project"])
     assert check_res.exit_code == 0
+
+
+def test_check_errors():
+    path = os.path.join(get_root_path(), "tests", "examples",
+                        "loading_errors")
+    runner = CliRunner()
+    res = runner.invoke(check, [path])
+    assert res.exit_code == 1
+    assert res.output.count("Error: ") == 7
+    assert "Found 6 error(s)." in res.output
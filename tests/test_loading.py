@@ -2,10 +2,18 @@
 This module tests loading mechanism
 """
 import os
+import threading
 import pytest
-from silvera.run import load
+from silvera.run import load, load_from_sources
+from silvera.lang.compaction import LineIndex
+from silvera.lang.meta import get_metamodel
 from silvera.core import ConfigServerDecl, ServiceRegistryDecl, TypedList, \
     TypeDef
+from silvera.diagnostics import collect as collect_errors, error_message, \
+    report
+from silvera.exceptions import SilveraErrors, SilveraLoadError, \
+    SilveraTypeError
+from silvera.timings import collect
 from silvera.utils import get_root_path
 
 
@@ -135,3 +143,389 @@ def test_loading_with_custom_types(examples_path):
     update_worker = new_office_service.get_function("updateWorker")
     up_param = update_worker.params[0]
     assert up_param.type is worker
+
+
+def test_load_timings(examples_path):
+    with collect() as timings:
+        load(os.path.join(examples_path, "web_shop"))
+
+    names = [p.name for p in timings.phases]
+    for name in ["load", "load/discovery", "load/parsing",
+                 "load/model_processor",
+                 "load/model_processor/process_module",
+                 "load/rest_resolver"]:
+        assert name in names
+
+    parsing = timings["load/parsing"]
+    assert parsing.wall > 0
+    assert parsing.peak_mem > 0
+    assert timings["load"].wall >= parsing.wall
+    assert timings["load"].peak_mem >= parsing.peak_mem
+
+
+def test_compaction(examples_path):
+    path = os.path.join(examples_path, "web_shop")
+    model = load(path)
+
+    module = model.modules[0]
+    assert isinstance(module._tx_parser, LineIndex)
+
+    # Line index gives the same positions as the textX parser
+    with open(os.path.join(path, module.path)) as f:
+        text = f.read()
+    parser = get_metamodel().model_from_str(text)._tx_parser
+    for pos in range(len(text) + 1):
+        assert module._tx_parser.pos_to_linecol(pos) == \
+            parser.pos_to_linecol(pos)
+
+
+def test_collect_errors(examples_path):
+    path = os.path.join(examples_path, "loading_errors")
+
+    # By default, loading stops on the first error
+    with pytest.raises(SilveraTypeError):
+        load(path)
+
+    with pytest.raises(SilveraErrors) as exc_info:
+        load(path, collect_errors=True)
+
+    messages = [error_message(e) for e in exc_info.value.errors]
+    assert messages == [
+        "Error in 'shop.si' (10, 13). Type 'Customer' does not exist!",
+        "Error in 'shop.si' (13, 9). Type 'Invoice' does not exist!",
+        "Error in 'shop.si' (17, 36). Type 'Cart' does not exist!",
+        "Error in module shop.si (24, 1): \"Declaration with name "
+        "'BaseOrderService' not found!\"",
+        "Error in module shop.si (35, 1): \"Declaration with name "
+        "'StockService' not found!\"",
+        "Error in module shop.si (19, 9): Placeholder 'order_id' not found "
+        "in function parameters for mapping '/orders/{order_id}'!"
+    ]
+
+
+def test_load_from_sources(examples_path):
+    path = os.path.join(examples_path, "importing", "ok")
+    sources = {}
+    for root, _, filenames in os.walk(path):
+        for filename in filenames:
+            file_path = os.path.join(root, filename)
+            with open(file_path) as f:
+                sources[os.path.relpath(file_path, path)] = f.read()
+
+    model = load_from_sources(sources)
+    expected = load(path)
+    assert sorted(m.path for m in model.modules) == \
+        sorted(m.path for m in expected.modules)
+    user_service = model.find_by_fqn("user.UserService")
+    assert user_service.config_server is \
+        model.find_by_fqn("share.setup.ConfigServer")
+
+    # Same sources are not parsed again, but each load returns an
+    # independent copy of the cached model
+    with collect(trace_memory=False) as timings:
+        cached = load_from_sources(dict(sources))
+    with pytest.raises(KeyError):
+        timings["load"]
+    assert cached is not model
+    cached_service = cached.find_by_fqn("user.UserService")
+    assert cached_service is not user_service
+    assert cached_service.config_server is \
+        cached.find_by_fqn("share.setup.ConfigServer")
+    cached_service.name = "Changed"
+    assert load_from_sources(sources).find_by_fqn("user.UserService")
+    assert user_service.name == "UserService"
+
+    assert load_from_sources(sources, use_cache=False) is not model
+
+    changed = dict(sources)
+    changed["user.si"] += "\n"
+    with collect(trace_memory=False) as timings:
+        load_from_sources(changed)
+    assert timings["load"]
+
+
+def test_concurrency_errors():
+    sources = {"app.si": """
+service App {
+    concurrency {
+        core_pool=8
+        max_pool=4
+
+        executor io {}
+        executor io {}
+    }
+
+    api {
+        @async(executor=cpu)
+        @rest(method=GET)
+        i32 count()
+    }
+}
+"""}
+    with pytest.raises(SilveraErrors) as exc_info:
+        load_from_sources(sources, collect_errors=True, use_cache=False)
+
+    messages = [error_message(e) for e in exc_info.value.errors]
+    assert messages == [
+        "Executor 'default' in service 'App' has max_pool (4) lower than "
+        "core_pool (8)!",
+        "Redefinition of executor 'io' in service 'App'!",
+        "Executor 'cpu' of function 'count' is not defined in service 'App'!"
+    ]
+
+
+def test_executor_names():
+    sources = {"app.si": """
+service App {
+    concurrency {
+        executor async {}
+        executor io {}
+        executor IO {}
+    }
+
+    api {
+        @rest(method=GET)
+        i32 count()
+    }
+}
+"""}
+    with pytest.raises(SilveraErrors) as exc_info:
+        load_from_sources(sources, collect_errors=True, use_cache=False)
+
+    messages = [error_message(e) for e in exc_info.value.errors]
+    assert messages == [
+        "Executor name 'async' in service 'App' is reserved for the default "
+        "executor!",
+        "Executors 'io' and 'IO' in service 'App' differ only in case!"
+    ]
+
+
+def test_collect_errors_per_thread():
+    sources = {"app.si": """
+service App {
+    concurrency {
+        core_pool=8
+        max_pool=4
+    }
+}
+"""}
+    collecting = threading.Event()
+    loaded = threading.Event()
+    results = []
+
+    def collect_in_thread():
+        with collect_errors() as diagnostics:
+            collecting.set()
+            loaded.wait(10)
+            report(ValueError("Error of the collecting thread"))
+        results.append([error_message(e) for e in diagnostics.errors])
+
+    thread = threading.Thread(target=collect_in_thread)
+    thread.start()
+    try:
+        assert collecting.wait(10)
+        # Errors of a strict load in another thread are raised, not collected
+        with pytest.raises(SilveraLoadError) as exc_info:
+            load_from_sources(sources)
+    finally:
+        loaded.set()
+        thread.join()
+
+    assert error_message(exc_info.value) == \
+        "Executor 'default' in service 'App' has max_pool (4) lower than " \
+        "core_pool (8)!"
+    assert results == [["Error of the collecting thread"]]
+    # The invalid model is not cached
+    with pytest.raises(SilveraLoadError):
+        load_from_sources(sources)
+
+
+def test_cache_errors():
+    sources = {"app.si": """
+service App {
+    api {
+        typedef Item [
+            i32 id
+        ]
+
+        @cache
+        @rest(method=POST)
+        Item add(Item item)
+
+        @cache
+        @rest(method=GET)
+        void touch(i32 id)
+
+        @cache
+        @rest(method=GET, mapping="/items")
+        list<Item> find(str name)
+    }
+}
+"""}
+    with pytest.raises(SilveraErrors) as exc_info:
+        load_from_sources(sources, collect_errors=True, use_cache=False)
+
+    messages = [error_message(e) for e in exc_info.value.errors]
+    assert messages == [
+        "Error in module app.si (8, 9): Only GET functions can be cached, "
+        "but 'add' is POST!",
+        "Error in module app.si (12, 9): Function 'touch' returns no value "
+        "and cannot be cached!",
+        "Error in module app.si (16, 9): Parameter 'name' of cached function "
+        "'find' must be a URL placeholder or a query parameter!"
+    ]
+
+
+def test_hedging_errors():
+    sources = {"app.si": """
+service Order {
+    api {
+        @rest(method=GET)
+        i32 count()
+    }
+}
+
+service Stock {
+    api {
+        @rest(method=POST)
+        bool reserve(str product)
+    }
+}
+
+dependency Order -> Stock {
+    reserve[fail_fast] {
+        hedge_after_ms=100
+    }
+}
+"""}
+    with pytest.raises(SilveraErrors) as exc_info:
+        load_from_sources(sources, collect_errors=True, use_cache=False)
+
+    messages = [error_message(e) for e in exc_info.value.errors]
+    assert messages == [
+        "Only GET functions can be hedged, but 'reserve' of service 'Stock' "
+        "is POST!"
+    ]
+
+
+def test_batchable_errors():
+    sources = {"app.si": """
+service App {
+    api {
+        @batchable
+        @rest(method=GET)
+        i32 total(i32 a, i32 b)
+
+        @batchable
+        @rest(method=POST)
+        void touch(i32 id)
+
+        @async
+        @batchable
+        @rest(method=GET)
+        i32 count(i32 id)
+    }
+}
+"""}
+    with pytest.raises(SilveraErrors) as exc_info:
+        load_from_sources(sources, collect_errors=True, use_cache=False)
+
+    messages = [error_message(e) for e in exc_info.value.errors]
+    assert messages == [
+        "Error in module app.si (4, 9): Batchable function 'total' must "
+        "have exactly one parameter!",
+        "Error in module app.si (8, 9): Function 'touch' returns no value "
+        "and cannot be batched!",
+        "Error in module app.si (12, 9): Function 'count' cannot be both "
+        "async and batchable!"
+    ]
+
+
+def test_wire_format_errors():
+    sources = {"app.si": """
+service App {
+    wire_format=protobuf
+
+    api {
+        typedef Item [
+            1: str name
+            str code
+            2: i32 count
+            list<list<str>> matrix
+            19000: str note
+        ]
+
+        @rest(method=GET)
+        Item getItem(str name)
+    }
+}
+"""}
+    with pytest.raises(SilveraErrors) as exc_info:
+        load_from_sources(sources, collect_errors=True, use_cache=False)
+
+    messages = [error_message(e) for e in exc_info.value.errors]
+    assert messages == [
+        "Fields 'code' and 'count' of type 'Item' in service 'App' have the "
+        "same tag 2!",
+        "Field 'matrix' of type 'Item' in service 'App' cannot be sent in "
+        "protobuf wire format!",
+        "Tag 19000 of field 'note' of type 'Item' in service 'App' is "
+        "reserved by protobuf!"
+    ]
+
+
+def test_grpc_errors():
+    sources = {"app.si": """
+service App {
+    comm_style=grpc
+
+    api {
+        @rest(method=GET)
+        list<list<str>> matrix()
+
+        @rest(method=POST)
+        void fill(list<list<i32>> values)
+
+        @cache(ttl=60)
+        @rest(method=GET)
+        str name(i32 id)
+    }
+}
+"""}
+    with pytest.raises(SilveraErrors) as exc_info:
+        load_from_sources(sources, collect_errors=True, use_cache=False)
+
+    messages = [error_message(e) for e in exc_info.value.errors]
+    assert messages == [
+        "Error in module app.si (6, 9): Return type of function 'matrix' "
+        "cannot be sent over gRPC!",
+        "Error in module app.si (9, 9): Parameter 'values' of function "
+        "'fill' cannot be sent over gRPC!",
+        "Error in module app.si (12, 9): Function 'name' of gRPC service "
+        "'App' cannot be cached or batched!"
+    ]
+
+
+def test_msg_lib_name_reserved():
+    sources = {"app.si": """
+msg-pool {
+    group Events [
+        msg Created []
+    ]
+}
+
+service Messages {
+    api {
+        @rest(method=GET)
+        str name()
+    }
+}
+"""}
+    with pytest.raises(SilveraErrors) as exc_info:
+        load_from_sources(sources, collect_errors=True, use_cache=False)
+
+    messages = [error_message(e) for e in exc_info.value.errors]
+    assert messages == [
+        "Declaration 'Messages' in module 'app.si' is named like the shared "
+        "module of message classes!"
+    ]
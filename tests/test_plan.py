@@ -0,0 +1,357 @@
+"""
+This module tests generation plan
+"""
+import importlib
+import json
+import os
+import sys
+import tarfile
+import zipfile
+import pytest
+from click.testing import CliRunner
+from jinja2 import Environment, FileSystemLoader
+from silvera.cli import silvera
+from silvera.generator import output
+from silvera.generator import plan as plan_module
+from silvera.generator.cache import GenerationCache
+from silvera.generator.generator import create_plan
+from silvera.generator.java_generator import java
+from silvera.generator.output import PartialOutputError
+from silvera.generator.plan import GenerationPlan, RenderTask, STATUS_NEW, \
+    STATUS_KEEP
+from silvera.generator.profile import TemplateProfiler
+from silvera.generator.registration import GeneratorDesc, GeneratorContext
+from silvera.run import load, compile_many
+from silvera.trace import record
+from silvera.utils import get_root_path
+
+
+@pytest.fixture()
+def example_path():
+    return os.path.join(get_root_path(), "tests", "examples", "async")
+
+
+def test_create_plan(example_path, tmp_path):
+    model = load(example_path)
+    output_dir = str(tmp_path)
+
+    plan = create_plan(model, output_dir)
+
+    # Nothing is generated during planning
+    assert os.listdir(output_dir) == []
+
+    paths = {plan.relpath(t.path) for t in plan}
+    assert os.path.join("Task", "pom.xml") in paths
+    assert os.path.join("Task", "openapi.json") in paths
+    assert all(t.status() == STATUS_NEW for t in plan)
+
+    labels = {t.label for t in plan}
+    assert "java/service/rpc/controller/controller.template" in labels
+
+
+def test_execute_plan(example_path, tmp_path):
+    model = load(example_path)
+    output_dir = str(tmp_path)
+
+    create_plan(model, output_dir).execute()
+    assert os.path.exists(os.path.join(output_dir, "Task", "pom.xml"))
+
+    impl_file = os.path.join(output_dir, "Task", "src", "main", "java", "com",
+                             "silvera", "Task", "service", "impl",
+                             "TaskService.java")
+    with open(impl_file, "w") as f:
+        f.write("// changed")
+
+    plan = create_plan(model, output_dir)
+    assert plan.tasks[impl_file].status() == STATUS_KEEP
+
+    # Service implementation is preserved between compilations
+    plan.execute(jobs=4)
+    with open(impl_file) as f:
+        assert f.read() == "// changed"
+
+
+def test_cli_plan(example_path, tmp_path):
+    output_dir = os.path.join(str(tmp_path), "output")
+
+    runner = CliRunner()
+    result = runner.invoke(silvera, ["compile", example_path, "-o",
+                                     output_dir, "--plan"])
+    assert result.exit_code == 0
+    assert "controller/controller.template" in result.output
+    assert not os.path.exists(output_dir)
+
+
+def test_execute_plan_failed(example_path, tmp_path):
+    model = load(example_path)
+    output_dir = str(tmp_path)
+
+    plan = create_plan(model, output_dir)
+
+    def fail():
+        raise ValueError("Rendering failed")
+    list(plan)[-1].render = fail
+
+    with pytest.raises(ValueError):
+        plan.execute()
+
+    # Nothing is written if rendering of any file fails
+    assert os.listdir(output_dir) == []
+
+
+def test_execute_plan_partially_written(example_path, tmp_path,
+                                        monkeypatch):
+    model = load(example_path)
+    plan = create_plan(model, str(tmp_path))
+
+    def write(path, content):
+        if len(calls) == 2:
+            raise OSError("Disk full")
+        calls.append(path)
+    calls = []
+    monkeypatch.setattr(output, "write_atomic", write)
+
+    with pytest.raises(PartialOutputError) as exc_info:
+        plan.execute()
+
+    assert exc_info.value.written == 2
+    assert "may be partially updated: Disk full" in str(exc_info.value)
+
+
+@pytest.mark.parametrize("ext", [".zip", ".tar.gz"])
+def test_cli_archive(example_path, tmp_path, ext):
+    archive = os.path.join(str(tmp_path), "output" + ext)
+
+    runner = CliRunner()
+    result = runner.invoke(silvera, ["compile", example_path, "-a", archive])
+    assert result.exit_code == 0
+
+    # Only the archive is created
+    assert os.listdir(str(tmp_path)) == ["output" + ext]
+
+    if ext == ".zip":
+        with zipfile.ZipFile(archive) as f:
+            names = f.namelist()
+    else:
+        with tarfile.open(archive) as f:
+            names = f.getnames()
+    assert "Task/pom.xml" in names
+    assert "Task/openapi.json" in names
+    assert "Task/src/test/" in names or "Task/src/test" in names
+
+
+def test_execute_plan_cached(example_path, tmp_path):
+    model = load(example_path)
+    cache = GenerationCache(os.path.join(str(tmp_path), "cache"))
+
+    first = os.path.join(str(tmp_path), "first")
+    os.mkdir(first)
+    create_plan(model, first).execute(cache=cache)
+    assert cache.hits == 0
+    assert cache.misses > 0
+
+    misses = cache.misses
+    second = os.path.join(str(tmp_path), "second")
+    os.mkdir(second)
+    plan = create_plan(model, second)
+    plan.execute(jobs=4, cache=cache)
+    assert cache.hits == misses
+    assert cache.misses == misses
+
+    for task in plan:
+        with open(task.path) as f:
+            content = f.read()
+        with open(os.path.join(first, plan.relpath(task.path))) as f:
+            expected = f.read()
+        assert "\x00" not in content
+
+        # Only generation time can differ
+        def strip_date(s):
+            return [line for line in s.splitlines() if "Date:" not in line]
+        assert strip_date(content) == strip_date(expected)
+
+
+def test_execute_plan_cached_parent_changed(tmp_path):
+    model = load(os.path.join(get_root_path(), "tests", "examples",
+                              "wire_format"))
+    cache = GenerationCache(os.path.join(str(tmp_path), "cache"))
+    create_plan(model, str(tmp_path)).execute(cache=cache)
+    misses = cache.misses
+
+    # Wire format of functions is set on the service that contains them.
+    # Files that depend on it must be rendered again.
+    model.find_by_fqn("inventory.Inventory").wire_format = "json"
+    output_dir = os.path.join(str(tmp_path), "changed")
+    os.mkdir(output_dir)
+    plan = create_plan(model, output_dir)
+    plan.execute(cache=cache)
+    assert cache.misses > misses
+
+    def strip_date(s):
+        return [line for line in s.splitlines() if "Date:" not in line]
+    for task in plan:
+        with open(task.path) as f:
+            assert strip_date(f.read()) == strip_date(task.render())
+
+
+def test_execute_plan_cached_filter_changed(tmp_path, monkeypatch):
+    code_dir = tmp_path / "code"
+    templates_dir = tmp_path / "templates"
+    code_dir.mkdir()
+    templates_dir.mkdir()
+    (templates_dir / "name.template").write_text("{{ name|shout }}")
+    helpers = code_dir / "cached_filters.py"
+    monkeypatch.syspath_prepend(str(code_dir))
+    monkeypatch.delitem(sys.modules, "cached_filters", raising=False)
+    cache = GenerationCache(str(tmp_path / "cache"))
+
+    def render(module):
+        # Filter calls a helper function, like filters of the Java generator
+        env = Environment(loader=FileSystemLoader(str(templates_dir)))
+        env.filters["shout"] = lambda s: module.upper(s)
+        return cache.render(RenderTask(str(tmp_path / "out"), env,
+                                       "name.template", {"name": "order"}))
+
+    helpers.write_text("def upper(s):\n    return s.upper()\n")
+    module = importlib.import_module("cached_filters")
+    assert render(module) == "ORDER"
+    assert render(module) == "ORDER"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Same names and version, but the code of the filter changed
+    helpers.write_text("def upper(s):\n    return s.upper() + '!'\n")
+    os.utime(str(helpers), ns=(0, 0))
+    module = importlib.reload(module)
+    assert render(module) == "ORDER!"
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_generate_many(example_path, tmp_path):
+    model = load(example_path)
+    services = [s for m in model.modules for s in m.services]
+    calls = []
+
+    def generate_many(decls, output_dir, ctx):
+        calls.append((decls, ctx))
+
+    generator = GeneratorDesc("test", "1", "Test generator", gen_func=None,
+                              gen_many_func=generate_many)
+    ctx = GeneratorContext(model)
+    plan = GenerationPlan(str(tmp_path))
+    generator.plan_many(services, str(tmp_path), plan, ctx)
+    plan.execute()
+
+    # All declarations are generated with one call
+    assert calls == [(services, ctx)]
+
+
+def test_java_shared_env(example_path, tmp_path):
+    model = load(example_path)
+    services = [s for m in model.modules for s in m.services]
+
+    ctx = GeneratorContext(model)
+    plan = GenerationPlan(str(tmp_path))
+    java.plan_many(services, str(tmp_path), plan, ctx)
+
+    # Run scripts of all services are rendered with the same environment
+    run_scripts = [t for t in plan if t.template_name == "run_sh.template"]
+    assert len(run_scripts) == len(services)
+    assert len({id(t.env) for t in run_scripts}) == 1
+
+
+def test_java_shared_env_messaging(tmp_path):
+    model = load(os.path.join(get_root_path(), "tests", "examples",
+                              "messaging"))
+    services = [s for m in model.modules for s in m.services]
+    assert len(services) > 1
+
+    ctx = GeneratorContext(model)
+    plan = GenerationPlan(str(tmp_path))
+    java.plan_many(services, str(tmp_path), plan, ctx)
+
+    # Services with different message packages share the environment
+    controllers = [t for t in plan
+                   if t.template_name == "controller/controller.template"]
+    assert len(controllers) == len(services)
+    assert len({id(t.env) for t in controllers}) == 1
+    for service, task in zip(services, controllers):
+        assert "import com.silvera.%s.messages.*;" % service.name in \
+            task.render()
+
+
+def test_profile_templates(example_path, tmp_path):
+    model = load(example_path)
+    services = [s for m in model.modules for s in m.services]
+    profiler = TemplateProfiler()
+
+    create_plan(model, str(tmp_path)).execute(jobs=2, profiler=profiler)
+
+    stats = {s["template"]: s for s in profiler.stats()}
+    controller = stats["java/service/rpc/controller/controller.template"]
+    assert controller["count"] == len(services)
+    assert controller["bytes"] > 0
+    assert 0 < controller["p95_ms"] <= controller["total_ms"]
+    assert "controller/controller.template" in profiler.to_table()
+
+
+def test_trace(example_path, tmp_path):
+    with record() as tracer:
+        model = load(example_path)
+        create_plan(model, str(tmp_path)).execute(jobs=2)
+
+    spans = [e for e in tracer.events if e["ph"] == "X"]
+    categories = {e["cat"] for e in spans}
+    assert {"phase", "parse", "process_module", "resolve",
+            "render"} <= categories
+
+    threads = {e["tid"]: e["args"]["name"] for e in tracer.events
+               if e["ph"] == "M"}
+    render_threads = {threads[e["tid"]] for e in spans
+                      if e["cat"] == "render"}
+    assert all(name.startswith("worker") for name in render_threads)
+
+    trace_file = os.path.join(str(tmp_path), "trace.json")
+    tracer.dump(trace_file)
+    with open(trace_file) as f:
+        assert len(json.load(f)["traceEvents"]) == len(tracer.events)
+
+
+def test_render_untraced(example_path, tmp_path, monkeypatch):
+    def traced_render(plan, task, render):
+        raise AssertionError("Span of %s created" % task.label)
+    monkeypatch.setattr(plan_module, "_traced_render", traced_render)
+
+    # Spans of rendered files are prepared only while recording
+    model = load(example_path)
+    create_plan(model, str(tmp_path)).execute(jobs=2)
+
+
+def test_cli_compile_many(example_path, tmp_path):
+    examples = os.path.join(get_root_path(), "tests", "examples")
+    projects = os.path.join(str(tmp_path), "projects.txt")
+    with open(projects, "w") as f:
+        f.write("# Projects\n%s\n\n%s\n" % (
+            example_path, os.path.join(examples, "loading_errors")))
+    output_dir = os.path.join(str(tmp_path), "output")
+    report = os.path.join(str(tmp_path), "report.json")
+
+    runner = CliRunner()
+    result = runner.invoke(silvera, ["compile-many", projects,
+                                     os.path.join(examples, "web_shop"),
+                                     "-o", output_dir, "--report", report])
+    assert result.exit_code == 1
+    assert "1 of 3 project(s) failed." in result.output
+
+    with open(report) as f:
+        results = json.load(f)
+    assert [r["exit_code"] for r in results] == [0, 1, 0]
+    assert "Type 'Customer' does not exist!" in results[1]["error"]
+    assert sorted(os.listdir(output_dir)) == ["async", "web_shop"]
+
+
+def test_compile_many_workers(example_path, tmp_path):
+    web_shop = os.path.join(get_root_path(), "tests", "examples", "web_shop")
+    results = compile_many([example_path, web_shop], str(tmp_path),
+                           workers=2)
+    assert [r.ok for r in results] == [True, True]
+    assert sorted(os.listdir(str(tmp_path))) == ["async", "web_shop"]